@@ -6,10 +6,11 @@ Provides common functionality for all AI agents in the system.
 
 import os
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 from dataclasses import dataclass
 from typing import Any
 
-from .. import gemini_util, storage
+from .. import canon_new, gemini_util, storage
 from ..models import SystemConfig
 
 
@@ -38,7 +39,7 @@ class BaseHronirAgent(ABC):
     def __init__(self, config: AgentConfig, system_config: SystemConfig | None = None):
         self.config = config
         self.system_config = system_config or SystemConfig()
-        self.data_manager = storage.DataManager()
+        self.data_manager = storage.get_data_manager()
         self.gemini_util = gemini_util
 
         # Initialize Gemini API
@@ -58,12 +59,62 @@ class BaseHronirAgent(ABC):
     def get_narrative_context(self, position: int, predecessor_uuid: str | None = None) -> str:
         """Get narrative context for a given position."""
         if predecessor_uuid:
-            # Get the hrönir content for context
-            hrönir_data = self.data_manager.get_hrönir_by_uuid(predecessor_uuid)
-            if hrönir_data:
-                return hrönir_data.text_content[:500]  # First 500 chars for context
+            # Get the hrönir content for context (served from the content cache)
+            content = self.data_manager.get_hrönir_content(predecessor_uuid)
+            if content:
+                return content[:500]  # First 500 chars for context
         return ""
 
+    def get_related_context(self, query: str, limit: int = 3, max_chars: int = 300) -> str:
+        """Excerpts of the hrönirs most related to a query, via the full-text index."""
+        excerpts = []
+        for hronir_uuid, _score in self.data_manager.search_hrönirs(query, limit=limit):
+            content = self.data_manager.get_hrönir_content(hronir_uuid)
+            if content:
+                excerpts.append(content[:max_chars])
+        return "\n---\n".join(excerpts)
+
+    def iter_candidate_pages(
+        self, position: int, predecessor_uuid: str | None = None, page_size: int = 50
+    ) -> Iterator[list[dict[str, Any]]]:
+        """Page through the scored candidates at a position without loading them all."""
+        # Resolved once: inferring the canonical predecessor walks the whole graph.
+        predecessor_uuid = canon_new.resolve_target_predecessor(
+            self.data_manager, position, predecessor_uuid
+        )
+        if predecessor_uuid is None:
+            return
+        after_path_uuid = None
+        while True:
+            page, after_path_uuid = canon_new.get_candidates_page_with_scores(
+                self.data_manager,
+                position,
+                predecessor_uuid,
+                after_path_uuid=after_path_uuid,
+                limit=page_size,
+            )
+            if page:
+                yield page
+            if not after_path_uuid:
+                break
+
+    def get_competition_summary(
+        self, position: int, predecessor_uuid: str | None = None, top: int = 3
+    ) -> dict[str, Any]:
+        """Number of rival chapters at a position and the `top` strongest of them."""
+        predecessor_uuid = canon_new.resolve_target_predecessor(
+            self.data_manager, position, predecessor_uuid
+        )
+        if predecessor_uuid is None:
+            return {"count": 0, "leaders": []}
+        prev_uuid = "" if predecessor_uuid == "root" else predecessor_uuid
+        return {
+            "count": self.data_manager.count_paths_by_prev_uuids([prev_uuid]).get(prev_uuid, 0),
+            "leaders": canon_new.get_top_candidates(
+                self.data_manager, position, predecessor_uuid, limit=top
+            ),
+        }
+
     def generate_with_gemini(self, prompt: str) -> str:
         """Generate content using Gemini API."""
         return self.gemini_util._gemini_request(prompt)
@@ -46,12 +46,14 @@ class ChapterWriterAgent(BaseHronirAgent):
 
         # Get narrative context
         context = self.get_narrative_context(position, predecessor_uuid)
+        related_context = self.get_related_context(theme.replace("_", " "))
 
         # Build the generation prompt
         prompt = self.get_agent_prompt(
             {
                 "position": position,
                 "context": context,
+                "related_context": related_context,
                 "theme": theme,
                 "target_audience": target_audience,
             }
@@ -91,6 +93,7 @@ class ChapterWriterAgent(BaseHronirAgent):
         position = task_data.get("position", 0)
         context = task_data.get("context", "")
         theme = task_data.get("theme", "continuation")
+        related_context = task_data.get("related_context", "")
 
         # Use existing prompt builder as base
         base_prompt = build_synthesis_prompt(
@@ -117,6 +120,13 @@ class ChapterWriterAgent(BaseHronirAgent):
         Aim for 300-800 words of dense, philosophical prose.
         """
 
+        if related_context:
+            agent_instructions += f"""
+        Thematically related chapters already in the encyclopedia (echo or subvert them,
+        never repeat them):
+        {related_context}
+        """
+
         return base_prompt + agent_instructions
 
     def generate_competitive_chapter(
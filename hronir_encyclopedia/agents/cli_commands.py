@@ -182,13 +182,12 @@ def test_crew_system(
         # Create crew config
         config = CrewConfig(name="Test Crew", agents=["chapter_writer"], verbose=verbose)
 
-        crew = HronirCrew(config)
-
-        # Run competitive writing session
+        # Run competitive writing session; the crew commits and releases storage on exit
         async def run_test():
-            return await crew.run_competitive_writing_session(
-                position=position, predecessor_uuid=predecessor_uuid, num_chapters=num_chapters
-            )
+            async with HronirCrew(config) as crew:
+                return await crew.run_competitive_writing_session(
+                    position=position, predecessor_uuid=predecessor_uuid, num_chapters=num_chapters
+                )
 
         with Progress() as progress:
             task = progress.add_task("[green]Running crew tasks...", total=1)
@@ -347,7 +346,7 @@ def agent_status():
 
     # Check database
     try:
-        storage.DataManager()
+        storage.get_data_manager()
         console.print("[green]✓ Database connection: OK[/green]")
 
         # Get some stats
@@ -34,6 +34,7 @@ except ImportError:
 
 
 from .. import storage
+from ..async_storage import AsyncDataManager
 
 
 @dataclass
@@ -48,20 +49,39 @@ class CrewConfig:
 
 
 class HronirCrew:
-    """Manages a crew of AI agents for collaborative Hronir tasks."""
+    """
+    Manages a crew of AI agents for collaborative Hronir tasks.
 
-    def __init__(self, config: CrewConfig):
+    All storage access of the crew, including work done while crew.kickoff runs on another
+    thread, goes through the crew's AsyncDataManager: its worker thread owns a dedicated
+    DuckDB connection, separate from the one the CLI and the sync agents share. Use
+    `async with HronirCrew(...)` or call close() so pending writes are committed and the
+    worker thread is stopped.
+    """
+
+    def __init__(self, config: CrewConfig, data_manager: storage.DataManager | None = None):
         if not CREWAI_AVAILABLE:
             raise ImportError("CrewAI is not installed. Install with: pip install crewai")
 
         self.config = config
         self.agents = {}
         self.crew = None
-        self.data_manager = storage.DataManager()
+        self.async_data_manager = AsyncDataManager(data_manager)
 
         # Initialize agents
         self._initialize_agents()
 
+    async def close(self) -> None:
+        """Commits pending storage work and stops the storage worker thread."""
+        await self.async_data_manager.__aexit__(None, None, None)
+
+    async def __aenter__(self) -> "HronirCrew":
+        await self.async_data_manager.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
     def _initialize_agents(self):
         """Initialize the specified agents."""
         for agent_type in self.config.agents:
@@ -182,11 +202,12 @@ class HronirCrew:
         crew = self.create_writing_crew(task_data)
 
         try:
-            result = crew.kickoff()
+            # kickoff() blocks on the LLM; keep the event loop (and storage batching) running.
+            result = await asyncio.to_thread(crew.kickoff)
 
             # Store the generated content
             content = result if isinstance(result, str) else str(result)
-            chapter_uuid = storage.store_chapter_text(content)
+            chapter_uuid = await self.async_data_manager.store(content)
 
             return {
                 "uuid": chapter_uuid,
@@ -204,7 +225,7 @@ class HronirCrew:
         crew = self.create_judgment_crew(task_data)
 
         try:
-            result = crew.kickoff()
+            result = await asyncio.to_thread(crew.kickoff)
 
             # Parse the judgment result
             judgment = self._parse_crew_judgment(str(result))
@@ -244,9 +265,9 @@ class HronirCrew:
         # Get context
         context = ""
         if predecessor_uuid:
-            hrönir_data = self.data_manager.get_hrönir_by_uuid(predecessor_uuid)
-            if hrönir_data:
-                context = hrönir_data.text_content[:500]
+            predecessor_content = await self.async_data_manager.get_content(predecessor_uuid)
+            if predecessor_content:
+                context = predecessor_content[:500]
 
         # Generate multiple chapters
         tasks = []
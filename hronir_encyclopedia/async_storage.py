@@ -0,0 +1,177 @@
+"""
+Asyncio façade over DataManager.
+
+DuckDB calls block, and a DuckDB connection must not be used from several threads at
+once. AsyncDataManager therefore opens its own DataManager (its own connection to the
+same database file, so the CLI and the sync agents keep theirs), runs all work on it on
+one dedicated worker thread, bounds how many operations may be queued on it, and
+coalesces content reads and existence probes issued within a short window into single
+set-based queries.
+"""
+
+import asyncio
+import functools
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from . import canon_new
+from .models import Path as PathModel
+from .storage import DataManager
+
+T = TypeVar("T")
+
+DEFAULT_MAX_PENDING = 32
+DEFAULT_BATCH_WINDOW_SECONDS = 0.002
+DEFAULT_MAX_BATCH_SIZE = 256
+
+
+class _ReadBatcher:
+    """Collects keys requested on the event loop and resolves them with one bulk call."""
+
+    def __init__(
+        self,
+        fetch_many: Callable[[list[str]], Any],
+        run: Callable[..., Any],
+        window: float,
+        max_batch_size: int,
+    ):
+        self._fetch_many = fetch_many
+        self._run = run
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._pending: dict[str, list[asyncio.Future]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self.batches = 0
+
+    async def get(self, key: str) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        if pending:
+            self.batches += 1
+            asyncio.get_running_loop().create_task(self._resolve(pending))
+
+    async def _resolve(self, pending: dict[str, list[asyncio.Future]]) -> None:
+        try:
+            results = await self._run(self._fetch_many, list(pending))
+        except Exception as exc:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(exc)
+            return
+        for key, futures in pending.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(results(key))
+
+
+class AsyncDataManager:
+    """
+    Awaitable storage API for the agent layer. Without a `data_manager` it opens and
+    later closes a dedicated one; a DataManager passed in must not be used from other
+    threads while the façade is open. Initialization runs on the worker thread: await
+    start() (or use `async with`) to surface its errors early.
+    """
+
+    def __init__(
+        self,
+        data_manager: DataManager | None = None,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        batch_window: float = DEFAULT_BATCH_WINDOW_SECONDS,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ):
+        self._owns_data_manager = data_manager is None
+        self.data_manager = data_manager or DataManager()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hronir-storage")
+        # The first job on the worker, so every later call sees an initialized manager.
+        self._ready = self._executor.submit(self._initialize)
+        self._max_pending = max_pending
+        self._semaphore: asyncio.Semaphore | None = None
+        self._contents = _ReadBatcher(self._fetch_contents, self._run, batch_window, max_batch_size)
+        self._existence = _ReadBatcher(
+            self._fetch_existence, self._run, batch_window, max_batch_size
+        )
+
+    def _initialize(self) -> None:
+        if not self.data_manager._initialized:
+            self.data_manager.initialize_and_load()
+
+    async def start(self) -> None:
+        """Waits until the worker has initialized the DataManager."""
+        await asyncio.wrap_future(self._ready)
+
+    async def _run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        await self.start()
+        # Created lazily so the semaphore binds to the loop that actually uses it.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_pending)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs)
+            )
+
+    def _fetch_contents(self, content_uuids: list[str]) -> Callable[[str], str | None]:
+        return self.data_manager.get_hrönir_contents(content_uuids).get
+
+    def _fetch_existence(self, content_uuids: list[str]) -> Callable[[str], bool]:
+        return self.data_manager.existing_hrönir_uuids(content_uuids).__contains__
+
+    # --- Hrönirs ---
+    async def store(self, content: str | bytes) -> str:
+        """Stores a chapter text and returns its UUID."""
+        return await self._run(self.data_manager.store_hrönir_text, content)
+
+    async def get_content(self, content_uuid: str) -> str | None:
+        return await self._contents.get(str(content_uuid))
+
+    async def exists(self, content_uuid: str) -> bool:
+        return await self._existence.get(str(content_uuid))
+
+    # --- Paths ---
+    async def add_path(self, path: PathModel) -> None:
+        await self._run(self.data_manager.add_path, path)
+
+    async def get_paths_by_position(self, position: int) -> list[PathModel]:
+        return await self._run(self.data_manager.get_paths_by_position, position)
+
+    # --- Canon ---
+    async def canonical_path(self) -> list[dict[str, Any]]:
+        return await self._run(canon_new.calculate_canonical_path, self.data_manager)
+
+    async def candidates(
+        self, position: int, predecessor_uuid: str | None = None
+    ) -> list[dict[str, Any]]:
+        return await self._run(
+            canon_new.get_candidates_with_scores, self.data_manager, position, predecessor_uuid
+        )
+
+    async def save(self) -> None:
+        await self._run(self.data_manager.save_all_data)
+
+    def close(self) -> None:
+        """Waits for queued storage work, stops the worker thread and closes an owned manager."""
+        self._executor.shutdown(wait=True)
+        if self._owns_data_manager:
+            self.data_manager.close()
+
+    async def __aenter__(self) -> "AsyncDataManager":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.save()
+        self.close()
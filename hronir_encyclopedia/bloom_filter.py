@@ -0,0 +1,59 @@
+"""
+In-memory Bloom filter over UUIDs.
+
+Hrönir and path UUIDs are UUIDv5, i.e. truncated SHA-1 digests, so their bits are already
+uniformly distributed. The two 64-bit halves of the UUID serve directly as the two base
+hashes for double hashing: probing needs no hashing and no byte-buffer allocations.
+"""
+
+import math
+import uuid
+
+_MASK_64 = (1 << 64) - 1
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter answering "definitely absent" or "possibly present"."""
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01):
+        self.capacity = max(1, capacity)
+        self.false_positive_rate = false_positive_rate
+        self.num_bits = max(
+            64, math.ceil(-self.capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        )
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    @staticmethod
+    def _base_hashes(value: str | uuid.UUID) -> tuple[int, int]:
+        as_int = value.int if isinstance(value, uuid.UUID) else uuid.UUID(value).int
+        # An odd step guarantees the probe sequence does not collapse onto a single bit.
+        return as_int & _MASK_64, (as_int >> 64) | 1
+
+    def add(self, value: str | uuid.UUID) -> None:
+        h1, h2 = self._base_hashes(value)
+        for i in range(self.num_hashes):
+            bit = (h1 + i * h2) % self.num_bits
+            self._bits[bit >> 3] |= 1 << (bit & 7)
+        self._count += 1
+
+    def __contains__(self, value: str | uuid.UUID) -> bool:
+        try:
+            h1, h2 = self._base_hashes(value)
+        except (ValueError, AttributeError, TypeError):
+            return False
+        for i in range(self.num_hashes):
+            bit = (h1 + i * h2) % self.num_bits
+            if not self._bits[bit >> 3] & (1 << (bit & 7)):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        """Number of values added (duplicates included)."""
+        return self._count
+
+    @property
+    def is_saturated(self) -> bool:
+        """True once more values were added than the filter was sized for."""
+        return self._count > self.capacity
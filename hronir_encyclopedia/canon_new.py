@@ -1,6 +1,9 @@
 import math
 from typing import Any
 
+import numpy as np
+
+from .compact_graph import ROOT_ID, CompactGraph
 from .models import Path as PathModel
 from .storage import DataManager
 
@@ -10,10 +13,9 @@ def get_all_paths_graph(dm: DataManager) -> dict[str, list[PathModel]]:
     Retrieves all paths and builds an adjacency list (parent_uuid -> list of child paths).
     parent_uuid is the hrönir UUID of the predecessor.
     """
-    paths = dm.get_all_paths()
     graph: dict[str, list[PathModel]] = {}
 
-    for path in paths:
+    for path in dm.iter_all_paths():
         # Normalize parent UUID (handle None/empty for root)
         parent = str(path.prev_uuid) if path.prev_uuid else "root"
         if parent not in graph:
@@ -23,110 +25,80 @@ def get_all_paths_graph(dm: DataManager) -> dict[str, list[PathModel]]:
     return graph
 
 
+def _load_graph(dm: DataManager) -> CompactGraph:
+    return CompactGraph.from_frames(dm.iter_path_columns())
+
+
+def _influence_scores(graph: CompactGraph) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-node (score, continuations) arrays.
+    Influence(H) = 1 + sqrt(count(children of H)); Score(H) = Sum(Influence(Child)).
+    """
+    continuations = graph.out_degrees()
+    influence = 1.0 + np.sqrt(continuations)
+    scores = np.bincount(graph.sources, weights=influence[graph.targets], minlength=graph.num_nodes)
+    return scores, continuations
+
+
 def calculate_canonical_path(dm: DataManager) -> list[dict[str, Any]]:
     """
     Calculates the canonical path using Quadratic Influence.
     Returns a list of dicts with {'position': int, 'path_uuid': str, 'hrönir_uuid': str}.
     """
-    paths = dm.get_all_paths()
-
-    if not paths:
+    graph = _load_graph(dm)
+    if graph.num_edges == 0:
         return []
 
-    # Map hrönir_uuid -> Path object (to find the path that introduced a hrönir)
-    hronir_to_path: dict[str, PathModel] = {}
-    for p in paths:
-        hronir_to_path[str(p.uuid)] = p
-
-    # Adjacency list: predecessor_hronir_uuid -> List[PathModel]
-    # Key "root" for position 0 (where prev_uuid is None)
-    graph: dict[str, list[PathModel]] = {}
-    for p in paths:
-        prev = str(p.prev_uuid) if p.prev_uuid else "root"
-        if prev not in graph:
-            graph[prev] = []
-        graph[prev].append(p)
-
-    # Calculate influence for every hrönir
-    # Influence(H) = 1 + sqrt(count(children of H))
-    influence_map: dict[str, float] = {}
-
-    # We calculate influence for every hrönir known (those introduced by paths).
-    for h_uuid in hronir_to_path.keys():
-        children = graph.get(h_uuid, [])
-        influence_map[h_uuid] = 1.0 + math.sqrt(len(children))
+    scores, continuations = _influence_scores(graph)
 
     # Traverse from root
     canonical_chain = []
-    current_predecessor = "root"
-
-    while True:
-        candidates = graph.get(current_predecessor, [])
-        if not candidates:
+    current = ROOT_ID
+    visited = set()
+    while current not in visited:
+        visited.add(current)
+        candidates = graph.out_edges(current)
+        if not len(candidates):
             break
 
-        best_candidate = None
-        best_score = -1.0
-
-        # Determine the winner among candidates
-        # Score(Candidate) = Sum( Influence(Child) ) for all Child of Candidate
-        for candidate in candidates:
-            candidate_hronir = str(candidate.uuid)
-
-            # Children of this candidate
-            children_paths = graph.get(candidate_hronir, [])
-
-            score = 0.0
-            # If a candidate has no children, its score is 0 based on children.
-            # However, we need a base score or just rely on influence being 1.0 (from empty children).
-            # If influence_map calculation assumes 1.0 + sqrt(0) = 1.0, then a leaf has influence 1.0.
-            # But here we are summing influence of children.
-            # If no children, sum is 0.
-            # If all candidates are leaves (frontier), all scores are 0.
-            # We need a tie-breaker or base score.
-            # Let's say Score = Sum(Influence(Children)). If 0, use 0.
-
-            for child_path in children_paths:
-                child_hronir = str(child_path.uuid)
-                weight = influence_map.get(child_hronir, 1.0)
-                score += weight
-
-            # Apply tie-breaking logic
-            is_better = False
-            if best_candidate is None:
-                is_better = True
-            elif score > best_score:
-                is_better = True
-            elif score == best_score:
-                # Tie-breaker 1: Raw count of children (popularity)
-                if len(children_paths) > len(graph.get(str(best_candidate.uuid), [])):
-                    is_better = True
-                elif len(children_paths) == len(graph.get(str(best_candidate.uuid), [])):
-                    # Tie-breaker 2: Deterministic UUID string comparison (lexicographical asc)
-                    # Or consistent creation order if available (timestamp?) - Path doesn't have timestamp.
-                    # UUID is random but stable.
-                    if str(candidate.path_uuid) < str(best_candidate.path_uuid):
-                        is_better = True
-
-            if is_better:
-                best_score = score
-                best_candidate = candidate
-
-        if best_candidate:
-            canonical_chain.append(
-                {
-                    "position": best_candidate.position,
-                    "path_uuid": str(best_candidate.path_uuid),
-                    "hrönir_uuid": str(best_candidate.uuid),
-                }
-            )
-            current_predecessor = str(best_candidate.uuid)
-        else:
-            break
+        # Highest score wins; ties go to more continuations (popularity), then to the
+        # lowest path_uuid. Out-edges are already ordered by path_uuid and lexsort is
+        # stable, so the first entry is the winner.
+        candidate_hronirs = graph.targets[candidates]
+        ranking = np.lexsort((-continuations[candidate_hronirs], -scores[candidate_hronirs]))
+        best = int(candidates[ranking[0]])
+        current = int(graph.targets[best])
+        canonical_chain.append(
+            {
+                "position": int(graph.positions[best]),
+                "path_uuid": graph.path_uuid(best),
+                "hrönir_uuid": graph.node_uuid(current),
+            }
+        )
 
     return canonical_chain
 
 
+def resolve_target_predecessor(
+    dm: DataManager, position: int, predecessor_uuid: str | None = None
+) -> str | None:
+    """
+    Returns the predecessor whose candidates are ranked ("root" for position 0).
+    Without an explicit predecessor, the canonical hrönir at position - 1 is used, which
+    walks the whole graph: resolve it once and pass it on when fetching several pages.
+    """
+    if predecessor_uuid:
+        return predecessor_uuid
+    if position == 0:
+        return "root"
+
+    # Infer from canonical path
+    canonical_chain = calculate_canonical_path(dm)
+    # Find entry for position - 1
+    prev_entry = next((e for e in canonical_chain if e["position"] == position - 1), None)
+    return prev_entry["hrönir_uuid"] if prev_entry else None
+
+
 def get_candidates_with_scores(
     dm: DataManager, position: int, predecessor_uuid: str | None = None
 ) -> list[dict[str, Any]]:
@@ -134,68 +106,105 @@ def get_candidates_with_scores(
     Returns candidates for a given position/predecessor with their scores.
     Useful for 'ranking' command.
     """
-    paths = dm.get_all_paths()
-    hronir_to_path = {str(p.uuid): p for p in paths}
-
-    # Build graph
-    graph: dict[str, list[PathModel]] = {}
-    for p in paths:
-        prev = str(p.prev_uuid) if p.prev_uuid else "root"
-        if prev not in graph:
-            graph[prev] = []
-        graph[prev].append(p)
-
-    # Calculate influence map
-    influence_map: dict[str, float] = {}
-    for h_uuid in hronir_to_path.keys():
-        children = graph.get(h_uuid, [])
-        influence_map[h_uuid] = 1.0 + math.sqrt(len(children))
-
     # Determine target predecessor.
-    target_predecessor = predecessor_uuid
-
-    if not target_predecessor:
-        if position == 0:
-            target_predecessor = "root"
-        else:
-            # Infer from canonical path
-            canonical_chain = calculate_canonical_path(dm)
-            # Find entry for position - 1
-            prev_entry = next((e for e in canonical_chain if e["position"] == position - 1), None)
-            if prev_entry:
-                target_predecessor = prev_entry["hrönir_uuid"]
-            else:
-                # Cannot determine predecessor
-                return []
-
-    # If predecessor is not "root" and not in graph, check if it exists as a hrönir
-    # (it might be a leaf node, so it won't be a key in graph if we iterate keys, but here we used prev_uuid as keys).
-    # Wait, graph keys are PARENTS. So if predecessor is a valid parent, it should be in graph if it has children.
-    # If it has no children, candidates list is empty.
-
-    candidates = graph.get(target_predecessor, [])
+    target_predecessor = resolve_target_predecessor(dm, position, predecessor_uuid)
+    if target_predecessor is None:
+        # Cannot determine predecessor
+        return []
+
+    graph = _load_graph(dm)
+    node = ROOT_ID if target_predecessor == "root" else graph.node_id(target_predecessor)
+    if node is None:
+        # Unknown predecessor, so no candidates.
+        return []
 
+    scores, continuations = _influence_scores(graph)
     results = []
-    for candidate in candidates:
-        candidate_hronir = str(candidate.uuid)
-        children_paths = graph.get(candidate_hronir, [])
+    for edge in graph.out_edges(node).tolist():
+        candidate = int(graph.targets[edge])
+        results.append(
+            {
+                "path_uuid": graph.path_uuid(edge),
+                "hrönir_uuid": graph.node_uuid(candidate),
+                "score": float(scores[candidate]),
+                "continuations": int(continuations[candidate]),
+            }
+        )
+
+    # Sort by score (desc), continuations (desc), path_uuid (asc)
+    results.sort(key=lambda x: (-x["score"], -x["continuations"], x["path_uuid"]))
+
+    return results
+
 
+def get_top_candidates(
+    dm: DataManager, position: int, predecessor_uuid: str | None = None, limit: int = 10
+) -> list[dict[str, Any]]:
+    """
+    The first `limit` entries of get_candidates_with_scores, ranked by a single bounded
+    query instead of scoring the whole graph.
+    """
+    target_predecessor = resolve_target_predecessor(dm, position, predecessor_uuid)
+    if target_predecessor is None:
+        return []
+    prev_uuid = "" if target_predecessor == "root" else target_predecessor
+    return dm.get_top_candidates(position, prev_uuid, limit)
+
+
+def get_candidates_page_with_scores(
+    dm: DataManager,
+    position: int,
+    predecessor_uuid: str | None = None,
+    after_path_uuid: str | None = None,
+    limit: int = 50,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """
+    Keyset-paginated variant of get_candidates_with_scores.
+    Only the candidates of one page, their continuations and the continuations' child
+    counts are loaded, so memory and latency are bounded by `limit`, not by the position size.
+    Pages are ordered by path_uuid, not by score: together they cover every candidate, but
+    the first page is not the top of the ranking (use get_candidates_with_scores for that).
+    Within a page results are sorted like the full ranking. Pass the predecessor returned by
+    resolve_target_predecessor so that later pages skip the canonical-path walk.
+    Returns (results, next_after_path_uuid); the cursor is None on the last page.
+    """
+    target_predecessor = resolve_target_predecessor(dm, position, predecessor_uuid)
+    if target_predecessor is None:
+        return [], None
+
+    page = dm.get_paths_by_position_page(
+        position,
+        after_path_uuid=after_path_uuid,
+        limit=limit,
+        prev_uuid="" if target_predecessor == "root" else target_predecessor,
+    )
+    if not page:
+        return [], None
+
+    children_paths = dm.get_paths_by_prev_uuids([str(p.uuid) for p in page])
+    children_by_parent: dict[str, list[PathModel]] = {}
+    for child in children_paths:
+        children_by_parent.setdefault(str(child.prev_uuid), []).append(child)
+    grandchildren_counts = dm.count_paths_by_prev_uuids([str(c.uuid) for c in children_paths])
+
+    results = []
+    for candidate in page:
+        candidate_children = children_by_parent.get(str(candidate.uuid), [])
         score = 0.0
-        for child_path in children_paths:
-            child_hronir = str(child_path.uuid)
-            weight = influence_map.get(child_hronir, 1.0)
-            score += weight
+        for child_path in candidate_children:
+            # Same weight as influence_map: 1 + sqrt(continuations of the child)
+            score += 1.0 + math.sqrt(grandchildren_counts.get(str(child_path.uuid), 0))
 
         results.append(
             {
                 "path_uuid": str(candidate.path_uuid),
                 "hrönir_uuid": str(candidate.uuid),
                 "score": score,
-                "continuations": len(children_paths),
+                "continuations": len(candidate_children),
             }
         )
 
-    # Sort by score (desc), continuations (desc), path_uuid (asc)
     results.sort(key=lambda x: (-x["score"], -x["continuations"], x["path_uuid"]))
 
-    return results
+    next_after = str(page[-1].path_uuid) if len(page) == limit else None
+    return results, next_after
@@ -0,0 +1,214 @@
+"""
+Change-data-capture feed for the storage layer.
+
+Every row inserted into paths, hronirs or transactions is recorded in a change_log table
+under a monotonically increasing sequence number, right after the insert (inside the same
+transaction for bulk writes). In-process subscribers receive the events in batches, so
+derived structures (caches, canon state, indexes, metrics) can update incrementally
+instead of rescanning. Subscribers that were not running can catch up from the log with
+changes_since(). Clearing the paths table records one "delete" event per removed path, so
+caches built from the paths know to start over.
+
+The log is pruned as it is saved: only the last CHANGE_LOG_RETENTION events are kept, plus
+whatever a persisted consumer (the subtree statistics) has not applied yet. Catching up
+from before the pruned range raises ChangeLogPrunedError; rebuild from the tables instead.
+"""
+
+import datetime
+import logging
+import threading
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+CHANGE_LOG_RETENTION = 10_000
+
+
+class ChangeLogPrunedError(ValueError):
+    """The requested changes are older than the pruned part of the change log."""
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """
+    One recorded change. `operation` is "insert" for a new row, "update" when a hrönir
+    already stored under the same UUID is written again (add_hronir), and "delete" for a
+    path removed by clearing the paths table. Bulk writes only record inserts.
+    """
+
+    seq: int
+    table: str
+    operation: str
+    key: str
+
+
+def ensure_tables(conn: duckdb.DuckDBPyConnection) -> None:
+    conn.execute("CREATE SEQUENCE IF NOT EXISTS change_seq START 1")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS change_log(
+            seq BIGINT PRIMARY KEY,
+            table_name TEXT,
+            operation TEXT,
+            row_key TEXT,
+            recorded_at TIMESTAMP
+        );
+        """
+    )
+    # Highest sequence number removed by prune(); changes_since cannot go below it.
+    conn.execute("CREATE TABLE IF NOT EXISTS change_log_state(pruned_seq BIGINT);")
+
+
+def record(
+    conn: duckdb.DuckDBPyConnection, table: str, keys: list[str], operation: str = "insert"
+) -> list[ChangeEvent]:
+    """Appends one change per key and returns the events in sequence order."""
+    if not keys:
+        return []
+    rows = conn.execute(
+        """
+        INSERT INTO change_log(seq, table_name, operation, row_key, recorded_at)
+        SELECT nextval('change_seq'), ?, ?, key, ?
+        FROM (SELECT UNNEST(?::VARCHAR[]) AS key)
+        RETURNING seq, table_name, operation, row_key
+        """,
+        (table, operation, datetime.datetime.now(datetime.timezone.utc), list(keys)),
+    ).fetchall()
+    return sorted((ChangeEvent(*row) for row in rows), key=lambda event: event.seq)
+
+
+def last_seq(conn: duckdb.DuckDBPyConnection) -> int:
+    """Sequence number of the latest recorded change, or 0 if there is none."""
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+
+
+def pruned_seq(conn: duckdb.DuckDBPyConnection) -> int:
+    """Sequence number up to which the log was pruned, or 0 if it never was."""
+    return conn.execute("SELECT COALESCE(MAX(pruned_seq), 0) FROM change_log_state").fetchone()[0]
+
+
+def prune(conn: duckdb.DuckDBPyConnection, through_seq: int) -> int:
+    """Deletes the changes with seq <= through_seq and returns how many were removed."""
+    if through_seq <= pruned_seq(conn):
+        return 0
+    removed = conn.execute(
+        "DELETE FROM change_log WHERE seq <= ? RETURNING seq", (through_seq,)
+    ).fetchall()
+    conn.execute("DELETE FROM change_log_state")
+    conn.execute("INSERT INTO change_log_state VALUES (?)", (through_seq,))
+    return len(removed)
+
+
+def changes_since(
+    conn: duckdb.DuckDBPyConnection, after_seq: int = 0, limit: int | None = None
+) -> list[ChangeEvent]:
+    """Recorded changes with seq > after_seq, oldest first."""
+    pruned = pruned_seq(conn)
+    if after_seq < pruned:
+        raise ChangeLogPrunedError(
+            f"Changes up to seq {pruned} were pruned from the change log; cannot replay "
+            f"from seq {after_seq}."
+        )
+    query = """
+        SELECT seq, table_name, operation, row_key FROM change_log
+        WHERE seq > ? ORDER BY seq
+    """
+    params: list = [after_seq]
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    return [ChangeEvent(*row) for row in conn.execute(query, params).fetchall()]
+
+
+class Subscription:
+    """Handle returned by ChangeFeed.subscribe; call cancel() to stop receiving events."""
+
+    def __init__(
+        self,
+        feed: "ChangeFeed",
+        callback: Callable[[list[ChangeEvent]], None],
+        tables: frozenset[str] | None,
+    ):
+        self._feed = feed
+        self.callback = callback
+        self.tables = tables
+        self.last_seq = 0
+
+    def deliver(self, events: list[ChangeEvent]) -> None:
+        events = [
+            e
+            for e in events
+            if e.seq > self.last_seq and (self.tables is None or e.table in self.tables)
+        ]
+        if not events:
+            return
+        try:
+            self.callback(events)
+        except Exception:
+            # A failing subscriber must not break writes or starve the others.
+            logger.exception(
+                "Change feed subscriber failed; events up to %s skipped.", events[-1].seq
+            )
+        self.last_seq = events[-1].seq
+
+    def cancel(self) -> None:
+        self._feed.unsubscribe(self)
+
+
+class ChangeFeed:
+    """Buffers committed change events and hands them to subscribers in batches."""
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._subscriptions: list[Subscription] = []
+        self._pending: list[ChangeEvent] = []
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self,
+        callback: Callable[[list[ChangeEvent]], None],
+        tables: Iterable[str] | None = None,
+        backlog: list[ChangeEvent] | None = None,
+    ) -> Subscription:
+        """
+        Registers a callback receiving lists of events. `tables` restricts the feed to
+        some tables; `backlog` (from changes_since) is delivered first to catch up.
+        """
+        subscription = Subscription(self, callback, frozenset(tables) if tables else None)
+        if backlog:
+            subscription.deliver(backlog)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def publish(self, events: list[ChangeEvent]) -> None:
+        """Queues events; a full buffer is delivered right away."""
+        if not events:
+            return
+        with self._lock:
+            self._pending.extend(events)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        """Delivers every queued event."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            subscriptions = list(self._subscriptions)
+        if not pending:
+            return
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start : start + self.batch_size]
+            for subscription in subscriptions:
+                subscription.deliver(batch)
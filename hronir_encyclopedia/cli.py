@@ -9,7 +9,13 @@ import typer
 
 from . import canon_new
 from . import storage as storage_module
-from .commands.store import store_command, synthesize_command, validate_command
+from .commands.store import (
+    store_command,
+    store_many_command,
+    synthesize_command,
+    validate_command,
+)
+from .graph_export import EXPORT_FORMATS
 
 logger = logging.getLogger(__name__)
 
@@ -31,11 +37,64 @@ except ImportError:
 
 # Register top-level commands from store module
 app.command(name="store", help="Store a chapter and link it to a predecessor.")(store_command)
+app.command(name="store-many", help="Store a directory or manifest of chapters in one commit.")(
+    store_many_command
+)
 app.command(name="synthesize", help="Generate and store a new chapter using AI.")(
     synthesize_command
 )
 app.command(name="validate", help="Validate a chapter file.")(validate_command)
 
+graph_app = typer.Typer(help="Narrative graph tools.", no_args_is_help=True)
+app.add_typer(graph_app, name="graph")
+
+
+@graph_app.command(
+    "export",
+    help="Stream the narrative graph to GraphML, DOT or a Parquet edge list.",
+)
+def graph_export(
+    output: Annotated[Path, typer.Argument(help="File to write.")],
+    fmt: Annotated[
+        str | None,
+        typer.Option(
+            "--format",
+            help=f"One of {', '.join(EXPORT_FORMATS)}. Defaults to the output file suffix.",
+        ),
+    ] = None,
+    min_position: Annotated[
+        int | None, typer.Option(help="Only export paths at this position or later.")
+    ] = None,
+    max_position: Annotated[
+        int | None, typer.Option(help="Only export paths at this position or earlier.")
+    ] = None,
+    canonical_radius: Annotated[
+        int | None,
+        typer.Option(help="Only export hrönirs within this many paths of the canonical path."),
+    ] = None,
+):
+    fmt = (fmt or output.suffix.lstrip(".")).lower()
+    if fmt == "gv":
+        fmt = "dot"
+    if fmt not in EXPORT_FORMATS:
+        typer.secho(
+            f"Unknown export format '{fmt}'. Use --format with one of {', '.join(EXPORT_FORMATS)}.",
+            fg=typer.colors.RED,
+            err=True,
+        )
+        raise typer.Exit(code=1)
+
+    dm = storage_module.get_data_manager()
+    if not dm._initialized:
+        dm.initialize_and_load()
+
+    around = None
+    if canonical_radius is not None:
+        around = [entry["hrönir_uuid"] for entry in canon_new.calculate_canonical_path(dm)]
+    export = dm.graph_export(min_position, max_position, around, canonical_radius or 0)
+    edges = export.write(output, fmt)
+    typer.echo(f"Exported {edges} paths to {output} ({fmt}).")
+
 
 @app.command(
     "recover-canon",
@@ -101,7 +160,7 @@ def init_test(
     h0_uuid, h1_uuid = uuid.UUID(h0_uuid_str), uuid.UUID(h1_uuid_str)
     from .models import Path as PathModel
 
-    data_manager = storage_module.DataManager()
+    data_manager = storage_module.get_data_manager()
     if not data_manager._initialized:  # Ensure DM is loaded
         data_manager.initialize_and_load()
 
@@ -127,7 +186,7 @@ def init_test(
 
 @app.command(help="Display the canonical path.")
 def status():
-    dm = storage_module.DataManager()
+    dm = storage_module.get_data_manager()
     if not dm._initialized:
         dm.initialize_and_load()
 
@@ -148,12 +207,34 @@ def status():
 def ranking(
     position: Annotated[int, typer.Argument(help="The chapter position to rank.")],
     predecessor: Annotated[str, typer.Option(help="Filter by predecessor hrönir UUID.")] = None,
+    limit: Annotated[int, typer.Option(help="Show only the top N candidates.")] = None,
+    page_size: Annotated[
+        int,
+        typer.Option(
+            help="Browse candidates in pages of this size, ordered by path UUID (not by score)."
+        ),
+    ] = None,
+    after: Annotated[
+        str, typer.Option(help="Page cursor: show candidates after this path UUID.")
+    ] = None,
 ):
-    dm = storage_module.DataManager()
+    dm = storage_module.get_data_manager()
     if not dm._initialized:
         dm.initialize_and_load()
 
-    candidates = canon_new.get_candidates_with_scores(dm, position, predecessor)
+    next_after = None
+    if page_size is not None or after is not None:
+        predecessor = canon_new.resolve_target_predecessor(dm, position, predecessor)
+        if predecessor is None:
+            candidates = []
+        else:
+            candidates, next_after = canon_new.get_candidates_page_with_scores(
+                dm, position, predecessor, after_path_uuid=after, limit=page_size or 50
+            )
+    else:
+        candidates = canon_new.get_candidates_with_scores(dm, position, predecessor)
+        if limit is not None:
+            candidates = candidates[:limit]
 
     if not candidates:
         typer.echo(f"No candidates found for position {position}.")
@@ -173,6 +254,83 @@ def ranking(
 
     df = pd.DataFrame(table_data)
     typer.echo(df.to_string(index=False))
+    if next_after:
+        typer.echo(
+            f"Next page: --predecessor {predecessor} --page-size {page_size or 50} "
+            f"--after {next_after}"
+        )
+
+
+@app.command(help="Full-text search over hrönir contents (BM25 ranked).")
+def search(
+    query: Annotated[str, typer.Argument(help="Free-text query.")],
+    limit: Annotated[int, typer.Option(help="Maximum number of results.")] = 10,
+):
+    dm = storage_module.get_data_manager()
+    if not dm._initialized:
+        dm.initialize_and_load()
+
+    results = dm.search_hrönirs(query, limit=limit)
+    dm.save_all_data()
+    if not results:
+        typer.echo(f"No hrönirs match '{query}'.")
+        return
+
+    for hronir_uuid, score in results:
+        content = dm.get_hrönir_content(hronir_uuid) or ""
+        snippet = " ".join(content.split())[:80]
+        typer.echo(f"{score:6.2f}  {hronir_uuid}  {snippet}")
+
+
+@app.command(help="Find clusters of near-duplicate hrönirs across the library (MinHash/LSH).")
+def dedupe(
+    threshold: Annotated[
+        float, typer.Option(help="Minimum estimated Jaccard similarity of word shingles.")
+    ] = 0.8,
+):
+    dm = storage_module.get_data_manager()
+    if not dm._initialized:
+        dm.initialize_and_load()
+
+    clusters = dm.find_near_duplicate_clusters(threshold=threshold)
+    dm.save_all_data()
+    if not clusters:
+        typer.echo("No near-duplicate hrönirs found.")
+        return
+
+    typer.echo(f"Found {len(clusters)} near-duplicate clusters:")
+    for i, members in enumerate(clusters, start=1):
+        typer.echo(f"Cluster {i} ({len(members)} hrönirs):")
+        for hronir_uuid in members:
+            typer.echo(f"  - {hronir_uuid}")
+
+
+@app.command(help="Move settled positions far behind the canonical tip into Parquet cold storage.")
+def tier(
+    keep_positions: Annotated[
+        int, typer.Option(help="Number of positions behind the canonical tip to keep hot.")
+    ] = 20,
+):
+    dm = storage_module.get_data_manager()
+    if not dm._initialized:
+        dm.initialize_and_load()
+
+    canonical_chain = canon_new.calculate_canonical_path(dm)
+    if not canonical_chain:
+        typer.echo("No canonical path found. Nothing to tier.")
+        return
+
+    tip_position = canonical_chain[-1]["position"]
+    before_position = tip_position - keep_positions
+    if before_position <= 0:
+        typer.echo(f"Canonical tip is at position {tip_position}. Nothing is settled yet.")
+        return
+
+    moved = dm.archive_settled_positions(before_position)
+    typer.echo(
+        f"Moved {moved['paths']} paths and {moved['hronirs']} hrönirs below position "
+        f"{before_position} to cold storage."
+    )
 
 
 @app.command(help="Validate and repair storage, audit narrative CSVs.")
@@ -188,7 +346,7 @@ def clean(
         bool, typer.Option("--git", help="Stage deleted files in Git.")
     ] = False,
 ):
-    dm = storage_module.DataManager()
+    dm = storage_module.get_data_manager()
     if not dm._initialized:
         dm.initialize_and_load()
 
@@ -270,7 +428,7 @@ def main_callback(ctx: typer.Context):
     )
     logger.debug("CLI main_callback: Initializing DataManager...")
     try:
-        data_manager = storage_module.DataManager()  # Use the alias
+        data_manager = storage_module.get_data_manager()  # Use the alias
         if not hasattr(data_manager, "_initialized") or not data_manager._initialized:
             logger.info("DataManager not initialized in callback. Calling initialize_and_load().")
             data_manager.initialize_and_load()
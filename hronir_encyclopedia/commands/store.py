@@ -1,5 +1,7 @@
+import csv
 import logging
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Annotated
 
@@ -8,10 +10,24 @@ import typer
 from .. import gemini_util, storage
 from ..models import Path as PathModel
 from ..models import Transaction, TransactionContent
+from ..topological_order import NarrativeCycleError
 
 logger = logging.getLogger(__name__)
 
 
+def _create_path_transaction(path_uuid: uuid.UUID, tx_content: TransactionContent) -> Transaction:
+    """
+    Ledger entry for a new path. Transaction UUIDs must be UUIDv5, so the UUID is derived
+    from the path: re-recording the same path yields the same transaction.
+    """
+    return Transaction(
+        uuid=uuid.uuid5(storage.UUID_NAMESPACE, f"create_path:{path_uuid}"),
+        prev_uuid=None,  # Simplified: not strictly chaining hashes for now, or fetch last tx?
+        # Ideally we'd link to previous transaction for a proper ledger, but simpler is fine for now.
+        content=tx_content,
+    )
+
+
 # Helper function (internal)
 def _create_path_for_hronir(
     dm: storage.DataManager,
@@ -32,15 +48,10 @@ def _create_path_for_hronir(
         # Determine position if not provided
         if position is None:
             # Find the path that introduced the predecessor to get its position
-            # We search all paths where uuid == predecessor_uuid
-            parent_path = None
-            for p in dm.get_all_paths():
-                if str(p.uuid) == predecessor_uuid:
-                    parent_path = p
-                    break
-
-            if parent_path:
-                position = parent_path.position + 1
+            parent_paths = dm.get_paths_by_hronir_uuid(predecessor_uuid)
+
+            if parent_paths:
+                position = parent_paths[0].position + 1
             else:
                 typer.secho(
                     f"Error: Could not determine position from predecessor {predecessor_uuid}. Please specify --position.",
@@ -81,13 +92,7 @@ def _create_path_for_hronir(
         details={"position": position, "predecessor": predecessor_uuid},
     )
 
-    transaction = Transaction(
-        uuid=uuid.uuid4(),
-        prev_uuid=None,  # Simplified: not strictly chaining hashes for now, or fetch last tx?
-        # Ideally we'd link to previous transaction for a proper ledger, but simpler is fine for now.
-        content=tx_content,
-    )
-    dm.add_transaction(transaction)
+    dm.add_transaction(_create_path_transaction(path_uuid_obj, tx_content))
 
     dm.save_all_data()
     typer.echo(
@@ -120,7 +125,7 @@ def store_command(
         typer.echo(f"Stored hrönir content: {hronir_uuid}")
 
         # Create Path
-        dm = storage.DataManager()
+        dm = storage.get_data_manager()
         _create_path_for_hronir(dm, hronir_uuid, predecessor, position)
 
     except Exception as e:
@@ -129,6 +134,192 @@ def store_command(
         raise typer.Exit(1)
 
 
+def _read_store_many_entries(
+    source: Path, predecessor: str | None, errors: list[str]
+) -> list[tuple[Path, str | None]]:
+    """
+    (chapter file, predecessor reference) pairs from a directory or a manifest CSV.
+    Problems with the manifest itself are appended to `errors`.
+    """
+    if source.is_dir():
+        return [(chapter, predecessor) for chapter in sorted(source.glob("*.md"))]
+
+    entries = []
+    try:
+        with open(source, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            if "file" not in (reader.fieldnames or []):
+                errors.append(f"{source}: manifest has no 'file' column.")
+                return []
+            for line, row in enumerate(reader, start=2):
+                file_name = (row["file"] or "").strip()
+                if not file_name:
+                    errors.append(f"{source}:{line}: no chapter file given.")
+                    continue
+                chapter = (source.parent / file_name).resolve()
+                row_predecessor = (row.get("predecessor") or "").strip() or predecessor
+                entries.append((chapter, row_predecessor))
+    except UnicodeDecodeError:
+        errors.append(f"{source}: manifest is not valid UTF-8 text.")
+        return []
+    return entries
+
+
+def _hash_chapter(chapter: Path) -> tuple[str, str] | str:
+    """(text, hrönir UUID) of a chapter, or the reason it cannot be read."""
+    try:
+        text = chapter.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return f"{chapter}: file not found."
+    except UnicodeDecodeError:
+        return f"{chapter}: not valid UTF-8 text."
+    except OSError as e:
+        return f"{chapter}: {e.strerror or e}"
+    return text, storage.compute_hronir_uuid(text)
+
+
+def store_many_command(
+    source: Annotated[
+        Path,
+        typer.Argument(
+            exists=True,
+            readable=True,
+            help="Directory of .md chapters, or a CSV manifest with file,predecessor columns.",
+        ),
+    ],
+    predecessor: Annotated[
+        str | None,
+        typer.Option(
+            "--predecessor",
+            help="Predecessor hrönir UUID for every chapter (manifest rows may override it).",
+        ),
+    ] = None,
+    workers: Annotated[int, typer.Option(help="Threads used to read and hash chapters.")] = 8,
+):
+    """
+    Store many chapters in one commit. A manifest predecessor may be a hrönir UUID or
+    another chapter file of the same manifest.
+    """
+    # Every problem is collected and reported together; any of them stores nothing.
+    errors: list[str] = []
+    entries = _read_store_many_entries(source, predecessor, errors)
+    if not entries and not errors:
+        typer.echo(f"No chapters found in {source}.")
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = list(executor.map(_hash_chapter, [chapter for chapter, _ in entries]))
+    hashed: list[tuple[Path, str | None, str, str]] = []
+    for (chapter, reference), result in zip(entries, results, strict=True):
+        if isinstance(result, str):
+            errors.append(result)
+        else:
+            hashed.append((chapter, reference, *result))
+    uuid_by_file = {chapter.resolve(): hronir_uuid for chapter, _, _, hronir_uuid in hashed}
+
+    # Predecessors are either UUIDs or files of this batch. A chapter (or identical text)
+    # may be linked to several predecessors; each (hrönir, predecessor) link is a path.
+    links: list[tuple[str, str | None]] = []
+    for chapter, reference, _, hronir_uuid in hashed:
+        if not reference:
+            links.append((hronir_uuid, None))
+            continue
+        try:
+            resolved = str(uuid.UUID(reference))
+        except ValueError:
+            resolved = uuid_by_file.get((source.parent / reference).resolve())
+            if resolved is None:
+                errors.append(f"{chapter}: unknown predecessor {reference}")
+                continue
+        links.append((hronir_uuid, resolved))
+    links = list(dict.fromkeys(links))
+    predecessors_of: dict[str, list[str | None]] = {}
+    for hronir_uuid, prev in links:
+        predecessors_of.setdefault(hronir_uuid, []).append(prev)
+
+    dm = storage.get_data_manager()
+    external = {prev for _, prev in links if prev and prev not in predecessors_of}
+    existing = dm.existing_hrönir_uuids(external)
+    for missing in sorted(external - existing):
+        errors.append(f"Predecessor hrönir {missing} not found.")
+    known_positions = dm.get_min_positions_by_hronir_uuids(external & existing)
+
+    positions: dict[str, int] = {}
+
+    def link_position(prev: str | None, seen: frozenset) -> int | None:
+        """Position of a path continuing `prev`."""
+        if prev is None:
+            return 0
+        if prev in known_positions:
+            return known_positions[prev] + 1
+        if prev in predecessors_of:
+            prev_position = resolve_position(prev, seen)
+            return None if prev_position is None else prev_position + 1
+        return None
+
+    def resolve_position(hronir_uuid: str, seen: frozenset = frozenset()) -> int | None:
+        """Lowest position of a batch hrönir, like get_min_positions_by_hronir_uuids."""
+        if hronir_uuid in positions:
+            return positions[hronir_uuid]
+        if hronir_uuid in seen:
+            return None  # predecessor cycle inside the manifest
+        candidates = [
+            position
+            for prev in predecessors_of[hronir_uuid]
+            if (position := link_position(prev, seen | {hronir_uuid})) is not None
+        ]
+        if not candidates:
+            return None
+        positions[hronir_uuid] = min(candidates)
+        return positions[hronir_uuid]
+
+    paths, transactions = [], []
+    path_uuids = set()
+    for hronir_uuid, prev in links:
+        position = link_position(prev, frozenset({hronir_uuid}))
+        if position is None:
+            if prev in existing or prev in predecessors_of:
+                errors.append(f"Could not determine position of {hronir_uuid} from {prev}.")
+            continue
+        path_uuid = storage.compute_narrative_path_uuid(position, prev or "", hronir_uuid)
+        if path_uuid in path_uuids:
+            continue
+        path_uuids.add(path_uuid)
+        paths.append(
+            PathModel(
+                path_uuid=path_uuid,
+                position=position,
+                prev_uuid=uuid.UUID(prev) if prev else None,
+                uuid=uuid.UUID(hronir_uuid),
+            )
+        )
+        tx_content = TransactionContent(
+            action="create_path",
+            path_uuid=path_uuid,
+            hrönir_uuid=uuid.UUID(hronir_uuid),
+            details={"position": position, "predecessor": prev},
+        )
+        transactions.append(_create_path_transaction(path_uuid, tx_content))
+
+    if errors:
+        for error in errors:
+            typer.secho(f"Error: {error}", fg=typer.colors.RED)
+        typer.secho("Nothing was stored.", fg=typer.colors.RED)
+        raise typer.Exit(1)
+
+    hronirs = list({hronir_uuid: text for _, _, text, hronir_uuid in hashed}.items())
+    try:
+        inserted = dm.bulk_store(hronirs, paths, transactions)
+    except NarrativeCycleError as e:
+        typer.secho(f"Error: {e}", fg=typer.colors.RED)
+        typer.secho("Nothing was stored.", fg=typer.colors.RED)
+        raise typer.Exit(1)
+    typer.echo(
+        f"Stored {inserted['hronirs']} new hrönirs ({len(hronirs) - inserted['hronirs']} "
+        f"already present) and {inserted['paths']} new paths from {len(entries)} chapters."
+    )
+
+
 def synthesize_command(
     prev: Annotated[str, typer.Option("--prev", help="UUID of the predecessor hrönir.")],
     position: Annotated[
@@ -140,7 +331,7 @@ def synthesize_command(
     try:
         typer.echo(f"Synthesizing new chapter from predecessor {prev}...")
 
-        dm = storage.DataManager()
+        dm = storage.get_data_manager()
         if not dm.hrönir_exists(prev):
             typer.secho(f"Error: Predecessor hrönir {prev} not found.", fg=typer.colors.RED)
             raise typer.Exit(1)
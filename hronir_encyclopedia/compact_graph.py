@@ -0,0 +1,372 @@
+"""
+Array-backed narrative graph.
+
+Hrönir UUIDs are interned to int32 node ids and the paths become edges stored in CSR form:
+per-node offsets into a target array, with the path UUID and position of every edge in
+parallel arrays and a reverse index for walking towards the root. Node 0 is the virtual
+root that position-0 paths hang from; the remaining ids follow the sorted order of the
+16-byte UUIDs, so looking a hrönir up is a binary search rather than a dict of strings.
+A NetworkX DiGraph keyed by UUID strings with one attribute dict per edge costs hundreds
+of bytes per edge; this layout costs a few dozen (see scripts/benchmark_graph.py).
+The arrays can be saved as .npy files and memory-mapped back, so worker processes share one
+read-only copy instead of each rebuilding the graph.
+"""
+
+import json
+import logging
+import uuid
+from collections.abc import Iterable
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from .models import Path as PathModel
+
+logger = logging.getLogger(__name__)
+
+ROOT_NODE = "__ROOT__"
+ROOT_ID = 0
+UUID_DTYPE = np.dtype("V16")
+PATH_FRAME_COLUMNS = ["path_uuid", "position", "prev_uuid", "uuid"]
+
+# Arrays written by CompactGraph.save, one .npy file each; node_uuids doubles as the UUID
+# dictionary (node id = index + 1).
+SNAPSHOT_ARRAYS = (
+    "node_uuids",
+    "sources",
+    "targets",
+    "path_uuids",
+    "positions",
+    "offsets",
+    "in_edge_ids",
+    "in_offsets",
+)
+SNAPSHOT_METADATA_FILE = "graph.json"
+SNAPSHOT_FORMAT_VERSION = 1
+
+UUID_PATTERN = r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+
+
+def valid_uuids(values: Iterable[str]) -> np.ndarray:
+    """Boolean mask of the values that are canonical UUID strings."""
+    return pd.Series(values, dtype=object).str.fullmatch(UUID_PATTERN, na=False).to_numpy(bool)
+
+
+def uuids_to_array(values: Iterable[str]) -> np.ndarray:
+    """
+    Packs canonical UUID strings into 16-byte values. The bytes are big-endian, so they sort
+    exactly like the strings. Raises ValueError if any value is not a canonical UUID.
+    """
+    values = list(values)
+    hex_digits = "".join(values).replace("-", "")
+    if len(hex_digits) != 32 * len(values):
+        raise ValueError("Expected canonical 36-character UUID strings.")
+    return np.frombuffer(bytes.fromhex(hex_digits), dtype=UUID_DTYPE)
+
+
+def drop_malformed_paths(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    The rows of a path column chunk whose path_uuid, uuid and prev_uuid ("" for root paths)
+    are UUIDs. The others are skipped with a warning instead of failing the whole build.
+    """
+    if frame.empty:
+        return frame
+    prev = frame["prev_uuid"].fillna("").to_numpy(dtype=object)
+    valid = (
+        valid_uuids(frame["path_uuid"])
+        & valid_uuids(frame["uuid"])
+        & ((prev == "") | valid_uuids(prev))
+    )
+    if valid.all():
+        return frame
+    logger.warning(
+        "Skipping %d path(s) with malformed UUIDs, e.g. path %r.",
+        int((~valid).sum()),
+        frame["path_uuid"].to_numpy(dtype=object)[~valid][0],
+    )
+    return frame[valid]
+
+
+def path_frame(paths: Iterable[PathModel]) -> pd.DataFrame:
+    """Columnar form of Path models, shaped like DataManager.iter_path_columns chunks."""
+    rows = [
+        (str(p.path_uuid), p.position, str(p.prev_uuid) if p.prev_uuid else "", str(p.uuid))
+        for p in paths
+    ]
+    return pd.DataFrame(rows, columns=PATH_FRAME_COLUMNS)
+
+
+def _ranges(starts: np.ndarray, stops: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(start, stop) for every pair, without a Python loop."""
+    counts = stops - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    shifts = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return np.arange(total, dtype=np.int64) + shifts
+
+
+def read_snapshot_metadata(directory: Path) -> dict:
+    """The graph.json of a saved graph; FileNotFoundError if the save never completed."""
+    return json.loads((directory / SNAPSHOT_METADATA_FILE).read_text())
+
+
+class CompactGraph:
+    """Immutable CSR graph of hrönirs (nodes) and paths (edges)."""
+
+    def __init__(
+        self,
+        node_uuids: np.ndarray,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        path_uuids: np.ndarray,
+        positions: np.ndarray,
+    ):
+        """Edge arrays must be sorted by (source, path_uuid); use the from_* constructors."""
+        self.node_uuids = node_uuids
+        self.sources = sources
+        self.targets = targets
+        self.path_uuids = path_uuids
+        self.positions = positions
+        self.num_nodes = len(node_uuids) + 1
+
+        self.offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=self.num_nodes), out=self.offsets[1:])
+        # Reverse CSR: edge ids grouped by target.
+        self.in_edge_ids = np.argsort(targets, kind="stable").astype(np.int32)
+        self.in_offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(targets, minlength=self.num_nodes), out=self.in_offsets[1:])
+
+    @classmethod
+    def from_frames(cls, frames: Iterable[pd.DataFrame]) -> "CompactGraph":
+        """
+        Builds the graph from path column chunks (see DataManager.iter_path_columns).
+        Rows with malformed UUIDs are skipped (drop_malformed_paths).
+        """
+        path_parts, position_parts, prev_parts, has_prev_parts, cur_parts = [], [], [], [], []
+        for frame in frames:
+            frame = drop_malformed_paths(frame)
+            prev = frame["prev_uuid"].fillna("").to_numpy(dtype=object)
+            has_prev = prev != ""
+            if frame.empty:
+                continue
+            path_parts.append(uuids_to_array(frame["path_uuid"]))
+            position_parts.append(frame["position"].to_numpy(dtype=np.int32))
+            prev_parts.append(uuids_to_array(prev[has_prev]))
+            has_prev_parts.append(has_prev)
+            cur_parts.append(uuids_to_array(frame["uuid"]))
+
+        if not path_parts:
+            empty_uuids = np.zeros(0, dtype=UUID_DTYPE)
+            empty_ids = np.zeros(0, dtype=np.int32)
+            return cls(empty_uuids, empty_ids, empty_ids, empty_uuids, empty_ids)
+
+        path_uuids = np.concatenate(path_parts)
+        positions = np.concatenate(position_parts)
+        cur = np.concatenate(cur_parts)
+        has_prev = np.concatenate(has_prev_parts)
+        num_edges = len(path_uuids)
+
+        node_uuids, inverse = np.unique(np.concatenate([cur, *prev_parts]), return_inverse=True)
+        node_ids = inverse.astype(np.int32) + 1  # 0 is the root
+        targets = node_ids[:num_edges]
+        sources = np.full(num_edges, ROOT_ID, dtype=np.int32)
+        sources[has_prev] = node_ids[num_edges:]
+        return cls._sorted(node_uuids, sources, targets, path_uuids, positions)
+
+    @classmethod
+    def _sorted(
+        cls,
+        node_uuids: np.ndarray,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        path_uuids: np.ndarray,
+        positions: np.ndarray,
+    ) -> "CompactGraph":
+        by_path = np.argsort(path_uuids, kind="stable")
+        order = by_path[np.argsort(sources[by_path], kind="stable")]
+        return cls(node_uuids, sources[order], targets[order], path_uuids[order], positions[order])
+
+    @classmethod
+    def from_paths(cls, paths: Iterable[PathModel]) -> "CompactGraph":
+        return cls.from_frames([path_frame(paths)])
+
+    def with_frame(self, frame: pd.DataFrame) -> "CompactGraph":
+        """
+        A new graph with the paths of a column chunk appended. Only the existing arrays are
+        re-sorted, so the library is not scanned again; paths already present are skipped.
+        """
+        frame = drop_malformed_paths(frame)
+        if frame.empty:
+            return self
+        path_uuids = uuids_to_array(frame["path_uuid"])
+        fresh = ~np.isin(path_uuids, self.path_uuids)
+        if not fresh.any():
+            return self
+        frame = frame[fresh]
+        prev = frame["prev_uuid"].fillna("").to_numpy(dtype=object)
+        has_prev = prev != ""
+        cur = uuids_to_array(frame["uuid"])
+        prev_uuids = uuids_to_array(prev[has_prev])
+
+        node_uuids = np.unique(np.concatenate([self.node_uuids, cur, prev_uuids]))
+        remap = np.zeros(self.num_nodes, dtype=np.int32)
+        remap[1:] = np.searchsorted(node_uuids, self.node_uuids) + 1
+        new_sources = np.full(len(frame), ROOT_ID, dtype=np.int32)
+        new_sources[has_prev] = np.searchsorted(node_uuids, prev_uuids) + 1
+        new_targets = (np.searchsorted(node_uuids, cur) + 1).astype(np.int32)
+        return self._sorted(
+            node_uuids,
+            np.concatenate([remap[self.sources], new_sources]),
+            np.concatenate([remap[self.targets], new_targets]),
+            np.concatenate([self.path_uuids, path_uuids[fresh]]),
+            np.concatenate([self.positions, frame["position"].to_numpy(dtype=np.int32)]),
+        )
+
+    def save(self, directory: Path, **metadata) -> None:
+        """
+        Writes the arrays as .npy files in `directory`, plus graph.json with the counts and
+        any extra metadata. graph.json is written last, so an interrupted save never loads.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / SNAPSHOT_METADATA_FILE).unlink(missing_ok=True)
+        for name in SNAPSHOT_ARRAYS:
+            np.save(directory / f"{name}.npy", getattr(self, name))
+        info = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "num_nodes": self.num_nodes,
+            "num_edges": self.num_edges,
+            **metadata,
+        }
+        (directory / SNAPSHOT_METADATA_FILE).write_text(json.dumps(info, indent=2))
+
+    @classmethod
+    def load(cls, directory: Path, mmap_mode: str | None = "r") -> "CompactGraph":
+        """
+        Opens a graph written by save(). With the default mmap_mode the arrays are mapped
+        read-only instead of read, so processes loading the same snapshot share its pages
+        and nothing is rebuilt.
+        """
+        info = read_snapshot_metadata(directory)
+        if info.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported graph snapshot format in {directory}: {info}")
+        graph = cls.__new__(cls)
+        for name in SNAPSHOT_ARRAYS:
+            setattr(graph, name, np.load(directory / f"{name}.npy", mmap_mode=mmap_mode))
+        graph.num_nodes = len(graph.node_uuids) + 1
+        if graph.num_nodes != info["num_nodes"] or graph.num_edges != info["num_edges"]:
+            raise ValueError(f"Graph snapshot in {directory} does not match its metadata.")
+        return graph
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the graph's arrays."""
+        return sum(getattr(self, name).nbytes for name in SNAPSHOT_ARRAYS)
+
+    # --- Nodes ---
+    def node_id(self, hronir_uuid: str | uuid.UUID) -> int | None:
+        """Id of a hrönir, or None if no path mentions it."""
+        try:
+            key = uuids_to_array([str(uuid.UUID(str(hronir_uuid)))])
+        except ValueError:
+            return None
+        index = int(np.searchsorted(self.node_uuids, key)[0])
+        if index < len(self.node_uuids) and self.node_uuids[index] == key[0]:
+            return index + 1
+        return None
+
+    def node_uuid(self, node: int) -> str:
+        if node == ROOT_ID:
+            return ROOT_NODE
+        return str(uuid.UUID(bytes=self.node_uuids[node - 1].tobytes()))
+
+    def out_degrees(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def in_degrees(self) -> np.ndarray:
+        return np.diff(self.in_offsets)
+
+    # --- Edges ---
+    def out_edges(self, node: int) -> np.ndarray:
+        """Edge ids leaving a node, ordered by path UUID."""
+        return np.arange(self.offsets[node], self.offsets[node + 1])
+
+    def in_edges(self, node: int) -> np.ndarray:
+        return self.in_edge_ids[self.in_offsets[node] : self.in_offsets[node + 1]]
+
+    def successors(self, node: int) -> np.ndarray:
+        return self.targets[self.offsets[node] : self.offsets[node + 1]]
+
+    def predecessors(self, node: int) -> np.ndarray:
+        return self.sources[self.in_edges(node)]
+
+    def path_uuid(self, edge: int) -> str:
+        return str(uuid.UUID(bytes=self.path_uuids[edge].tobytes()))
+
+    # --- Whole-graph queries ---
+    def topological_order(self) -> np.ndarray | None:
+        """
+        Node ids in topological order, or None if the graph has a cycle. Kahn's algorithm,
+        one vectorised step per generation: narrative graphs are shallow (one level per
+        position) and very wide, so each step handles many nodes at once.
+        """
+        remaining = self.in_degrees().copy()
+        frontier = np.flatnonzero(remaining == 0)
+        generations = []
+        while len(frontier):
+            generations.append(frontier)
+            edges = _ranges(self.offsets[frontier], self.offsets[frontier + 1])
+            hit = self.targets[edges]
+            np.subtract.at(remaining, hit, 1)
+            frontier = np.unique(hit[remaining[hit] == 0])
+        order = np.concatenate(generations)
+        return order if len(order) == self.num_nodes else None
+
+    def subtree_stats(self) -> tuple[np.ndarray, np.ndarray, np.ndarray] | None:
+        """
+        Per-node (descendants, max_depth, leaves) arrays, or None if the graph has a cycle.
+        One reverse-topological pass: leaves first, then every node once all the nodes it
+        leads to are done. Counts are per route (see subtree_stats.py).
+        """
+        descendants = np.zeros(self.num_nodes, dtype=np.int64)
+        max_depth = np.zeros(self.num_nodes, dtype=np.int32)
+        remaining = self.out_degrees().copy()
+        frontier = np.flatnonzero(remaining == 0)
+        leaves = (remaining == 0).astype(np.int64)
+        done = 0
+        while len(frontier):
+            done += len(frontier)
+            edges = self.in_edge_ids[
+                _ranges(self.in_offsets[frontier], self.in_offsets[frontier + 1])
+            ]
+            sources, targets = self.sources[edges], self.targets[edges]
+            np.add.at(descendants, sources, 1 + descendants[targets])
+            np.add.at(leaves, sources, leaves[targets])
+            np.maximum.at(max_depth, sources, 1 + max_depth[targets])
+            np.subtract.at(remaining, sources, 1)
+            frontier = np.unique(sources[remaining[sources] == 0])
+        if done != self.num_nodes:
+            return None
+        return descendants, max_depth, leaves
+
+    def is_acyclic(self) -> bool:
+        return self.topological_order() is not None
+
+    def to_networkx(self) -> nx.DiGraph:
+        """The same graph as a NetworkX DiGraph with UUID-string nodes and path_uuid attributes."""
+        G = nx.DiGraph()
+        G.add_node(ROOT_NODE)
+        names = [ROOT_NODE] + [self.node_uuid(node) for node in range(1, self.num_nodes)]
+        G.add_edges_from(
+            (names[source], names[target], {"path_uuid": self.path_uuid(edge)})
+            for edge, (source, target) in enumerate(
+                zip(self.sources.tolist(), self.targets.tolist(), strict=True)
+            )
+        )
+        return G
@@ -0,0 +1,75 @@
+"""
+Byte-bounded LRU cache for hrönir contents.
+
+Hrönirs are content-addressed: a UUID always maps to the same text, so cached entries
+never go stale and the cache needs no invalidation, only eviction.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+
+
+class ContentCache:
+    """Least-recently-used cache of hrönir texts, bounded by their in-memory size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, max_bytes)
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(content: str) -> int:
+        return sys.getsizeof(content)
+
+    def get(self, content_uuid: str) -> str | None:
+        with self._lock:
+            content = self._entries.get(content_uuid)
+            if content is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(content_uuid)
+            self.hits += 1
+            return content
+
+    def put(self, content_uuid: str, content: str) -> None:
+        size = self._size(content)
+        # A text larger than the whole budget would only flush everything else out.
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if content_uuid in self._entries:
+                self._entries.move_to_end(content_uuid)
+                return
+            self._entries[content_uuid] = content
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= self._size(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, content_uuid: str) -> bool:
+        return content_uuid in self._entries
+
+    def stats(self) -> dict[str, int]:
+        """Hit/miss/eviction counters and current occupancy."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+        }
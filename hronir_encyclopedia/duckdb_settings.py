@@ -0,0 +1,41 @@
+"""Connection settings shared by every DuckDB connection the package opens."""
+
+import re
+from pathlib import Path
+
+import duckdb
+
+MEMORY_LIMIT_PATTERN = re.compile(r"^\d+(\.\d+)?\s*([KMGT]i?)?B$", re.IGNORECASE)
+
+
+def parse_memory_limit(memory_limit: str | None) -> int | None:
+    """Bytes in a memory limit such as "512MB" or "2GiB" (KB = 1000, KiB = 1024)."""
+    if not memory_limit:
+        return None
+    match = MEMORY_LIMIT_PATTERN.match(memory_limit.strip())
+    if not match:
+        raise ValueError(f"Invalid memory limit {memory_limit!r}; expected e.g. '512MB'.")
+    number = float(memory_limit.strip()[: match.start(2) if match.group(2) else -1])
+    unit = (match.group(2) or "").upper()
+    base = 1024 if unit.endswith("I") else 1000
+    return int(number * base ** (" KMGT".index(unit[:1]) if unit else 0))
+
+
+def apply_memory_settings(
+    conn: duckdb.DuckDBPyConnection,
+    memory_limit: str | None = None,
+    temp_directory: str | Path | None = None,
+) -> None:
+    """
+    Caps DuckDB's buffer memory (e.g. "512MB", "2GiB") and sets where operators that
+    exceed it spill to disk. Large sorts, joins and copies then degrade to disk I/O
+    instead of failing on small machines.
+    """
+    if memory_limit:
+        if not MEMORY_LIMIT_PATTERN.match(memory_limit.strip()):
+            raise ValueError(f"Invalid memory limit {memory_limit!r}; expected e.g. '512MB'.")
+        conn.execute(f"SET memory_limit = '{memory_limit.strip()}'")
+    if temp_directory:
+        Path(temp_directory).mkdir(parents=True, exist_ok=True)
+        escaped = str(temp_directory).replace("'", "''")
+        conn.execute(f"SET temp_directory = '{escaped}'")
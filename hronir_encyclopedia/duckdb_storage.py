@@ -1,41 +1,89 @@
 import datetime
 import json
 import logging
+import shutil
+import tempfile
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import duckdb
+import pandas as pd
 from pydantic import ValidationError
 
+from . import change_feed, near_duplicates, search_index, subtree_stats
+from .bloom_filter import BloomFilter
+from .compact_graph import CompactGraph
+from .duckdb_settings import apply_memory_settings, parse_memory_limit
+from .graph_analytics import GraphAnalytics
+from .graph_export import GraphExport
 from .models import Path as PathModel
 from .models import Transaction
 from .sharding import ShardingManager, SnapshotManifest
+from .topological_order import NarrativeCycleError, TopologicalOrder
 
+PATH_COLUMNS = "path_uuid, position, prev_uuid, uuid, status, mandate_id"
+STREAM_BATCH_SIZE = 10_000
+# DuckDB hands out results in vectors of 2048 rows; columnar scans fetch many at a time.
+COLUMN_BATCH_SIZE = 2048 * 32
+HRONIR_COLUMNS = "uuid, content, created_at, metadata"
+# Rough in-memory size of one PathModel / Transaction, for the memory budget of the
+# get_all_* methods that materialize a whole table.
+PATH_MODEL_BYTES = 1024
+TRANSACTION_MODEL_BYTES = 4096
 
-class DuckDBDataManager:
-    """DuckDB-based data manager for ACID persistence."""
+# UUIDv5 formatting of a hex SHA-1 `digest` column: truncate to 128 bits, set the version
+# nibble to 5 and the variant bits to 10 (the nibble lookup maps n to (n & 3) | 8).
+UUID5_FROM_DIGEST_SQL = """
+    substr(digest, 1, 8) || '-' || substr(digest, 9, 4) || '-5' || substr(digest, 14, 3)
+    || '-' || substr('89ab89ab89ab89ab', strpos('0123456789abcdef', substr(digest, 17, 1)), 1)
+    || substr(digest, 18, 3) || '-' || substr(digest, 21, 12)
+"""
 
-    _instance = None
 
-    def __new__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+class DuckDBDataManager:
+    """DuckDB-based data manager for ACID persistence."""
 
     def __init__(
         self,
         db_path: str = "data/encyclopedia.duckdb",
         path_csv_dir: str | Path = "narrative_paths",
         transactions_json_dir: str | Path = "data/transactions",
+        cold_storage_dir: str | Path | None = None,
+        use_bloom_filter: bool = False,
+        memory_limit: str | None = None,
+        temp_directory: str | Path | None = None,
     ):
-        if hasattr(self, "_initialized") and self._initialized:
-            return
-
         self.db_path = Path(db_path)
         self.path_csv_dir = Path(path_csv_dir)
         self.transactions_json_dir = Path(transactions_json_dir)
+        self.cold_storage_dir = Path(cold_storage_dir) if cold_storage_dir else None
 
         self.conn = duckdb.connect(str(self.db_path))
+        self.memory_limit = memory_limit
+        self.temp_directory = temp_directory
+        # Database-wide settings: cursors opened from this connection inherit them.
+        apply_memory_settings(self.conn, memory_limit, temp_directory)
         self._create_tables()
+        # Read sources for paths/hrönirs: the hot tables, or hot+cold views once
+        # settled positions have been tiered out to Parquet.
+        self._paths_source = "paths"
+        self._hronirs_source = "hronirs"
+        self._attach_cold_storage()
+        # Derived index tables are created on first use so read-only runs leave the file untouched.
+        self._path_indexes_ready = False
+        self._search_index_ready = False
+        self._near_duplicate_index_ready = False
+        self._change_log_ready = False
+        self._subtree_stats_ready = False
+        self.change_feed = change_feed.ChangeFeed()
+        # Optional negative cache for hronir_exists, built on first probe.
+        self.use_bloom_filter = use_bloom_filter
+        self._hronir_bloom: BloomFilter | None = None
+        # Topological order of the narrative graph, built on the first path insert so
+        # cycle-creating paths are rejected (see topological_order.py).
+        self._topological_order: TopologicalOrder | None = None
         self._initialized = False
 
     def _create_tables(self) -> None:
@@ -73,8 +121,6 @@ class DuckDBDataManager:
         )
 
     def load_all_data(self) -> None:
-        import pandas as pd
-
         # Only load if tables are empty
         paths_empty = self.conn.execute("SELECT COUNT(*) FROM paths").fetchone()[0] == 0
         if paths_empty:
@@ -90,6 +136,8 @@ class DuckDBDataManager:
                         self.add_path(PathModel(**row_dict))
                     except ValidationError:
                         continue
+                    except NarrativeCycleError as e:
+                        logging.warning(f"Skipping path from {csv_file.name}: {e}")
 
         # Vote loading removed
 
@@ -105,12 +153,15 @@ class DuckDBDataManager:
         self._initialized = True
 
     def save_all_data(self) -> None:
-        """Commits the current transaction to the DuckDB database."""
+        """Prunes the change log, commits the current transaction and delivers queued events."""
+        if self._change_log_ready:
+            self.prune_change_log()
         self.conn.commit()
+        self.change_feed.flush()
 
     # --- Path operations ---
-    def get_all_paths(self) -> list[PathModel]:
-        rows = self.conn.execute("SELECT * FROM paths").fetchall()
+    @staticmethod
+    def _rows_to_paths(rows: list[tuple]) -> list[PathModel]:
         paths: list[PathModel] = []
         for row in rows:
             try:
@@ -127,44 +178,234 @@ class DuckDBDataManager:
                 continue
         return paths
 
+    def _check_materialize_budget(self, rows: int, row_bytes: int, streaming: str) -> None:
+        """Refuses to load a whole table into Python objects that would exceed memory_limit."""
+        budget = parse_memory_limit(self.memory_limit)
+        if budget is not None and rows * row_bytes > budget:
+            raise MemoryError(
+                f"Loading {rows} rows (~{rows * row_bytes // 2**20} MiB) exceeds the memory "
+                f"limit of {self.memory_limit}; use {streaming} instead."
+            )
+
+    def get_all_paths(self) -> list[PathModel]:
+        """Every path as a list. Raises MemoryError if that would exceed memory_limit."""
+        if self.memory_limit:
+            self._check_materialize_budget(self.count_paths(), PATH_MODEL_BYTES, "iter_all_paths")
+        rows = self.conn.execute(f"SELECT {PATH_COLUMNS} FROM {self._paths_source}").fetchall()
+        return self._rows_to_paths(rows)
+
+    def _stream(self, query: str, batch_size: int) -> Iterator[list[tuple]]:
+        """
+        Yields the rows of a query in batches from a dedicated cursor, so callers can keep
+        using the main connection while iterating and only one batch is held at a time.
+        """
+        cursor = self.conn.cursor()
+        try:
+            self._attach_cold_storage(cursor)
+            cursor.execute(query)
+            while batch := cursor.fetchmany(batch_size):
+                yield batch
+        finally:
+            cursor.close()
+
+    def iter_all_paths(self, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[PathModel]:
+        """Streaming counterpart of get_all_paths."""
+        for batch in self._stream(f"SELECT {PATH_COLUMNS} FROM {self._paths_source}", batch_size):
+            yield from self._rows_to_paths(batch)
+
+    def iter_path_columns(self, batch_size: int = COLUMN_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+        """
+        Columnar scan of the path edges as DataFrame chunks with path_uuid, position,
+        prev_uuid ("" for root paths) and uuid, for graph builders that never need models.
+        """
+        cursor = self.conn.cursor()
+        try:
+            self._attach_cold_storage(cursor)
+            cursor.execute(
+                f"""
+                SELECT path_uuid, position, COALESCE(prev_uuid, '') AS prev_uuid, uuid
+                FROM {self._paths_source}
+                """
+            )
+            vectors = max(1, batch_size // 2048)
+            while len(chunk := cursor.fetch_df_chunk(vectors)):
+                yield chunk
+        finally:
+            cursor.close()
+
+    def get_path_columns(self, path_uuids: list[str]) -> pd.DataFrame:
+        """The iter_path_columns columns for the given paths, in one keyed query."""
+        return self.conn.execute(
+            f"""
+            SELECT path_uuid, position, COALESCE(prev_uuid, '') AS prev_uuid, uuid
+            FROM {self._paths_source}
+            WHERE path_uuid IN (SELECT UNNEST(?::VARCHAR[]))
+            """,
+            (list(path_uuids),),
+        ).df()
+
     def get_paths_by_position(self, position: int) -> list[PathModel]:
         rows = self.conn.execute(
-            "SELECT * FROM paths WHERE position=?",
+            f"SELECT {PATH_COLUMNS} FROM {self._paths_source} WHERE position=?",
             (position,),
         ).fetchall()
-        paths: list[PathModel] = []
-        for row in rows:
-            try:
-                data = {
-                    "path_uuid": row[0],
-                    "position": row[1],
-                    "prev_uuid": row[2] if row[2] else None,
-                    "uuid": row[3],
-                    "status": row[4],
-                    "mandate_id": row[5] if row[5] else None,
-                }
-                paths.append(PathModel(**data))
-            except ValidationError:
-                continue
-        return paths
+        return self._rows_to_paths(rows)
 
-    def add_path(self, path: PathModel) -> None:
-        data = path.model_dump()
-        self.conn.execute(
-            """
-            INSERT INTO paths(path_uuid, position, prev_uuid, uuid, status, mandate_id)
-            VALUES (?, ?, ?, ?, ?, ?)
-            ON CONFLICT(path_uuid) DO NOTHING
+    def get_paths_by_position_page(
+        self,
+        position: int,
+        after_path_uuid: str | None = None,
+        limit: int = 100,
+        prev_uuid: str | None = None,
+    ) -> list[PathModel]:
+        """
+        Keyset-paginated variant of get_paths_by_position, ordered by path_uuid.
+        Pass the last path_uuid of a page as after_path_uuid to fetch the next one.
+        prev_uuid optionally restricts the page to one predecessor ("" for root paths).
+        """
+        query = f"SELECT {PATH_COLUMNS} FROM {self._paths_source} WHERE position=?"
+        params: list = [position]
+        if prev_uuid is not None:
+            query += " AND prev_uuid=?"
+            params.append(prev_uuid)
+        if after_path_uuid:
+            query += " AND path_uuid>?"
+            params.append(after_path_uuid)
+        query += " ORDER BY path_uuid LIMIT ?"
+        params.append(limit)
+        rows = self.conn.execute(query, params).fetchall()
+        return self._rows_to_paths(rows)
+
+    def get_paths_by_prev_uuids(self, prev_uuids: list[str]) -> list[PathModel]:
+        """Returns every path continuing one of the given predecessor hrönirs."""
+        if not prev_uuids:
+            return []
+        rows = self.conn.execute(
+            f"SELECT {PATH_COLUMNS} FROM {self._paths_source} "
+            "WHERE prev_uuid IN (SELECT UNNEST(?::VARCHAR[]))",
+            (list(prev_uuids),),
+        ).fetchall()
+        return self._rows_to_paths(rows)
+
+    def count_paths_by_prev_uuids(self, prev_uuids: list[str]) -> dict[str, int]:
+        """Counts continuations per predecessor hrönir. Predecessors without any are omitted."""
+        if not prev_uuids:
+            return {}
+        rows = self.conn.execute(
+            f"""
+            SELECT prev_uuid, COUNT(*) FROM {self._paths_source}
+            WHERE prev_uuid IN (SELECT UNNEST(?::VARCHAR[]))
+            GROUP BY prev_uuid
             """,
-            (
-                str(data["path_uuid"]),
-                data["position"],
-                str(data["prev_uuid"] or ""),
-                str(data["uuid"]),
-                data.get("status", "PENDING"),
-                str(data["mandate_id"] or ""),
+            (list(prev_uuids),),
+        ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def get_top_candidates(self, position: int, prev_uuid: str, limit: int) -> list[dict]:
+        """
+        The `limit` best-scored candidates continuing prev_uuid at a position, ranked in one
+        query. Scores use canon_new's weight: 1 + sqrt(continuations) per continuation.
+        """
+        rows = self.conn.execute(
+            f"""
+            WITH candidates AS (
+                SELECT path_uuid, uuid FROM {self._paths_source}
+                WHERE position = ? AND prev_uuid = ?
             ),
-        )
+            children AS (
+                SELECT prev_uuid AS parent, uuid FROM {self._paths_source}
+                WHERE prev_uuid IN (SELECT uuid FROM candidates)
+            ),
+            grandchildren AS (
+                SELECT prev_uuid, COUNT(*) AS n FROM {self._paths_source}
+                WHERE prev_uuid IN (SELECT uuid FROM children)
+                GROUP BY prev_uuid
+            )
+            SELECT c.path_uuid, c.uuid,
+                   COALESCE(SUM(1 + sqrt(COALESCE(g.n, 0))) FILTER (ch.uuid IS NOT NULL), 0),
+                   COUNT(ch.uuid) AS continuations
+            FROM candidates c
+            LEFT JOIN children ch ON ch.parent = c.uuid
+            LEFT JOIN grandchildren g ON g.prev_uuid = ch.uuid
+            GROUP BY c.path_uuid, c.uuid
+            ORDER BY 3 DESC, continuations DESC, c.path_uuid
+            LIMIT ?
+            """,
+            [position, prev_uuid, limit],
+        ).fetchall()
+        return [
+            {
+                "path_uuid": str(path_uuid),
+                "hrönir_uuid": str(hronir_uuid),
+                "score": float(score),
+                "continuations": int(continuations),
+            }
+            for path_uuid, hronir_uuid, score, continuations in rows
+        ]
+
+    def _ensure_path_indexes(self) -> None:
+        """
+        Secondary ART indexes for hrönir -> path and predecessor -> continuation lookups.
+        Built on first write; until then those lookups fall back to a column scan.
+        """
+        if self._path_indexes_ready:
+            return
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_paths_uuid ON paths(uuid)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_paths_prev_uuid ON paths(prev_uuid)")
+        self._path_indexes_ready = True
+
+    def add_path(self, path: PathModel) -> None:
+        """Inserts a path; raises NarrativeCycleError if it would make the graph cyclic."""
+        self._ensure_path_indexes()
+        data = path.model_dump()
+        self._check_acyclic([path])
+        try:
+            inserted = self.conn.execute(
+                f"""
+                INSERT INTO paths(path_uuid, position, prev_uuid, uuid, status, mandate_id)
+                SELECT * FROM (VALUES (?, ?, ?, ?, ?, ?)) AS new(path_uuid)
+                {self._not_archived("paths", "path_uuid")}
+                ON CONFLICT(path_uuid) DO NOTHING
+                RETURNING path_uuid
+                """,
+                (
+                    str(data["path_uuid"]),
+                    data["position"],
+                    str(data["prev_uuid"] or ""),
+                    str(data["uuid"]),
+                    data.get("status", "PENDING"),
+                    str(data["mandate_id"] or ""),
+                ),
+            ).fetchall()
+        except Exception:
+            self._topological_order = None
+            raise
+        self._record_changes("paths", [row[0] for row in inserted])
+        self._update_subtree_stats()
+
+    # --- Narrative graph consistency ---
+    def _ensure_topological_order(self) -> TopologicalOrder:
+        if self._topological_order is None:
+            self._topological_order = TopologicalOrder(
+                CompactGraph.from_frames(self.iter_path_columns())
+            )
+        return self._topological_order
+
+    def _check_acyclic(self, paths: list[PathModel]) -> None:
+        """Adds the paths' edges to the topological order; a rejected batch leaves no trace."""
+        order = self._ensure_topological_order()
+        try:
+            for path in paths:
+                order.add_edge(str(path.prev_uuid) if path.prev_uuid else None, str(path.uuid))
+        except NarrativeCycleError:
+            # Earlier edges of the batch are already in the order; rebuild it on next use.
+            if len(paths) > 1:
+                self._topological_order = None
+            raise
+
+    def is_narrative_acyclic(self) -> bool:
+        """True if the narrative graph has no cycle; free once the order is maintained."""
+        return self._ensure_topological_order().acyclic
 
     def update_path_status(
         self,
@@ -173,6 +414,14 @@ class DuckDBDataManager:
         mandate_id: str | None = None,
         set_mandate_explicitly: bool = False,
     ) -> None:
+        """Updates a hot path; archived paths are immutable Parquet rows and raise ValueError."""
+        if (
+            self._paths_source != "paths"
+            and self.conn.execute(
+                "SELECT 1 FROM cold_paths WHERE path_uuid = ? LIMIT 1", (path_uuid,)
+            ).fetchone()
+        ):
+            raise ValueError(f"Path {path_uuid} is archived in cold storage and cannot change.")
         if set_mandate_explicitly:
             self.conn.execute(
                 "UPDATE paths SET status=?, mandate_id=? WHERE path_uuid=?",
@@ -185,30 +434,150 @@ class DuckDBDataManager:
             )
 
     def get_path_by_uuid(self, path_uuid: str) -> PathModel | None:
+        # Hot table first: the primary-key lookup avoids touching cold Parquet files.
         row = self.conn.execute(
-            "SELECT * FROM paths WHERE path_uuid=?",
+            f"SELECT {PATH_COLUMNS} FROM paths WHERE path_uuid=?",
             (path_uuid,),
         ).fetchone()
+        if not row and self._paths_source != "paths":
+            row = self.conn.execute(
+                f"SELECT {PATH_COLUMNS} FROM cold_paths WHERE path_uuid=?",
+                (path_uuid,),
+            ).fetchone()
         if not row:
             return None
-        data = {
-            "path_uuid": row[0],
-            "position": row[1],
-            "prev_uuid": row[2] if row[2] else None,
-            "uuid": row[3],
-            "status": row[4],
-            "mandate_id": row[5] if row[5] else None,
-        }
-        try:
-            return PathModel(**data)
-        except ValidationError:
-            return None
+        paths = self._rows_to_paths([row])
+        return paths[0] if paths else None
+
+    def get_paths_by_hronir_uuid(self, hronir_uuid: str) -> list[PathModel]:
+        """Paths that introduce the given hrönir, hot or archived, lowest position first."""
+        rows = self.conn.execute(
+            f"""
+            SELECT {PATH_COLUMNS} FROM {self._paths_source}
+            WHERE uuid=? ORDER BY position, path_uuid
+            """,
+            (hronir_uuid,),
+        ).fetchall()
+        return self._rows_to_paths(rows)
 
     # --- Vote operations removed ---
 
     # --- Transaction operations ---
-    def get_all_transactions(self) -> list[Transaction]:
-        rows = self.conn.execute("SELECT * FROM transactions").fetchall()
+    def get_min_positions_by_hronir_uuids(self, hronir_uuids: list[str]) -> dict[str, int]:
+        """Position of the earliest path introducing each hrönir, in one indexed query."""
+        if not hronir_uuids:
+            return {}
+        rows = self.conn.execute(
+            f"""
+            SELECT uuid, MIN(position) FROM {self._paths_source}
+            WHERE uuid IN (SELECT UNNEST(?::VARCHAR[]))
+            GROUP BY uuid
+            """,
+            (list(hronir_uuids),),
+        ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def bulk_store(
+        self,
+        hronirs: list[tuple[str, str]],
+        paths: list[PathModel],
+        transactions: list[Transaction],
+        metadata: dict[str, dict] | None = None,
+    ) -> dict[str, int]:
+        """
+        Inserts (uuid, content) hrönirs, paths and transactions in a single transaction.
+        `metadata` maps hrönir UUIDs to the metadata they are stored with ({} otherwise).
+        Rows that already exist, hot or archived, are left untouched. Returns the number of
+        rows inserted per table. Raises NarrativeCycleError, storing nothing, if a path would
+        close a cycle.
+        """
+        metadata = metadata or {}
+        self._ensure_path_indexes()
+        # Created (and backfilled) before the insert, so only the new hrönirs need indexing.
+        self._ensure_search_index()
+        self._ensure_near_duplicate_index()
+        self._check_acyclic(paths)
+        created_at = datetime.datetime.now(datetime.timezone.utc)
+        inserted_keys = {}
+        self._ensure_change_log()
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            inserted_keys["hronirs"] = self.conn.execute(
+                f"""
+                INSERT INTO hronirs(uuid, content, created_at, metadata)
+                SELECT uuid, content, ?, metadata FROM (
+                    SELECT UNNEST(?::VARCHAR[]) AS uuid, UNNEST(?::VARCHAR[]) AS content,
+                           UNNEST(?::VARCHAR[]) AS metadata
+                ) {self._not_archived("hronirs", "uuid")}
+                ON CONFLICT(uuid) DO NOTHING
+                RETURNING uuid
+                """,
+                (
+                    created_at,
+                    [h[0] for h in hronirs],
+                    [h[1] for h in hronirs],
+                    [json.dumps(metadata[h[0]]) if h[0] in metadata else "{}" for h in hronirs],
+                ),
+            ).fetchall()
+            inserted_keys["paths"] = self.conn.execute(
+                f"""
+                INSERT INTO paths({PATH_COLUMNS})
+                SELECT * FROM (
+                    SELECT UNNEST(?::VARCHAR[]) AS path_uuid, UNNEST(?::INTEGER[]),
+                           UNNEST(?::VARCHAR[]), UNNEST(?::VARCHAR[]), UNNEST(?::VARCHAR[]),
+                           UNNEST(?::VARCHAR[])
+                ) {self._not_archived("paths", "path_uuid")}
+                ON CONFLICT(path_uuid) DO NOTHING
+                RETURNING path_uuid
+                """,
+                (
+                    [str(p.path_uuid) for p in paths],
+                    [p.position for p in paths],
+                    [str(p.prev_uuid or "") for p in paths],
+                    [str(p.uuid) for p in paths],
+                    [p.status.value for p in paths],
+                    [str(p.mandate_id or "") for p in paths],
+                ),
+            ).fetchall()
+            tx_data = [t.model_dump() for t in transactions]
+            inserted_keys["transactions"] = self.conn.execute(
+                """
+                INSERT INTO transactions(uuid, data)
+                SELECT UNNEST(?::VARCHAR[]), UNNEST(?::VARCHAR[])
+                ON CONFLICT(uuid) DO NOTHING
+                RETURNING uuid
+                """,
+                (
+                    [str(d["uuid"]) for d in tx_data],
+                    [json.dumps(d, default=str) for d in tx_data],
+                ),
+            ).fetchall()
+            events = [
+                event
+                for table, rows in inserted_keys.items()
+                for event in change_feed.record(self.conn, table, [row[0] for row in rows])
+            ]
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            self._topological_order = None
+            raise
+        self.change_feed.publish(events)
+        self.change_feed.flush()
+        self._update_subtree_stats()
+
+        if self._hronir_bloom is not None:
+            for hronir_uuid, _ in hronirs:
+                self._hronir_bloom.add(hronir_uuid)
+        # Index exactly the hrönirs this call inserted, as add_hronir does for one.
+        new_uuids = {row[0] for row in inserted_keys["hronirs"]}
+        documents = [(u, c) for u, c in dict(hronirs).items() if u in new_uuids]
+        search_index.index_documents(self.conn, documents)
+        near_duplicates.index_documents(self.conn, documents)
+        return {table: len(rows) for table, rows in inserted_keys.items()}
+
+    @staticmethod
+    def _rows_to_transactions(rows: list[tuple]) -> list[Transaction]:
         txs: list[Transaction] = []
         for row in rows:
             try:
@@ -218,16 +587,34 @@ class DuckDBDataManager:
                 continue
         return txs
 
+    def get_all_transactions(self) -> list[Transaction]:
+        """Every transaction as a list. Raises MemoryError if that would exceed memory_limit."""
+        if self.memory_limit:
+            self._check_materialize_budget(
+                self.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0],
+                TRANSACTION_MODEL_BYTES,
+                "iter_all_transactions",
+            )
+        rows = self.conn.execute("SELECT * FROM transactions").fetchall()
+        return self._rows_to_transactions(rows)
+
+    def iter_all_transactions(self, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[Transaction]:
+        """Streaming counterpart of get_all_transactions."""
+        for batch in self._stream("SELECT uuid, data FROM transactions", batch_size):
+            yield from self._rows_to_transactions(batch)
+
     def add_transaction(self, transaction: Transaction) -> None:
         data = transaction.model_dump()
-        self.conn.execute(
+        inserted = self.conn.execute(
             """
             INSERT INTO transactions(uuid, data)
             VALUES (?, ?)
             ON CONFLICT(uuid) DO NOTHING
+            RETURNING uuid
             """,
             (str(data["uuid"]), json.dumps(data, default=str)),
-        )
+        ).fetchall()
+        self._record_changes("transactions", [row[0] for row in inserted])
 
     def get_transaction(self, tx_uuid: str) -> Transaction | None:
         row = self.conn.execute(
@@ -249,11 +636,25 @@ class DuckDBDataManager:
         created_at: datetime.datetime | None = None,
         metadata: dict | None = None,
     ) -> None:
-        """Adds a hrönir's content to the hronirs table."""
+        """
+        Adds a hrönir's content to the hronirs table. A hrönir already archived in cold
+        storage is left as it is: its UUID is derived from the content, which cannot change.
+        """
+        if (
+            self._hronirs_source != "hronirs"
+            and self.conn.execute(
+                "SELECT 1 FROM cold_hronirs WHERE uuid = ? LIMIT 1", (hronir_uuid,)
+            ).fetchone()
+        ):
+            return
         if created_at is None:
             created_at = datetime.datetime.now(datetime.timezone.utc)
         metadata_json = json.dumps(metadata) if metadata else "{}"
 
+        existed = (
+            self.conn.execute("SELECT 1 FROM hronirs WHERE uuid = ?", (hronir_uuid,)).fetchone()
+            is not None
+        )
         self.conn.execute(
             """
             INSERT INTO hronirs (uuid, content, created_at, metadata)
@@ -265,25 +666,504 @@ class DuckDBDataManager:
             """,
             (hronir_uuid, content, created_at, metadata_json),
         )
+        self._record_changes("hronirs", [hronir_uuid], "update" if existed else "insert")
+        if self._hronir_bloom is not None:
+            self._hronir_bloom.add(hronir_uuid)
+        self._ensure_search_index()
+        search_index.index_document(self.conn, hronir_uuid, content)
+        self._ensure_near_duplicate_index()
+        near_duplicates.index_document(self.conn, hronir_uuid, content)
 
     def get_hronir_content(self, hronir_uuid: str) -> str | None:
         """Retrieves a hrönir's content from the hronirs table by its UUID."""
         result = self.conn.execute(
             "SELECT content FROM hronirs WHERE uuid = ?", (hronir_uuid,)
         ).fetchone()
+        if not result and self._hronirs_source != "hronirs":
+            result = self.conn.execute(
+                "SELECT content FROM cold_hronirs WHERE uuid = ?", (hronir_uuid,)
+            ).fetchone()
         return result[0] if result else None
 
+    def get_hronir_contents(self, hronir_uuids: list[str]) -> dict[str, str]:
+        """Contents of several hrönirs in one query; unknown UUIDs are left out."""
+        if not hronir_uuids:
+            return {}
+        rows = self.conn.execute(
+            f"""
+            SELECT uuid, content FROM {self._hronirs_source}
+            WHERE uuid IN (SELECT UNNEST(?::VARCHAR[]))
+            """,
+            (list(hronir_uuids),),
+        ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def hronir_exists(self, hronir_uuid: str) -> bool:
+        """Primary-key existence probe; never reads the content column."""
+        if self.use_bloom_filter:
+            if self._hronir_bloom is None or self._hronir_bloom.is_saturated:
+                self._build_hronir_bloom()
+            if hronir_uuid not in self._hronir_bloom:
+                return False
+        if self.conn.execute("SELECT 1 FROM hronirs WHERE uuid = ?", (hronir_uuid,)).fetchone():
+            return True
+        if self._hronirs_source != "hronirs":
+            return (
+                self.conn.execute(
+                    "SELECT 1 FROM cold_hronirs WHERE uuid = ? LIMIT 1", (hronir_uuid,)
+                ).fetchone()
+                is not None
+            )
+        return False
+
+    def existing_hronir_uuids(self, hronir_uuids: list[str]) -> set[str]:
+        """The subset of the given UUIDs that are stored, in one set-based query."""
+        if not hronir_uuids:
+            return set()
+        rows = self.conn.execute(
+            f"""
+            SELECT DISTINCT uuid FROM {self._hronirs_source}
+            WHERE uuid IN (SELECT UNNEST(?::VARCHAR[]))
+            """,
+            (list(hronir_uuids),),
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def _build_hronir_bloom(self) -> None:
+        count = self.conn.execute(f"SELECT COUNT(*) FROM {self._hronirs_source}").fetchone()[0]
+        # Headroom so a growing library does not saturate the filter right away.
+        bloom = BloomFilter(capacity=max(1024, 2 * count))
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT uuid FROM {self._hronirs_source}")
+        while batch := cursor.fetchmany(10_000):
+            for (hronir_uuid,) in batch:
+                bloom.add(hronir_uuid)
+        cursor.close()
+        self._hronir_bloom = bloom
+
+    # --- Full-text search ---
+    def _ensure_search_index(self) -> None:
+        """Creates the inverted index tables and indexes hrönirs stored before they existed."""
+        if self._search_index_ready:
+            return
+        search_index.ensure_tables(self.conn)
+        indexed = search_index.backfill(self.conn, self._hronirs_source)
+        if indexed:
+            logging.info(f"Backfilled full-text index with {indexed} hrönirs.")
+        self._search_index_ready = True
+
+    def search_hronirs(self, query: str, limit: int = 10) -> list[tuple[str, float]]:
+        """BM25-ranked (hrönir_uuid, score) pairs for a free-text query."""
+        self._ensure_search_index()
+        return search_index.search(self.conn, query, limit)
+
+    # --- Near-duplicate detection ---
+    def _ensure_near_duplicate_index(self) -> None:
+        """Creates the MinHash/LSH tables and signs hrönirs stored before they existed."""
+        if self._near_duplicate_index_ready:
+            return
+        near_duplicates.ensure_tables(self.conn)
+        indexed = near_duplicates.backfill(self.conn, self._hronirs_source)
+        if indexed:
+            logging.info(f"Backfilled MinHash signatures for {indexed} hrönirs.")
+        self._near_duplicate_index_ready = True
+
+    def find_near_duplicates(
+        self,
+        content: str,
+        threshold: float = near_duplicates.DEFAULT_THRESHOLD,
+        exclude_uuid: str | None = None,
+    ) -> list[tuple[str, float]]:
+        """(hrönir_uuid, estimated similarity) of stored hrönirs close to `content`."""
+        self._ensure_near_duplicate_index()
+        return near_duplicates.find_near_duplicates(
+            self.conn, content, threshold=threshold, exclude_uuid=exclude_uuid
+        )
+
+    def find_near_duplicates_batch(
+        self,
+        documents: list[tuple[str, str]],
+        threshold: float = near_duplicates.DEFAULT_THRESHOLD,
+    ) -> dict[str, list[tuple[str, float]]]:
+        """Near-duplicates of each (uuid, content), among stored hrönirs and earlier ones."""
+        self._ensure_near_duplicate_index()
+        return near_duplicates.find_near_duplicates_batch(self.conn, documents, threshold)
+
+    def find_near_duplicate_clusters(
+        self, threshold: float = near_duplicates.DEFAULT_THRESHOLD
+    ) -> list[list[str]]:
+        """Clusters of near-duplicate hrönir UUIDs across the whole library."""
+        self._ensure_near_duplicate_index()
+        return near_duplicates.find_clusters(self.conn, threshold=threshold)
+
+    # --- Change-data capture ---
+    def _ensure_change_log(self) -> None:
+        if self._change_log_ready:
+            return
+        change_feed.ensure_tables(self.conn)
+        self._change_log_ready = True
+
+    def _record_changes(self, table: str, keys: list[str], operation: str = "insert") -> None:
+        if not keys:
+            return
+        self._ensure_change_log()
+        self.change_feed.publish(change_feed.record(self.conn, table, keys, operation))
+
+    def subscribe_changes(
+        self,
+        callback: Callable[[list[change_feed.ChangeEvent]], None],
+        tables: Iterable[str] | None = None,
+        after_seq: int | None = None,
+    ) -> change_feed.Subscription:
+        """
+        Delivers batches of change events to `callback` as writes are committed. With
+        after_seq, changes already recorded after that sequence number are replayed first.
+        """
+        backlog = self.get_changes_since(after_seq) if after_seq is not None else None
+        return self.change_feed.subscribe(callback, tables, backlog)
+
+    def get_changes_since(
+        self, after_seq: int = 0, limit: int | None = None
+    ) -> list[change_feed.ChangeEvent]:
+        self._ensure_change_log()
+        return change_feed.changes_since(self.conn, after_seq, limit)
+
+    def last_change_seq(self) -> int:
+        """Sequence number of the latest recorded change (0 if none); never creates the log."""
+        if (
+            not self._change_log_ready
+            and not self.conn.execute(
+                "SELECT 1 FROM duckdb_tables() WHERE table_name = 'change_log'"
+            ).fetchone()
+        ):
+            return 0
+        return change_feed.last_seq(self.conn)
+
+    def prune_change_log(self, retention: int | None = None) -> int:
+        """
+        Drops change events older than the last `retention` ones (CHANGE_LOG_RETENTION by
+        default), keeping those the subtree statistics have not applied yet. Returns the
+        number of events removed.
+        """
+        self._ensure_change_log()
+        self._update_subtree_stats()
+        if retention is None:
+            retention = change_feed.CHANGE_LOG_RETENTION
+        through_seq = change_feed.last_seq(self.conn) - retention
+        if (
+            self._subtree_stats_ready
+            or self.conn.execute(
+                "SELECT 1 FROM duckdb_tables() WHERE table_name = 'subtree_stats_state'"
+            ).fetchone()
+        ):
+            stats_seq = subtree_stats.stored_seq(self.conn)
+            if stats_seq is not None:
+                through_seq = min(through_seq, stats_seq)
+        return change_feed.prune(self.conn, through_seq)
+
+    def graph_analytics(self) -> GraphAnalytics:
+        """Whole-graph audits (orphans, frontier, reachability, depth) run as SQL."""
+        return GraphAnalytics(self.conn, self._paths_source)
+
+    def graph_export(
+        self,
+        min_position: int | None = None,
+        max_position: int | None = None,
+        around: Iterable[str] | None = None,
+        radius: int = 0,
+    ) -> GraphExport:
+        """Chunked node and edge scans, optionally filtered, for the graph exporters."""
+        return GraphExport(
+            self.conn, self._paths_source, min_position, max_position, around, radius
+        )
+
+    # --- Subtree statistics ---
+    def _ensure_subtree_stats(self) -> None:
+        """Creates the subtree_stats table on first use and brings it up to date."""
+        if self._subtree_stats_ready:
+            return
+        subtree_stats.ensure_tables(self.conn)
+        self._subtree_stats_ready = True
+        self._update_subtree_stats()
+
+    def _update_subtree_stats(self) -> None:
+        """Applies paths stored since the stats were last updated, once the table is in use."""
+        if not self._subtree_stats_ready:
+            return
+        seq = self.last_change_seq()
+        stored = subtree_stats.stored_seq(self.conn)
+        if stored == seq:
+            return
+        try:
+            events = [e for e in self.get_changes_since(stored or 0) if e.table == "paths"]
+        except change_feed.ChangeLogPrunedError:
+            stored = None
+        if (
+            stored is None
+            or len(events) > subtree_stats.REBUILD_THRESHOLD
+            or any(e.operation != "insert" for e in events)
+        ):
+            graph = CompactGraph.from_frames(self.iter_path_columns())
+            if not subtree_stats.rebuild(self.conn, graph, seq):
+                raise NarrativeCycleError("Subtree statistics need an acyclic narrative graph.")
+            return
+        frame = self.get_path_columns([e.key for e in events])
+        edges = dict(zip(frame["path_uuid"], zip(frame["prev_uuid"], frame["uuid"])))
+        subtree_stats.apply_paths(
+            self.conn, self._paths_source, [edges[e.key] for e in events if e.key in edges], seq
+        )
+
+    def get_subtree_stats(self, hronir_uuids: list[str]) -> dict[str, dict[str, int]]:
+        """Descendants, max_depth and leaves below each given hrönir (see subtree_stats.py)."""
+        self._ensure_subtree_stats()
+        return subtree_stats.fetch(self.conn, hronir_uuids)
+
+    def get_largest_subtrees(self, limit: int = 10, by: str = "descendants") -> list[dict]:
+        self._ensure_subtree_stats()
+        return subtree_stats.largest(self.conn, limit, by)
+
+    # --- Integrity validation ---
+    def _path_integrity_chunk(
+        self, namespace: uuid.UUID, num_chunks: int, chunk: int
+    ) -> list[tuple]:
+        conn = self.conn.cursor() if num_chunks > 1 else self.conn
+        chunk_filter = f"WHERE hash(path_uuid) % {num_chunks} = {chunk}" if num_chunks > 1 else ""
+        try:
+            if conn is not self.conn:
+                self._attach_cold_storage(conn)
+            return conn.execute(
+                f"""
+                WITH chunk AS (
+                    SELECT path_uuid, position, prev_uuid, uuid FROM {self._paths_source}
+                    {chunk_filter}
+                ),
+                expected AS (
+                    -- Binding the digest through a lambda evaluates SHA-1 once per row
+                    -- instead of once per reference in the formatting expression.
+                    SELECT *, list_transform(
+                        [sha1(?::BLOB || encode(
+                            CAST(position AS VARCHAR) || ':' || COALESCE(prev_uuid, '')
+                            || ':' || uuid
+                        ))],
+                        digest -> {UUID5_FROM_DIGEST_SQL}
+                    )[1] AS expected_path_uuid
+                    FROM chunk
+                )
+                SELECT 'missing_current', path_uuid, position, prev_uuid, uuid, NULL
+                FROM chunk c
+                WHERE NOT EXISTS (SELECT 1 FROM {self._hronirs_source} h WHERE h.uuid = c.uuid)
+                UNION ALL
+                SELECT 'missing_predecessor', path_uuid, position, prev_uuid, uuid, NULL
+                FROM chunk c
+                WHERE COALESCE(c.prev_uuid, '') <> ''
+                  AND NOT EXISTS (
+                      SELECT 1 FROM {self._hronirs_source} h WHERE h.uuid = c.prev_uuid
+                  )
+                UNION ALL
+                SELECT 'path_uuid_mismatch', path_uuid, position, prev_uuid, uuid,
+                       expected_path_uuid
+                FROM expected
+                WHERE path_uuid IS DISTINCT FROM expected_path_uuid
+                """,
+                (namespace.bytes,),
+            ).fetchall()
+        finally:
+            if conn is not self.conn:
+                conn.close()
+
+    def find_path_integrity_violations(
+        self, namespace: uuid.UUID, num_chunks: int = 1
+    ) -> list[tuple]:
+        """
+        Set-based integrity scan of every path. Returns (check, path_uuid, position,
+        prev_uuid, uuid, expected_path_uuid) rows, where check is one of
+        'missing_current', 'missing_predecessor' or 'path_uuid_mismatch'.
+        Missing hrönirs are found with anti-joins and expected path UUIDs are recomputed
+        in SQL. With num_chunks > 1 the paths are split by hash and the chunks run
+        concurrently on separate cursors.
+        """
+        num_chunks = max(1, num_chunks)
+        if num_chunks == 1:
+            rows = self._path_integrity_chunk(namespace, 1, 0)
+        else:
+            with ThreadPoolExecutor(max_workers=num_chunks) as executor:
+                chunks = executor.map(
+                    lambda chunk: self._path_integrity_chunk(namespace, num_chunks, chunk),
+                    range(num_chunks),
+                )
+                rows = [row for chunk_rows in chunks for row in chunk_rows]
+        return sorted(rows, key=lambda row: (row[0], row[2], row[1]))
+
+    def count_paths(self) -> int:
+        return self.conn.execute(f"SELECT COUNT(*) FROM {self._paths_source}").fetchone()[0]
+
+    def count_hronirs(self) -> int:
+        return self.conn.execute(f"SELECT COUNT(*) FROM {self._hronirs_source}").fetchone()[0]
+
+    # --- Cold storage tiering ---
+    def _cold_glob(self, table: str) -> str | None:
+        """Glob of the partitioned Parquet files for a tiered table, or None if there are none."""
+        if self.cold_storage_dir is None:
+            return None
+        table_dir = self.cold_storage_dir / table
+        if not any(table_dir.glob("position=*/*.parquet")):
+            return None
+        return str(table_dir.resolve() / "position=*" / "*.parquet")
+
+    def _not_archived(self, table: str, key: str) -> str:
+        """WHERE clause keeping rows whose key is not archived yet, for INSERT ... SELECT."""
+        if getattr(self, f"_{table}_source") == table:
+            return ""
+        return f"WHERE {key} NOT IN (SELECT {key} FROM cold_{table})"
+
+    def _attach_cold_storage(self, conn: duckdb.DuckDBPyConnection | None = None) -> None:
+        """
+        Exposes tiered Parquet partitions through temporary views. Temporary views keep
+        the DuckDB file free of references to local paths, so snapshots stay portable.
+        They are per connection, so cursors opened with conn.cursor() need their own.
+        """
+        conn = conn or self.conn
+        paths_glob = self._cold_glob("paths")
+        if paths_glob:
+            conn.execute(
+                f"""
+                CREATE OR REPLACE TEMP VIEW cold_paths AS
+                SELECT path_uuid, CAST(position AS INTEGER) AS position, prev_uuid, uuid,
+                       status, mandate_id
+                FROM read_parquet('{paths_glob}', hive_partitioning = true)
+                """
+            )
+            conn.execute(
+                f"""
+                CREATE OR REPLACE TEMP VIEW all_paths AS
+                SELECT {PATH_COLUMNS} FROM paths
+                UNION ALL
+                SELECT {PATH_COLUMNS} FROM cold_paths
+                """
+            )
+            self._paths_source = "all_paths"
+
+        hronirs_glob = self._cold_glob("hronirs")
+        if hronirs_glob:
+            conn.execute(
+                f"""
+                CREATE OR REPLACE TEMP VIEW cold_hronirs AS
+                SELECT {HRONIR_COLUMNS}
+                FROM read_parquet('{hronirs_glob}', hive_partitioning = true)
+                """
+            )
+            conn.execute(
+                f"""
+                CREATE OR REPLACE TEMP VIEW all_hronirs AS
+                SELECT {HRONIR_COLUMNS} FROM hronirs
+                UNION ALL
+                SELECT {HRONIR_COLUMNS} FROM cold_hronirs
+                """
+            )
+            self._hronirs_source = "all_hronirs"
+
+    def archive_settled_positions(self, before_position: int) -> dict[str, int]:
+        """
+        Moves paths at positions < before_position, and the hrönirs only those paths
+        introduce, from the hot tables into Parquet files partitioned by position under
+        cold_storage_dir. Reads keep seeing them through the cold views.
+        Settled positions are treated as closed: paths added there later land in the hot
+        table again and are archived by the next run.
+        Returns the number of paths and hrönirs moved.
+        """
+        if self.cold_storage_dir is None:
+            raise ValueError("No cold_storage_dir configured for this DuckDBDataManager.")
+        self.cold_storage_dir.mkdir(parents=True, exist_ok=True)
+        # Parquet files are not transactional: they are written to a staging directory next
+        # to the partitions and only moved into place once the hot DELETE has committed.
+        staging_dir = Path(tempfile.mkdtemp(prefix=".staging-", dir=self.cold_storage_dir))
+        paths_dir = (staging_dir / "paths").resolve()
+        hronirs_dir = (staging_dir / "hronirs").resolve()
+
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            self.conn.execute(
+                f"""
+                CREATE OR REPLACE TEMP TABLE tier_paths AS
+                SELECT {PATH_COLUMNS} FROM paths WHERE position < ?
+                """,
+                (before_position,),
+            )
+            # A hrönir is settled when every hot path introducing it is being archived.
+            self.conn.execute(
+                """
+                CREATE OR REPLACE TEMP TABLE tier_hronirs AS
+                SELECT h.uuid, h.content, h.created_at, h.metadata, t.position
+                FROM hronirs h
+                JOIN (SELECT uuid, MIN(position) AS position FROM tier_paths GROUP BY uuid) t
+                    ON t.uuid = h.uuid
+                WHERE h.uuid NOT IN (SELECT uuid FROM paths WHERE position >= ?)
+                """,
+                (before_position,),
+            )
+            moved_paths = self.conn.execute("SELECT COUNT(*) FROM tier_paths").fetchone()[0]
+            moved_hronirs = self.conn.execute("SELECT COUNT(*) FROM tier_hronirs").fetchone()[0]
+
+            if moved_paths:
+                self.conn.execute(
+                    f"COPY tier_paths TO '{paths_dir}' "
+                    "(FORMAT PARQUET, PARTITION_BY (position), FILENAME_PATTERN 'data_{uuid}')"
+                )
+                self.conn.execute(
+                    "DELETE FROM paths WHERE path_uuid IN (SELECT path_uuid FROM tier_paths)"
+                )
+            if moved_hronirs:
+                self.conn.execute(
+                    f"COPY tier_hronirs TO '{hronirs_dir}' "
+                    "(FORMAT PARQUET, PARTITION_BY (position), FILENAME_PATTERN 'data_{uuid}')"
+                )
+                self.conn.execute(
+                    "DELETE FROM hronirs WHERE uuid IN (SELECT uuid FROM tier_hronirs)"
+                )
+
+            self.conn.execute("DROP TABLE tier_paths")
+            self.conn.execute("DROP TABLE tier_hronirs")
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+        # File names are unique, so staged partitions merge into the existing ones.
+        for staged in sorted(staging_dir.glob("*/position=*/*.parquet")):
+            target = self.cold_storage_dir / staged.relative_to(staging_dir)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            staged.replace(target)
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+        # Reclaim the space of the deleted rows in the hot file.
+        self.conn.execute("CHECKPOINT")
+        self._attach_cold_storage()
+        logging.info(
+            f"Archived {moved_paths} paths and {moved_hronirs} hrönirs below position "
+            f"{before_position} to {self.cold_storage_dir}"
+        )
+        return {"paths": moved_paths, "hronirs": moved_hronirs}
+
     # --- Utility methods ---
     def initialize_if_needed(self) -> None:
         if not self._initialized:
             self.load_all_data()
 
     def clear_in_memory_data(self) -> None:
-        self.conn.execute("DELETE FROM paths")
+        deleted = self.conn.execute("DELETE FROM paths RETURNING path_uuid").fetchall()
+        self._record_changes("paths", [row[0] for row in deleted], "delete")
+        self._topological_order = None
         # votes delete removed
         self.conn.execute("DELETE FROM transactions")
         self.conn.commit()
 
+    def close(self) -> None:
+        """Closes the connection. Uncommitted work is rolled back by DuckDB."""
+        self.change_feed.flush()
+        self.conn.close()
+        self._initialized = False
+
     def __enter__(self) -> "DuckDBDataManager":
         self.initialize_if_needed()
         return self
@@ -294,12 +1174,34 @@ class DuckDBDataManager:
         self._initialized = False
 
     # --- Snapshotting with ShardingManager ---
+    def _copy_with_cold_rows(self, target: Path) -> None:
+        """Copies the database to `target` with the archived rows back in the hot tables."""
+        database = self.conn.execute("SELECT current_database()").fetchone()[0]
+        escaped = str(target).replace("'", "''")
+        self.conn.execute(f"ATTACH '{escaped}' AS snapshot_db")
+        try:
+            self.conn.execute(f'COPY FROM DATABASE "{database}" TO snapshot_db')
+            if self._paths_source != "paths":
+                self.conn.execute(
+                    f"INSERT INTO snapshot_db.main.paths ({PATH_COLUMNS}) "
+                    f"SELECT {PATH_COLUMNS} FROM cold_paths"
+                )
+            if self._hronirs_source != "hronirs":
+                self.conn.execute(
+                    f"INSERT INTO snapshot_db.main.hronirs ({HRONIR_COLUMNS}) "
+                    f"SELECT {HRONIR_COLUMNS} FROM cold_hronirs"
+                )
+        finally:
+            self.conn.execute("DETACH snapshot_db")
+
     def create_snapshot(
         self, output_dir: Path, network_uuid: str, git_commit: str | None = None
     ) -> SnapshotManifest:
         """
         Creates a snapshot of the current DuckDB database, potentially sharded.
         The snapshot is saved to the specified output_dir.
+        Rows archived in cold storage are rehydrated into a temporary copy of the database
+        first, so the snapshot always holds the complete library.
         """
         if not self._initialized:
             self.load_all_data()  # Ensure data is loaded and DB is consistent
@@ -308,16 +1210,24 @@ class DuckDBDataManager:
 
         logging.info(f"Creating snapshot from DB: {self.db_path} into {output_dir}")
 
-        sharding_manager = ShardingManager()  # Uses default temp dir
+        sharding_manager = ShardingManager(  # Uses default temp dir
+            memory_limit=self.memory_limit, temp_directory=self.temp_directory
+        )
 
-        # Ensure the db_path for sharding manager is absolute, as it might run from different CWDs
-        absolute_db_path = self.db_path.resolve()
+        with tempfile.TemporaryDirectory(dir=self.temp_directory) as work_dir:
+            if self._cold_glob("paths") or self._cold_glob("hronirs"):
+                source_path = Path(work_dir) / self.db_path.name
+                self._copy_with_cold_rows(source_path)
+            else:
+                # Ensure the db_path for sharding manager is absolute, as it might run from
+                # different CWDs
+                source_path = self.db_path.resolve()
 
-        manifest = sharding_manager.create_sharded_snapshot(
-            duckdb_path=absolute_db_path,
-            output_dir=output_dir,
-            network_uuid=network_uuid,
-            git_commit=git_commit,
-        )
+            manifest = sharding_manager.create_sharded_snapshot(
+                duckdb_path=source_path,
+                output_dir=output_dir,
+                network_uuid=network_uuid,
+                git_commit=git_commit,
+            )
         logging.info(f"Snapshot manifest created by DuckDBDataManager: {manifest.merkle_root}")
         return manifest
@@ -0,0 +1,110 @@
+"""
+Whole-graph audits that run inside DuckDB.
+
+Orphans, the frontier, reachability from the root and per-hrönir depth are answered with
+anti-joins and recursive CTEs over the paths table (or the hot+cold view), so only the
+answer crosses into Python, never the graph itself.
+"""
+
+import duckdb
+import pandas as pd
+
+# Hrönirs linked to the root by a chain of paths.
+_REACHABLE_CTE = """
+    WITH RECURSIVE reach(uuid) AS (
+        SELECT uuid FROM {source} WHERE COALESCE(prev_uuid, '') = ''
+        UNION
+        SELECT p.uuid FROM {source} p JOIN reach r ON p.prev_uuid = r.uuid
+    )
+"""
+
+# Every (hrönir, route length from the root). UNION keeps one row per distinct length, and
+# the bound stops a cycle inserted around add_path from recursing forever.
+_WALK_CTE = """
+    WITH RECURSIVE walk(uuid, depth) AS (
+        SELECT uuid, 0 FROM {source} WHERE COALESCE(prev_uuid, '') = ''
+        UNION
+        SELECT p.uuid, w.depth + 1 FROM {source} p
+        JOIN walk w ON p.prev_uuid = w.uuid
+        WHERE w.depth < (SELECT COUNT(*) FROM {source})
+    ),
+    depths AS (SELECT uuid, MIN(depth) AS depth FROM walk GROUP BY uuid)
+"""
+
+
+class GraphAnalytics:
+    """Set-based graph queries over one connection and paths source."""
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection, paths_source: str = "paths"):
+        self.conn = conn
+        self.source = paths_source
+
+    def orphan_paths(self) -> list[str]:
+        """Paths whose predecessor is not introduced by any path, by path_uuid."""
+        rows = self.conn.execute(
+            f"""
+            SELECT p.path_uuid FROM {self.source} p
+            WHERE COALESCE(p.prev_uuid, '') <> ''
+              AND NOT EXISTS (SELECT 1 FROM {self.source} h WHERE h.uuid = p.prev_uuid)
+            ORDER BY p.path_uuid
+            """
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def frontier(self, limit: int | None = None) -> list[str]:
+        """Hrönirs nobody has continued yet, deepest position first."""
+        query = f"""
+            SELECT p.uuid FROM {self.source} p
+            WHERE NOT EXISTS (SELECT 1 FROM {self.source} c WHERE c.prev_uuid = p.uuid)
+            GROUP BY p.uuid
+            ORDER BY MAX(p.position) DESC, p.uuid
+        """
+        params: list = []
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [row[0] for row in self.conn.execute(query, params).fetchall()]
+
+    def unreachable_hronirs(self) -> list[str]:
+        """Hrönirs introduced by some path that no chain of paths links to the root."""
+        rows = self.conn.execute(
+            _REACHABLE_CTE.format(source=self.source)
+            + f"""
+            SELECT DISTINCT uuid FROM {self.source}
+            WHERE uuid NOT IN (SELECT uuid FROM reach)
+            ORDER BY uuid
+            """
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def depths(self) -> pd.DataFrame:
+        """
+        (uuid, depth) for every hrönir reachable from the root: the fewest paths between
+        the root and it, 0 at position 0. Unreachable hrönirs are left out.
+        """
+        return self.conn.execute(
+            _WALK_CTE.format(source=self.source) + "SELECT * FROM depths ORDER BY depth, uuid"
+        ).df()
+
+    def summary(self) -> dict[str, int]:
+        """Counts of paths, hrönirs, orphan paths, frontier and unreachable hrönirs, max depth."""
+        counts = self.conn.execute(
+            _REACHABLE_CTE.format(source=self.source)
+            + f"""
+            SELECT
+                (SELECT COUNT(*) FROM {self.source}),
+                (SELECT COUNT(DISTINCT uuid) FROM {self.source}),
+                (SELECT COUNT(*) FROM {self.source} p
+                 WHERE COALESCE(p.prev_uuid, '') <> ''
+                   AND NOT EXISTS (SELECT 1 FROM {self.source} h WHERE h.uuid = p.prev_uuid)),
+                (SELECT COUNT(DISTINCT p.uuid) FROM {self.source} p
+                 WHERE NOT EXISTS (SELECT 1 FROM {self.source} c WHERE c.prev_uuid = p.uuid)),
+                (SELECT COUNT(DISTINCT uuid) FROM {self.source}
+                 WHERE uuid NOT IN (SELECT uuid FROM reach))
+            """
+        ).fetchone()
+        max_depth = self.conn.execute(
+            _WALK_CTE.format(source=self.source) + "SELECT COALESCE(MAX(depth), 0) FROM depths"
+        ).fetchone()[0]
+        names = ("paths", "hronirs", "orphan_paths", "frontier", "unreachable_hronirs")
+        return {**dict(zip(names, counts, strict=True)), "max_depth": max_depth}
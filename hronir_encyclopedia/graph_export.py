@@ -0,0 +1,204 @@
+"""
+Streaming export of the narrative graph to GraphML, DOT or Parquet edge lists.
+
+Nodes and edges are read from the paths table (or the hot+cold view) in DataFrame chunks
+and written out as they arrive, so memory stays flat however large the graph is: no
+NetworkX graph or CompactGraph is built. Position-0 paths hang from ROOT_NODE, as in
+graph_logic. The export can be narrowed to a position range and/or to the hrönirs within
+a number of paths of a seed set such as the canonical path.
+"""
+
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+import duckdb
+import pandas as pd
+
+from .compact_graph import ROOT_NODE
+
+EXPORT_FORMATS = ("graphml", "dot", "parquet")
+
+EXPORT_BATCH_SIZE = 65_536
+
+# Hrönirs within `radius` paths of a seed, following paths in either direction. UNION on
+# (uuid, hops) keeps the walk finite on cycles; the radius bounds it.
+_NEIGHBOURHOOD_CTE = """
+    near(uuid, hops) AS (
+        SELECT UNNEST(?::VARCHAR[]), 0
+        UNION
+        SELECT CASE WHEN p.uuid = n.uuid THEN COALESCE(p.prev_uuid, '') ELSE p.uuid END,
+               n.hops + 1
+        FROM {source} p JOIN near n ON p.uuid = n.uuid OR p.prev_uuid = n.uuid
+        WHERE n.hops < ?
+    ),
+    kept AS (SELECT DISTINCT uuid FROM near WHERE uuid <> ''),
+"""
+
+
+class GraphExport:
+    """
+    The (optionally filtered) edges of the narrative graph and their endpoints, streamed
+    from one connection. Each chunk query runs on `conn` itself, so the connection must
+    not be used for anything else while an iterator is being consumed.
+    """
+
+    def __init__(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        paths_source: str = "paths",
+        min_position: int | None = None,
+        max_position: int | None = None,
+        around: Iterable[str] | None = None,
+        radius: int = 0,
+    ):
+        self.conn = conn
+        self.source = paths_source
+        self.min_position = min_position
+        self.max_position = max_position
+        self.around = None if around is None else [str(uuid) for uuid in around]
+        self.radius = radius
+
+    def _edges_sql(self) -> tuple[str, list]:
+        """WITH clause defining `edges(path_uuid, position, source, target)`, and its params."""
+        clauses, params = [], []
+        sql = "WITH RECURSIVE "
+        if self.around is not None:
+            sql += _NEIGHBOURHOOD_CTE.format(source=self.source)
+            params += [self.around, self.radius]
+            clauses.append(
+                "p.uuid IN (SELECT uuid FROM kept) AND (COALESCE(p.prev_uuid, '') = '' "
+                "OR p.prev_uuid IN (SELECT uuid FROM kept))"
+            )
+        if self.min_position is not None:
+            clauses.append("p.position >= ?")
+            params.append(self.min_position)
+        if self.max_position is not None:
+            clauses.append("p.position <= ?")
+            params.append(self.max_position)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql += f"""
+            edges AS (
+                SELECT p.path_uuid, p.position,
+                       COALESCE(NULLIF(p.prev_uuid, ''), '{ROOT_NODE}') AS source,
+                       p.uuid AS target
+                FROM {self.source} p {where}
+            )
+        """
+        return sql, params
+
+    def edges_query(self) -> tuple[str, list]:
+        """SQL and params selecting (path_uuid, position, source, target) per exported path."""
+        sql, params = self._edges_sql()
+        return sql + "SELECT path_uuid, position, source, target FROM edges", params
+
+    def nodes_query(self) -> tuple[str, list]:
+        """
+        SQL and params selecting (uuid, position) per endpoint of an exported path; position
+        is the lowest one an exported path introduces the hrönir at, NULL for endpoints only
+        seen as a predecessor (ROOT_NODE, orphans, hrönirs just outside the filter).
+        """
+        sql, params = self._edges_sql()
+        return (
+            sql
+            + """
+            SELECT uuid, MIN(position) AS position FROM (
+                SELECT target AS uuid, position FROM edges
+                UNION ALL
+                SELECT source, NULL FROM edges
+            ) GROUP BY uuid
+            """,
+            params,
+        )
+
+    def _chunks(self, query: tuple[str, list], batch_size: int) -> Iterator[pd.DataFrame]:
+        result = self.conn.execute(*query)
+        vectors = max(1, batch_size // 2048)
+        while len(chunk := result.fetch_df_chunk(vectors)):
+            yield chunk
+
+    def iter_nodes(self, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+        return self._chunks(self.nodes_query(), batch_size)
+
+    def iter_edges(self, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+        return self._chunks(self.edges_query(), batch_size)
+
+    def write(self, output: Path, fmt: str, batch_size: int = EXPORT_BATCH_SIZE) -> int:
+        """Writes the export to `output` in one of EXPORT_FORMATS; returns the edge count."""
+        if fmt == "graphml":
+            return write_graphml(self, output, batch_size)
+        if fmt == "dot":
+            return write_dot(self, output, batch_size)
+        if fmt == "parquet":
+            return write_parquet(self, output)
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {EXPORT_FORMATS}.")
+
+
+def _has_position(value) -> bool:
+    return value is not None and not pd.isna(value)
+
+
+def write_graphml(export: GraphExport, output: Path, batch_size: int = EXPORT_BATCH_SIZE) -> int:
+    edges = 0
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+            '  <key id="position" for="node" attr.name="position" attr.type="int"/>\n'
+            '  <key id="path_uuid" for="edge" attr.name="path_uuid" attr.type="string"/>\n'
+            '  <key id="edge_position" for="edge" attr.name="position" attr.type="int"/>\n'
+            '  <graph id="narrative" edgedefault="directed">\n'
+        )
+        for chunk in export.iter_nodes(batch_size):
+            f.writelines(
+                f"    <node id={quoteattr(uuid)}>"
+                f'<data key="position">{int(position)}</data></node>\n'
+                if _has_position(position)
+                else f"    <node id={quoteattr(uuid)}/>\n"
+                for uuid, position in zip(chunk["uuid"], chunk["position"], strict=True)
+            )
+        for chunk in export.iter_edges(batch_size):
+            f.writelines(
+                f"    <edge source={quoteattr(source)} target={quoteattr(target)}>"
+                f'<data key="path_uuid">{escape(path_uuid)}</data>'
+                f'<data key="edge_position">{int(position)}</data></edge>\n'
+                for path_uuid, position, source, target in chunk.itertuples(index=False, name=None)
+            )
+            edges += len(chunk)
+        f.write("  </graph>\n</graphml>\n")
+    return edges
+
+
+def _dot_id(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def write_dot(export: GraphExport, output: Path, batch_size: int = EXPORT_BATCH_SIZE) -> int:
+    edges = 0
+    with open(output, "w", encoding="utf-8") as f:
+        f.write("digraph narrative {\n")
+        for chunk in export.iter_nodes(batch_size):
+            f.writelines(
+                f"  {_dot_id(uuid)} [position={int(position)}];\n"
+                if _has_position(position)
+                else f"  {_dot_id(uuid)};\n"
+                for uuid, position in zip(chunk["uuid"], chunk["position"], strict=True)
+            )
+        for chunk in export.iter_edges(batch_size):
+            f.writelines(
+                f"  {_dot_id(source)} -> {_dot_id(target)} "
+                f"[path_uuid={_dot_id(path_uuid)}, position={int(position)}];\n"
+                for path_uuid, position, source, target in chunk.itertuples(index=False, name=None)
+            )
+            edges += len(chunk)
+        f.write("}\n")
+    return edges
+
+
+def write_parquet(export: GraphExport, output: Path) -> int:
+    """Edge list (path_uuid, position, source, target), written by DuckDB's COPY."""
+    sql, params = export.edges_query()
+    escaped = str(output).replace("'", "''")
+    return export.conn.execute(f"COPY ({sql}) TO '{escaped}' (FORMAT PARQUET)", params).fetchone()[
+        0
+    ]
@@ -1,35 +1,200 @@
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+
 import networkx as nx
+import pandas as pd
 
 from . import storage  # To access DataManager
+from .change_feed import ChangeLogPrunedError
+from .compact_graph import ROOT_NODE, CompactGraph, read_snapshot_metadata
+from .graph_analytics import GraphAnalytics
+from .lineage import LineageIndex
 
-ROOT_NODE = "__ROOT__"
+__all__ = [
+    "ROOT_NODE",
+    "export_graph_snapshot",
+    "find_common_ancestor",
+    "get_compact_graph",
+    "get_graph_analytics",
+    "get_largest_subtrees",
+    "get_lineage",
+    "get_lineage_index",
+    "get_narrative_graph",
+    "get_subtree_stats",
+    "is_graph_snapshot_current",
+    "is_narrative_consistent",
+    "load_graph_snapshot",
+]
 
 
-def get_narrative_graph() -> nx.DiGraph:
-    """Build a directed graph from Path entries using pandas data manager."""
-    G = nx.DiGraph()
-    G.add_node(ROOT_NODE)
+@dataclass
+class _CachedGraph:
+    """A graph built from the paths as of change `seq` (see change_feed)."""
 
-    data_manager = storage.DataManager()
-    data_manager.initialize_and_load()
+    seq: int
+    compact: CompactGraph
+    networkx: nx.DiGraph | None = None
+    lineage: LineageIndex | None = None
+
+
+_graph_cache: "weakref.WeakKeyDictionary[storage.DataManager, _CachedGraph]" = (
+    weakref.WeakKeyDictionary()
+)
 
-    all_paths = data_manager.get_all_paths()
-    for path in all_paths:
-        # Handle prev_uuid, cur_uuid, and path_uuid as strings
-        prev_uuid_str = str(path.prev_uuid) if path.prev_uuid else None
-        cur_uuid_str = str(path.uuid)
-        path_uuid_str = str(path.path_uuid)
 
-        if prev_uuid_str:
-            G.add_edge(prev_uuid_str, cur_uuid_str, path_uuid=path_uuid_str)
+def _add_edges(G: nx.DiGraph, frame: pd.DataFrame) -> None:
+    G.add_edges_from(
+        (prev or ROOT_NODE, hronir, {"path_uuid": path_uuid})
+        for path_uuid, prev, hronir in zip(
+            frame["path_uuid"], frame["prev_uuid"], frame["uuid"], strict=True
+        )
+    )
+
+
+def _cached_graph(data_manager: storage.DataManager) -> _CachedGraph:
+    """
+    The cached graph of a data manager, brought up to date with the change log: new paths
+    are appended as edges, and anything else touching the paths (a delete), or a log
+    pruned past the cached sequence, rebuilds it.
+    """
+    if not data_manager._initialized:
+        data_manager.initialize_and_load()
+    seq = data_manager.last_change_seq()
+    cached = _graph_cache.get(data_manager)
+    if cached is not None and cached.seq != seq:
+        try:
+            events = data_manager.get_changes_since(cached.seq)
+        except ChangeLogPrunedError:
+            events = None
+        path_events = [event for event in events or [] if event.table == "paths"]
+        if events is None or any(event.operation != "insert" for event in path_events):
+            cached = None
         else:
-            # If prev_uuid is None or empty, connect from ROOT_NODE
-            G.add_edge(ROOT_NODE, cur_uuid_str, path_uuid=path_uuid_str)
+            if path_events:
+                frame = data_manager.get_path_columns(event.key for event in path_events)
+                cached.compact = cached.compact.with_frame(frame)
+                cached.lineage = None
+                if cached.networkx is not None:
+                    _add_edges(cached.networkx, frame)
+            cached.seq = max([seq] + [event.seq for event in events])
+    if cached is None:
+        # seq is read before the scan: paths written meanwhile are appended again next
+        # time, and with_frame skips the ones the scan already saw.
+        cached = _CachedGraph(seq, CompactGraph.from_frames(data_manager.iter_path_columns()))
+        _graph_cache[data_manager] = cached
+    return cached
+
+
+def get_compact_graph(data_manager: storage.DataManager | None = None) -> CompactGraph:
+    """
+    The narrative graph as a CompactGraph, built from a columnar scan of the paths and
+    cached until the change log shows new paths.
+    """
+    return _cached_graph(data_manager or storage.get_data_manager()).compact
+
+
+def get_narrative_graph(data_manager: storage.DataManager | None = None) -> nx.DiGraph:
+    """
+    Build a directed graph from Path entries. Position-0 paths hang from ROOT_NODE and each
+    edge carries its path_uuid. The graph is cached and shared between calls, so copy it
+    before mutating it. Prefer get_compact_graph for whole-library analysis.
+    """
+    cached = _cached_graph(data_manager or storage.get_data_manager())
+    if cached.networkx is None:
+        cached.networkx = cached.compact.to_networkx()
+    return cached.networkx
+
+
+def get_lineage_index(data_manager: storage.DataManager | None = None) -> LineageIndex:
+    """Binary-lifting ancestor table of the narrative graph, cached with the graph."""
+    cached = _cached_graph(data_manager or storage.get_data_manager())
+    if cached.lineage is None:
+        cached.lineage = LineageIndex(cached.compact)
+    return cached.lineage
+
+
+def get_lineage(hronir_uuid: str, data_manager: storage.DataManager | None = None) -> list[dict]:
+    """
+    The paths leading to a hrönir from position 0, following the path that introduced each
+    chapter first, as {'position', 'path_uuid', 'hrönir_uuid'} dicts.
+    """
+    return get_lineage_index(data_manager).lineage(str(hronir_uuid))
 
-    return G
+
+def find_common_ancestor(
+    hronir_a: str, hronir_b: str, data_manager: storage.DataManager | None = None
+) -> str | None:
+    """The last hrönir two lineages share before they diverge, or None if only the root."""
+    return get_lineage_index(data_manager).lowest_common_ancestor(str(hronir_a), str(hronir_b))
+
+
+def export_graph_snapshot(
+    directory: Path, data_manager: storage.DataManager | None = None
+) -> CompactGraph:
+    """
+    Saves the narrative graph as a binary CSR snapshot (.npy arrays and graph.json) tagged
+    with the change-log sequence it reflects. Worker processes open it with
+    load_graph_snapshot instead of rebuilding the graph from DuckDB.
+    """
+    data_manager = data_manager or storage.get_data_manager()
+    cached = _cached_graph(data_manager)
+    cached.compact.save(Path(directory), change_seq=cached.seq)
+    return cached.compact
+
+
+def load_graph_snapshot(directory: Path, mmap: bool = True) -> CompactGraph:
+    """
+    Opens a snapshot written by export_graph_snapshot. The arrays are memory-mapped
+    read-only, so processes sharing a snapshot share one copy in the page cache.
+    """
+    return CompactGraph.load(Path(directory), mmap_mode="r" if mmap else None)
+
+
+def is_graph_snapshot_current(
+    directory: Path, data_manager: storage.DataManager | None = None
+) -> bool:
+    """True if no change was recorded since the snapshot in `directory` was exported."""
+    data_manager = data_manager or storage.get_data_manager()
+    try:
+        info = read_snapshot_metadata(Path(directory))
+    except FileNotFoundError:
+        return False
+    return info.get("change_seq") == data_manager.last_change_seq()
+
+
+def get_graph_analytics(data_manager: storage.DataManager | None = None) -> GraphAnalytics:
+    """
+    Orphan paths, frontier, unreachable hrönirs and depth per hrönir, computed by recursive
+    CTEs inside DuckDB; use it for audits over graphs too large to load.
+    """
+    return (data_manager or storage.get_data_manager()).graph_analytics()
+
+
+def get_subtree_stats(
+    hronir_uuid: str, data_manager: storage.DataManager | None = None
+) -> dict[str, int] | None:
+    """
+    Descendants, max_depth and leaves below a hrönir, read from the precomputed
+    subtree_stats table, or None if no path mentions it.
+    """
+    data_manager = data_manager or storage.get_data_manager()
+    return data_manager.get_subtree_stats([str(hronir_uuid)]).get(str(hronir_uuid))
+
+
+def get_largest_subtrees(
+    limit: int = 10, by: str = "descendants", data_manager: storage.DataManager | None = None
+) -> list[dict]:
+    """The hrönirs with the most descendants (or max_depth / leaves), largest first."""
+    data_manager = data_manager or storage.get_data_manager()
+    return data_manager.get_largest_subtrees(limit, by)
 
 
 def is_narrative_consistent() -> bool:
-    """Return True if the narrative graph contains no cycles."""
-    G = get_narrative_graph()
-    return nx.is_directed_acyclic_graph(G)
+    """
+    Return True if the narrative graph contains no cycles. Paths closing a cycle are
+    rejected on insert, so this reads the maintained topological order.
+    """
+    data_manager = storage.get_data_manager()
+    data_manager.initialize_and_load()
+    return data_manager.is_narrative_acyclic()
@@ -0,0 +1,121 @@
+"""
+Lineage and common-ancestor queries over the narrative graph.
+
+A hrönir can continue several predecessors, so its lineage follows the path that
+introduced it first: the one at the lowest position, with ties broken by the graph's edge
+order. Those parent links form a tree under the root, and a binary-lifting table
+(ancestor 2^k levels up, for every k) answers ancestor-at-depth and lowest-common-ancestor
+queries in O(log depth) jumps. The table has log2(deepest lineage) rows and is built with
+whole-array pointer jumping rather than a walk per node.
+"""
+
+from typing import Any
+
+import numpy as np
+
+from .compact_graph import ROOT_ID, CompactGraph
+
+
+class LineageIndex:
+    """Binary-lifting ancestor table of the first-introduction tree of a CompactGraph."""
+
+    def __init__(self, graph: CompactGraph):
+        self._graph = graph
+        num_nodes = graph.num_nodes
+        # Earliest in-edge of every node; nodes no path introduces are their own parent.
+        by_target = np.lexsort((graph.positions, graph.targets))
+        targets = graph.targets[by_target]
+        first = np.ones(len(targets), dtype=bool)
+        first[1:] = targets[1:] != targets[:-1]
+        self._parent_edge = np.full(num_nodes, -1, dtype=np.int64)
+        self._parent_edge[targets[first]] = by_target[first]
+
+        parent = np.arange(num_nodes, dtype=np.int32)
+        introduced = self._parent_edge >= 0
+        parent[introduced] = graph.sources[self._parent_edge[introduced]]
+
+        # Pointer jumping: level k holds the ancestor 2^k steps up, and `steps` how far
+        # that is, which stops growing at the top of each tree. Once every level-k
+        # ancestor is a top, steps is each node's distance to its top.
+        self._up = [parent]
+        steps = introduced.astype(np.int32)
+        up = parent
+        while not np.array_equal(up[up], up):
+            if len(self._up) > num_nodes.bit_length():
+                break
+            steps = steps + steps[up]
+            up = up[up]
+            self._up.append(up)
+        # Every jump must end at a real top; on a cycle it never settles or lands mid-loop.
+        if not np.array_equal(parent[up], up):
+            raise ValueError("The narrative graph has a cycle; lineages are undefined.")
+        # Depth counts the hrönirs before a node; the root is not one of them.
+        self._steps = steps
+        self._depth = steps - (up == ROOT_ID)
+
+    def _node(self, hronir_uuid: str) -> int | None:
+        return self._graph.node_id(hronir_uuid)
+
+    def depth(self, hronir_uuid: str) -> int | None:
+        """Number of hrönirs before this one in its lineage (0 at position 0)."""
+        node = self._node(hronir_uuid)
+        return None if node is None else int(self._depth[node])
+
+    def _lift(self, node: int, steps: int) -> int:
+        k = 0
+        while steps:
+            if steps & 1:
+                node = int(self._up[k][node])
+            steps >>= 1
+            k += 1
+        return node
+
+    def ancestor_at_depth(self, hronir_uuid: str, depth: int) -> str | None:
+        """The hrönir of this lineage at the given depth, or None if the lineage is shorter."""
+        node = self._node(hronir_uuid)
+        if node is None or depth < 0:
+            return None
+        steps = int(self._depth[node]) - depth
+        if steps < 0:
+            return None
+        return self._graph.node_uuid(self._lift(node, steps))
+
+    def lowest_common_ancestor(self, hronir_a: str, hronir_b: str) -> str | None:
+        """
+        The deepest hrönir both lineages share, i.e. where the branches diverge; None if
+        they only meet at the root or a hrönir is unknown.
+        """
+        a, b = self._node(hronir_a), self._node(hronir_b)
+        if a is None or b is None:
+            return None
+        if self._steps[a] < self._steps[b]:
+            a, b = b, a
+        a = self._lift(a, int(self._steps[a] - self._steps[b]))
+        if a != b:
+            for k in range(len(self._up) - 1, -1, -1):
+                if self._up[k][a] != self._up[k][b]:
+                    a, b = int(self._up[k][a]), int(self._up[k][b])
+            a, b = int(self._up[0][a]), int(self._up[0][b])
+        if a != b or a == ROOT_ID:
+            return None
+        return self._graph.node_uuid(a)
+
+    def lineage(self, hronir_uuid: str) -> list[dict[str, Any]]:
+        """
+        The paths leading to a hrönir, from position 0 down to it, in the same
+        {'position', 'path_uuid', 'hrönir_uuid'} shape as the canonical path.
+        """
+        node = self._node(hronir_uuid)
+        chain = []
+        while node is not None and self._parent_edge[node] >= 0:
+            edge = int(self._parent_edge[node])
+            chain.append(
+                {
+                    "position": int(self._graph.positions[edge]),
+                    "path_uuid": self._graph.path_uuid(edge),
+                    "hrönir_uuid": self._graph.node_uuid(node),
+                }
+            )
+            node = int(self._graph.sources[edge])
+        chain.reverse()
+        return chain
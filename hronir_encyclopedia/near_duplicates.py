@@ -0,0 +1,300 @@
+"""
+Near-duplicate detection for hrönirs with MinHash signatures and LSH banding.
+
+Exact duplicates already collapse onto the same UUIDv5. This catches the near-identical
+chapters LLM agents tend to produce: each hrönir gets a MinHash signature over its word
+shingles, and the signature is split into bands whose hashes are indexed in DuckDB. Two
+hrönirs become candidates only when they share a band bucket, so a lookup touches a
+handful of index entries instead of the whole library.
+"""
+
+import hashlib
+
+import duckdb
+import numpy as np
+
+from .search_index import fetch_contents, tokenize
+
+SHINGLE_SIZE = 3  # words per shingle
+NUM_PERM = 128
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+# With 16 bands of 8 rows, pairs around 0.7 Jaccard similarity start becoming candidates.
+DEFAULT_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_rng = np.random.default_rng(seed=1)
+# Fixed seed: signatures are persisted and must stay comparable across processes.
+_PERM_A = _rng.integers(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def shingles(text: str) -> set[str]:
+    """Word n-gram shingles of a text."""
+    tokens = tokenize(text)
+    if len(tokens) < SHINGLE_SIZE:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i : i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text: str) -> np.ndarray | None:
+    """NUM_PERM uint32 MinHash values, or None for a text without words."""
+    text_shingles = shingles(text)
+    if not text_shingles:
+        return None
+    hashes = np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little")
+            for s in text_shingles
+        ),
+        dtype=np.uint64,
+        count=len(text_shingles),
+    )
+    # a * x + b stays below 2**64 because a, b and x are all < 2**32.
+    permuted = (hashes[:, None] * _PERM_A + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def band_keys(signature: np.ndarray) -> list[int]:
+    """One signed 64-bit bucket key per LSH band."""
+    keys = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS : (band + 1) * LSH_ROWS].tobytes()
+        digest = hashlib.blake2b(rows, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def estimated_similarity(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+    """MinHash estimate of the Jaccard similarity of two shingle sets."""
+    return float(np.mean(np.asarray(signature_a) == np.asarray(signature_b)))
+
+
+def ensure_tables(conn: duckdb.DuckDBPyConnection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS hronir_minhash(
+            hronir_uuid TEXT PRIMARY KEY,
+            signature UINTEGER[]
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS hronir_lsh_bands(
+            band INTEGER,
+            bucket BIGINT,
+            hronir_uuid TEXT,
+            PRIMARY KEY (band, bucket, hronir_uuid)
+        );
+        """
+    )
+
+
+def index_document(conn: duckdb.DuckDBPyConnection, hronir_uuid: str, content: str) -> None:
+    """(Re)computes the signature and band buckets of one hrönir."""
+    index_documents(conn, [(hronir_uuid, content)])
+
+
+def index_documents(conn: duckdb.DuckDBPyConnection, documents: list[tuple[str, str]]) -> None:
+    """(Re)computes signatures and band buckets for a batch of (hrönir_uuid, content) pairs."""
+    if not documents:
+        return
+    uuids, signatures = [], []
+    band_uuids, band_ids, buckets = [], [], []
+    for hronir_uuid, content in documents:
+        signature = minhash_signature(content or "")
+        uuids.append(hronir_uuid)
+        signatures.append(signature.tolist() if signature is not None else None)
+        if signature is not None:
+            band_uuids.extend([hronir_uuid] * LSH_BANDS)
+            band_ids.extend(range(LSH_BANDS))
+            buckets.extend(band_keys(signature))
+
+    conn.execute(
+        "DELETE FROM hronir_lsh_bands WHERE hronir_uuid IN (SELECT UNNEST(?::VARCHAR[]))",
+        (uuids,),
+    )
+    conn.execute(
+        "DELETE FROM hronir_minhash WHERE hronir_uuid IN (SELECT UNNEST(?::VARCHAR[]))",
+        (uuids,),
+    )
+    conn.execute(
+        """
+        INSERT INTO hronir_minhash(hronir_uuid, signature)
+        SELECT UNNEST(?::VARCHAR[]), UNNEST(?::UINTEGER[][])
+        """,
+        (uuids, signatures),
+    )
+    if band_uuids:
+        conn.execute(
+            """
+            INSERT INTO hronir_lsh_bands(band, bucket, hronir_uuid)
+            SELECT UNNEST(?::INTEGER[]), UNNEST(?::BIGINT[]), UNNEST(?::VARCHAR[])
+            """,
+            (band_ids, buckets, band_uuids),
+        )
+
+
+def backfill(conn: duckdb.DuckDBPyConnection, hronirs_source: str = "hronirs") -> int:
+    """Computes signatures for every hrönir that has none yet. Returns the number indexed."""
+    missing = [
+        row[0]
+        for row in conn.execute(
+            f"""
+            SELECT uuid FROM {hronirs_source}
+            WHERE uuid NOT IN (SELECT hronir_uuid FROM hronir_minhash)
+            """
+        ).fetchall()
+    ]
+    for start in range(0, len(missing), BACKFILL_BATCH_SIZE):
+        batch = missing[start : start + BACKFILL_BATCH_SIZE]
+        index_documents(conn, fetch_contents(conn, hronirs_source, batch))
+    return len(missing)
+
+
+def find_near_duplicates(
+    conn: duckdb.DuckDBPyConnection,
+    content: str,
+    threshold: float = DEFAULT_THRESHOLD,
+    exclude_uuid: str | None = None,
+) -> list[tuple[str, float]]:
+    """Indexed hrönirs whose estimated similarity to `content` reaches the threshold, best first."""
+    signature = minhash_signature(content)
+    if signature is None:
+        return []
+
+    rows = conn.execute(
+        """
+        WITH probe AS (
+            SELECT UNNEST(range(?)) AS band, UNNEST(?::BIGINT[]) AS bucket
+        )
+        SELECT m.hronir_uuid, m.signature
+        FROM hronir_minhash m
+        WHERE m.hronir_uuid IN (
+            SELECT b.hronir_uuid FROM hronir_lsh_bands b
+            JOIN probe p ON b.band = p.band AND b.bucket = p.bucket
+        )
+        """,
+        (LSH_BANDS, band_keys(signature)),
+    ).fetchall()
+
+    matches = []
+    for hronir_uuid, candidate_signature in rows:
+        if hronir_uuid == exclude_uuid:
+            continue
+        similarity = estimated_similarity(signature, candidate_signature)
+        if similarity >= threshold:
+            matches.append((hronir_uuid, similarity))
+    matches.sort(key=lambda m: (-m[1], m[0]))
+    return matches
+
+
+def find_near_duplicates_batch(
+    conn: duckdb.DuckDBPyConnection,
+    documents: list[tuple[str, str]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> dict[str, list[tuple[str, float]]]:
+    """
+    Near-duplicates of each (hrönir_uuid, content) among the indexed hrönirs and the
+    documents before it in the batch, as find_near_duplicates would report them if the
+    documents were stored one by one. Stored candidates are fetched in one query for the
+    whole batch. Documents without any match are left out.
+    """
+    signatures: dict[str, np.ndarray] = {}
+    for hronir_uuid, content in documents:
+        signature = minhash_signature(content or "")
+        if signature is not None:
+            signatures.setdefault(hronir_uuid, signature)
+    if not signatures:
+        return {}
+
+    keys = {hronir_uuid: band_keys(signature) for hronir_uuid, signature in signatures.items()}
+    rows = conn.execute(
+        """
+        WITH probe AS (
+            SELECT UNNEST(?::VARCHAR[]) AS probe_uuid, UNNEST(?::INTEGER[]) AS band,
+                   UNNEST(?::BIGINT[]) AS bucket
+        ),
+        candidates AS (
+            SELECT DISTINCT p.probe_uuid, b.hronir_uuid
+            FROM probe p JOIN hronir_lsh_bands b ON b.band = p.band AND b.bucket = p.bucket
+        )
+        SELECT c.probe_uuid, m.hronir_uuid, m.signature
+        FROM candidates c JOIN hronir_minhash m ON m.hronir_uuid = c.hronir_uuid
+        """,
+        (
+            [hronir_uuid for hronir_uuid in keys for _ in range(LSH_BANDS)],
+            [band for _ in keys for band in range(LSH_BANDS)],
+            [bucket for buckets in keys.values() for bucket in buckets],
+        ),
+    ).fetchall()
+    candidates: dict[str, dict[str, np.ndarray]] = {hronir_uuid: {} for hronir_uuid in keys}
+    for probe_uuid, hronir_uuid, signature in rows:
+        candidates[probe_uuid][hronir_uuid] = signature
+
+    # Earlier documents of the batch sharing a band bucket.
+    seen_buckets: dict[tuple[int, int], list[str]] = {}
+    for hronir_uuid, buckets in keys.items():
+        for band, bucket in enumerate(buckets):
+            earlier = seen_buckets.setdefault((band, bucket), [])
+            for other in earlier:
+                candidates[hronir_uuid].setdefault(other, signatures[other])
+            earlier.append(hronir_uuid)
+
+    results = {}
+    for hronir_uuid, found in candidates.items():
+        matches = [
+            (other, similarity)
+            for other, signature in found.items()
+            if other != hronir_uuid
+            and (similarity := estimated_similarity(signatures[hronir_uuid], signature))
+            >= threshold
+        ]
+        if matches:
+            results[hronir_uuid] = sorted(matches, key=lambda m: (-m[1], m[0]))
+    return results
+
+
+def find_clusters(
+    conn: duckdb.DuckDBPyConnection, threshold: float = DEFAULT_THRESHOLD
+) -> list[list[str]]:
+    """
+    Groups the whole library into near-duplicate clusters (size >= 2).
+    Candidate pairs come from shared band buckets; each pair is confirmed against the
+    signatures, and confirmed pairs are merged with union-find.
+    """
+    pairs = conn.execute(
+        """
+        SELECT DISTINCT a.hronir_uuid, b.hronir_uuid, ma.signature, mb.signature
+        FROM hronir_lsh_bands a
+        JOIN hronir_lsh_bands b
+            ON a.band = b.band AND a.bucket = b.bucket AND a.hronir_uuid < b.hronir_uuid
+        JOIN hronir_minhash ma ON ma.hronir_uuid = a.hronir_uuid
+        JOIN hronir_minhash mb ON mb.hronir_uuid = b.hronir_uuid
+        """
+    ).fetchall()
+
+    parent: dict[str, str] = {}
+
+    def find(node: str) -> str:
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for uuid_a, uuid_b, signature_a, signature_b in pairs:
+        if estimated_similarity(signature_a, signature_b) >= threshold:
+            parent[find(uuid_a)] = find(uuid_b)
+
+    clusters: dict[str, list[str]] = {}
+    for node in parent:
+        clusters.setdefault(find(node), []).append(node)
+    return sorted(
+        (sorted(members) for members in clusters.values() if len(members) > 1),
+        key=lambda members: (-len(members), members[0]),
+    )
@@ -0,0 +1,162 @@
+"""
+Full-text search over hrönir contents.
+
+A tokenized inverted index (term -> hrönir, term frequency) lives next to the hronirs
+table in DuckDB and is ranked with BM25, so queries never pull chapter texts into Python.
+"""
+
+import re
+from collections import Counter
+
+import duckdb
+import pandas as pd
+
+# Letters and digits only: underscores split words, so theme names like
+# "temporal_recursion" are searchable as two terms.
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased word tokens of a text."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def ensure_tables(conn: duckdb.DuckDBPyConnection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS hronir_terms(
+            term TEXT,
+            hronir_uuid TEXT,
+            tf INTEGER,
+            PRIMARY KEY (term, hronir_uuid)
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS hronir_doc_lengths(
+            hronir_uuid TEXT PRIMARY KEY,
+            length INTEGER
+        );
+        """
+    )
+
+
+def index_document(conn: duckdb.DuckDBPyConnection, hronir_uuid: str, content: str) -> None:
+    """(Re)indexes one hrönir. Existing postings for the UUID are replaced."""
+    index_documents(conn, [(hronir_uuid, content)])
+
+
+def index_documents(conn: duckdb.DuckDBPyConnection, documents: list[tuple[str, str]]) -> None:
+    """(Re)indexes a batch of (hrönir_uuid, content) pairs with set-based statements."""
+    if not documents:
+        return
+    uuids, lengths = [], []
+    posting_terms, posting_uuids, posting_tfs = [], [], []
+    for hronir_uuid, content in documents:
+        tokens = tokenize(content or "")
+        for term, tf in Counter(tokens).items():
+            posting_terms.append(term)
+            posting_uuids.append(hronir_uuid)
+            posting_tfs.append(tf)
+        uuids.append(hronir_uuid)
+        lengths.append(len(tokens))
+
+    conn.execute(
+        "DELETE FROM hronir_terms WHERE hronir_uuid IN (SELECT UNNEST(?::VARCHAR[]))", (uuids,)
+    )
+    conn.execute(
+        "DELETE FROM hronir_doc_lengths WHERE hronir_uuid IN (SELECT UNNEST(?::VARCHAR[]))",
+        (uuids,),
+    )
+    if posting_terms:
+        # A registered frame binds far faster than list parameters for large batches.
+        postings = pd.DataFrame(
+            {"term": posting_terms, "hronir_uuid": posting_uuids, "tf": posting_tfs}
+        )
+        conn.register("_hronir_postings", postings)
+        try:
+            conn.execute(
+                """
+                INSERT INTO hronir_terms(term, hronir_uuid, tf)
+                SELECT term, hronir_uuid, tf FROM _hronir_postings
+                """
+            )
+        finally:
+            conn.unregister("_hronir_postings")
+    conn.execute(
+        """
+        INSERT INTO hronir_doc_lengths(hronir_uuid, length)
+        SELECT UNNEST(?::VARCHAR[]), UNNEST(?::INTEGER[])
+        """,
+        (uuids, lengths),
+    )
+
+
+def backfill(conn: duckdb.DuckDBPyConnection, hronirs_source: str = "hronirs") -> int:
+    """Indexes every hrönir that has no postings yet. Returns the number indexed."""
+    missing = [
+        row[0]
+        for row in conn.execute(
+            f"""
+            SELECT uuid FROM {hronirs_source}
+            WHERE uuid NOT IN (SELECT hronir_uuid FROM hronir_doc_lengths)
+            """
+        ).fetchall()
+    ]
+    for start in range(0, len(missing), BACKFILL_BATCH_SIZE):
+        index_documents(
+            conn, fetch_contents(conn, hronirs_source, missing[start : start + BACKFILL_BATCH_SIZE])
+        )
+    return len(missing)
+
+
+def fetch_contents(
+    conn: duckdb.DuckDBPyConnection, hronirs_source: str, hronir_uuids: list[str]
+) -> list[tuple[str, str]]:
+    """(uuid, content) rows for a batch of UUIDs."""
+    return conn.execute(
+        f"SELECT uuid, content FROM {hronirs_source} WHERE uuid IN (SELECT UNNEST(?::VARCHAR[]))",
+        (hronir_uuids,),
+    ).fetchall()
+
+
+def search(conn: duckdb.DuckDBPyConnection, query: str, limit: int = 10) -> list[tuple[str, float]]:
+    """Returns (hrönir_uuid, BM25 score) pairs for a free-text query, best first."""
+    terms = sorted(set(tokenize(query)))
+    if not terms:
+        return []
+
+    rows = conn.execute(
+        f"""
+        WITH q AS (SELECT UNNEST(?::VARCHAR[]) AS term),
+        corpus AS (
+            SELECT COUNT(*) AS n, AVG(length) AS avgdl FROM hronir_doc_lengths
+        ),
+        df AS (
+            SELECT t.term, COUNT(*) AS df
+            FROM hronir_terms t JOIN q ON t.term = q.term
+            GROUP BY t.term
+        )
+        SELECT t.hronir_uuid,
+               SUM(
+                   LN(1 + (corpus.n - df.df + 0.5) / (df.df + 0.5))
+                   * t.tf * ({BM25_K1} + 1)
+                   / (t.tf + {BM25_K1} * (1 - {BM25_B} + {BM25_B} * d.length / corpus.avgdl))
+               ) AS score
+        FROM hronir_terms t
+        JOIN df ON t.term = df.term
+        JOIN hronir_doc_lengths d ON d.hronir_uuid = t.hronir_uuid
+        CROSS JOIN corpus
+        GROUP BY t.hronir_uuid
+        ORDER BY score DESC, t.hronir_uuid
+        LIMIT ?
+        """,
+        (terms, limit),
+    ).fetchall()
+    return [(row[0], row[1]) for row in rows]
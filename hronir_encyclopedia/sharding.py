@@ -7,11 +7,14 @@ import logging
 import os
 import shutil  # Added
 import tempfile
+import zlib
 from pathlib import Path
 
+import blake3
 import duckdb
+import zstd
 
-# import zstandard # Removed
+from .duckdb_settings import apply_memory_settings, parse_memory_limit
 
 # Placeholder for DUCKDB_SCHEMA if it's essential and not easily importable
 # from ..scripts.migrate_to_duckdb import DUCKDB_SCHEMA # This would be an import if scripts was a module
@@ -29,9 +32,11 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 @dataclasses.dataclass
 class ShardInfo:
     file: str  # Name of the shard file (e.g., "shard_001.db.zst")
-    sha256: str  # SHA256 hash of the compressed shard file
+    hash: str  # Digest of the compressed shard file, in hash_algorithm
     size: int  # Size of the compressed shard file in bytes
     tables: list[str] | None = None  # List of tables in this shard (if sharded by table)
+    codec: str | None = None  # "zstd" or "gzip"; None in older manifests (see shard_codec)
+    hash_algorithm: str = "sha256"  # "sha256" or "blake3"; older manifests are all SHA-256
     # Add other relevant info like original_size if needed
 
 
@@ -52,7 +57,8 @@ class SnapshotManifest:
     pgp_signature: str | None = None  # PGP signature of the manifest, assigned later
     merge_script: str | None = None  # SQL script or instructions to merge shards
     snapshot_tool_version: str = "0.1.0"  # Version of the sharding/snapshot tool
-    compression_algorithm: str = "gzip"  # Changed from zstd
+    compression_algorithm: str = "gzip"  # Codec of the shards; older manifests are all gzip
+    hash_algorithm: str = "sha256"  # Algorithm of merkle_root; older manifests are all SHA-256
 
     def to_json(self, indent: int | None = 2) -> str:
         return json.dumps(dataclasses.asdict(self), default=str, indent=indent)
@@ -61,41 +67,258 @@ class SnapshotManifest:
     def from_json(cls, json_str: str) -> "SnapshotManifest":
         data = json.loads(json_str)
         # Convert shard dicts back to ShardInfo objects
-        data["shards"] = [ShardInfo(**s) for s in data.get("shards", [])]
+        shards = data.get("shards", [])
+        for shard in shards:
+            # Manifests written before BLAKE3 stored the digest under "sha256".
+            if "sha256" in shard:
+                shard["hash"] = shard.pop("sha256")
+        data["shards"] = [ShardInfo(**s) for s in shards]
         data["created_at"] = datetime.datetime.fromisoformat(data["created_at"])
         return cls(**data)
 
 
 # --- Helper Functions ---
-def hash_file(filepath: Path, _hash_algo: str = "sha256") -> str:
-    """Computes the hash of a file."""
-    h = hashlib.sha256()
+# Read size of hash_file and the single-pass compress/decompress pipelines.
+SNAPSHOT_BUFFER_SIZE = 8 * 1024 * 1024
+
+HASH_ALGORITHMS = ("sha256", "blake3")
+
+
+def new_hasher(algorithm: str = "sha256"):
+    """A hashlib-style hasher; BLAKE3 may spread large updates over every CPU core."""
+    if algorithm == "blake3":
+        return blake3.blake3(max_threads=blake3.blake3.AUTO)
+    if algorithm == "sha256":
+        return hashlib.sha256()
+    raise ValueError(f"Unknown hash algorithm {algorithm!r}; expected one of {HASH_ALGORITHMS}.")
+
+
+def hash_file(filepath: Path, algorithm: str = "sha256") -> str:
+    """
+    Computes the hash of a file. BLAKE3 memory-maps the file and hashes it with multiple
+    threads; SHA-256 reads it in SNAPSHOT_BUFFER_SIZE chunks.
+    """
+    h = new_hasher(algorithm)
+    if algorithm == "blake3":
+        h.update_mmap(str(filepath))
+        return h.hexdigest()
     with open(filepath, "rb") as f:
-        while chunk := f.read(8192):
+        while chunk := f.read(SNAPSHOT_BUFFER_SIZE):
             h.update(chunk)
     return h.hexdigest()
 
 
-def compress_gzip(input_path: Path, output_path: Path, compresslevel: int = 9) -> None:
-    """Compresses a file using Gzip."""
+@dataclasses.dataclass
+class StreamDigests:
+    """Hashes of both sides of one compress/decompress pass, and the bytes written."""
+
+    input_hash: str
+    output_hash: str
+    output_size: int
+
+
+class _HashingReader:
+    """Read-only file wrapper that hashes every byte read through it."""
+
+    def __init__(self, f, algorithm: str = "sha256"):
+        self._f = f
+        self.hash = new_hasher(algorithm)
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._f.read(size)
+        self.hash.update(data)
+        return data
+
+    def drain(self) -> None:
+        """Hashes whatever the consumer left unread, e.g. bytes after the last gzip member."""
+        while self.read(SNAPSHOT_BUFFER_SIZE):
+            pass
+
+
+class _HashingWriter:
+    """Write-only file wrapper that hashes and counts every byte written through it."""
+
+    def __init__(self, f, algorithm: str = "sha256"):
+        self._f = f
+        self.hash = new_hasher(algorithm)
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.hash.update(data)
+        self.size += len(data)
+        return self._f.write(data)
+
+    def flush(self) -> None:
+        self._f.flush()
+
+
+def compress_gzip(
+    input_path: Path, output_path: Path, compresslevel: int = 9, hash_algorithm: str = "sha256"
+) -> StreamDigests:
+    """Compresses a file using Gzip, hashing the input and the output in the same pass."""
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with (
-        open(input_path, "rb") as f_in,
-        gzip.open(output_path, "wb", compresslevel=compresslevel) as f_out,
-    ):
-        shutil.copyfileobj(f_in, f_out)
+    with open(input_path, "rb") as raw_in, open(output_path, "wb") as raw_out:
+        f_in = _HashingReader(raw_in, hash_algorithm)
+        f_out = _HashingWriter(raw_out, hash_algorithm)
+        with gzip.GzipFile(
+            filename=str(output_path), mode="wb", compresslevel=compresslevel, fileobj=f_out
+        ) as gz:
+            while chunk := f_in.read(SNAPSHOT_BUFFER_SIZE):
+                gz.write(chunk)
     logging.info(f"Compressed {input_path} to {output_path} using Gzip (Level {compresslevel})")
+    return StreamDigests(f_in.hash.hexdigest(), f_out.hash.hexdigest(), f_out.size)
 
 
-def decompress_gzip(input_path: Path, output_path: Path) -> None:
-    """Decompresses a Gzip compressed file."""
+def decompress_gzip(
+    input_path: Path, output_path: Path, hash_algorithm: str = "sha256"
+) -> StreamDigests:
+    """Decompresses a Gzip compressed file, hashing both sides in the same pass."""
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with gzip.open(input_path, "rb") as f_in, open(output_path, "wb") as f_out:
-        shutil.copyfileobj(f_in, f_out)
+    with open(input_path, "rb") as raw_in, open(output_path, "wb") as raw_out:
+        f_in = _HashingReader(raw_in, hash_algorithm)
+        f_out = _HashingWriter(raw_out, hash_algorithm)
+        with gzip.GzipFile(fileobj=f_in, mode="rb") as gz:
+            while chunk := gz.read(SNAPSHOT_BUFFER_SIZE):
+                f_out.write(chunk)
+        f_in.drain()
     logging.info(f"Decompressed {input_path} to {output_path} using Gzip")
+    return StreamDigests(f_in.hash.hexdigest(), f_out.hash.hexdigest(), f_out.size)
+
+
+# Uncompressed bytes per zstd frame. Each frame is compressed by libzstd's worker threads;
+# long mode uses larger frames so matches can reach further back, at 8x the buffer memory.
+# A configured memory limit caps both (zstd_frame_size).
+# (The zstd bindings expose level and threads but not windowLog/LDM parameters.)
+ZSTD_FRAME_SIZE = 64 * 1024 * 1024
+ZSTD_LONG_FRAME_SIZE = 512 * 1024 * 1024
+DEFAULT_ZSTD_LEVEL = 3
+# Smallest frame a memory budget can shrink the frames to.
+ZSTD_MIN_FRAME_SIZE = 1024 * 1024
+
+_ZSTD_MAGIC = 0xFD2FB528
+
+
+def compress_zstd(
+    input_path: Path,
+    output_path: Path,
+    level: int = DEFAULT_ZSTD_LEVEL,
+    threads: int = 0,
+    long: bool = False,
+    hash_algorithm: str = "sha256",
+    memory_limit: str | None = None,
+) -> StreamDigests:
+    """
+    Compresses a file into a sequence of zstd frames (a regular .zst stream, readable by
+    `zstd -d`), hashing the input and the output in the same pass. threads=0 lets libzstd
+    use one worker per CPU core.
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    frame_size = zstd_frame_size(long, memory_limit)
+    with open(input_path, "rb") as raw_in, open(output_path, "wb") as raw_out:
+        f_in = _HashingReader(raw_in, hash_algorithm)
+        f_out = _HashingWriter(raw_out, hash_algorithm)
+        while chunk := f_in.read(frame_size):
+            f_out.write(zstd.compress(chunk, level, threads))
+    logging.info(
+        f"Compressed {input_path} to {output_path} using zstd "
+        f"(Level {level}, threads {threads or 'auto'}{', long' if long else ''})"
+    )
+    return StreamDigests(f_in.hash.hexdigest(), f_out.hash.hexdigest(), f_out.size)
+
+
+def zstd_frame_size(long: bool = False, memory_limit: str | None = None) -> int:
+    """
+    Uncompressed bytes per frame. A frame, its compressed copy and libzstd's buffers are
+    in memory together, so frames are capped at a quarter of memory_limit.
+    """
+    frame_size = ZSTD_LONG_FRAME_SIZE if long else ZSTD_FRAME_SIZE
+    budget = parse_memory_limit(memory_limit)
+    if budget is not None:
+        frame_size = max(ZSTD_MIN_FRAME_SIZE, min(frame_size, budget // 4))
+    return frame_size
+
+
+def _read_exact(f, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated zstd stream.")
+    return data
+
+
+def _iter_zstd_frames(f):
+    """
+    Yields each complete zstd frame of a stream by walking the frame and block headers,
+    so frames can be decompressed one at a time.
+    """
+    while magic_bytes := f.read(4):
+        if len(magic_bytes) != 4:
+            raise ValueError("Truncated zstd stream.")
+        magic = int.from_bytes(magic_bytes, "little")
+        if magic & 0xFFFFFFF0 == 0x184D2A50:  # Skippable frame
+            _read_exact(f, int.from_bytes(_read_exact(f, 4), "little"))
+            continue
+        if magic != _ZSTD_MAGIC:
+            raise ValueError("Not a zstd stream.")
+        descriptor = _read_exact(f, 1)
+        flags = descriptor[0]
+        single_segment = flags & 0x20
+        header_size = (
+            (0 if single_segment else 1)
+            + (0, 1, 2, 4)[flags & 0x03]
+            + ((1 if single_segment else 0), 2, 4, 8)[flags >> 6]
+        )
+        parts = [magic_bytes, descriptor, _read_exact(f, header_size)]
+        last = False
+        while not last:
+            block_header = _read_exact(f, 3)
+            value = int.from_bytes(block_header, "little")
+            last, block_type, block_size = value & 1, (value >> 1) & 3, value >> 3
+            parts += [block_header, _read_exact(f, 1 if block_type == 1 else block_size)]
+        if flags & 0x04:  # Content checksum
+            parts.append(_read_exact(f, 4))
+        yield b"".join(parts)
+
+
+def decompress_zstd(
+    input_path: Path, output_path: Path, hash_algorithm: str = "sha256"
+) -> StreamDigests:
+    """Decompresses a zstd stream frame by frame, hashing both sides in the same pass."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(input_path, "rb") as raw_in, open(output_path, "wb") as raw_out:
+        f_in = _HashingReader(raw_in, hash_algorithm)
+        f_out = _HashingWriter(raw_out, hash_algorithm)
+        for frame in _iter_zstd_frames(f_in):
+            f_out.write(zstd.decompress(frame))
+    logging.info(f"Decompressed {input_path} to {output_path} using zstd")
+    return StreamDigests(f_in.hash.hexdigest(), f_out.hash.hexdigest(), f_out.size)
+
+
+CODEC_EXTENSIONS = {"zstd": ".zst", "gzip": ".gz"}
+_DECOMPRESSORS = {"zstd": decompress_zstd, "gzip": decompress_gzip}
+# What a corrupt or truncated shard raises while it is being decompressed.
+_CODEC_ERRORS = (zstd.Error, gzip.BadGzipFile, zlib.error, EOFError, ValueError)
+
+
+def shard_codec(shard: ShardInfo) -> str:
+    """The shard's codec, inferred from the file extension for manifests that predate it."""
+    if shard.codec:
+        return shard.codec
+    for codec, extension in CODEC_EXTENSIONS.items():
+        if shard.file.endswith(extension):
+            return codec
+    raise ValueError(f"Cannot tell the compression codec of shard {shard.file}.")
 
 
-def calculate_db_merkle_root(db_path: Path) -> str:
+def decompressed_name(shard: ShardInfo) -> str:
+    """File name of the shard once decompressed (the codec extension dropped)."""
+    return shard.file.removesuffix(CODEC_EXTENSIONS[shard_codec(shard)])
+
+
+def decompress_shard(shard: ShardInfo, input_path: Path, output_path: Path) -> StreamDigests:
+    return _DECOMPRESSORS[shard_codec(shard)](input_path, output_path, shard.hash_algorithm)
+
+
+def calculate_db_merkle_root(db_path: Path, algorithm: str = "sha256") -> str:
     """
     Placeholder function to calculate a Merkle root for the entire DB.
     Actual implementation would depend on how DB content is broken down.
@@ -108,7 +331,7 @@ def calculate_db_merkle_root(db_path: Path) -> str:
     # Simple approach for now: hash of the file itself.
     # If sharded, this would be calculated *before* sharding from the original DB,
     # or from the reconstructed DB.
-    return hash_file(db_path)
+    return hash_file(db_path, algorithm)
 
 
 # --- ShardingManager Class ---
@@ -120,11 +343,58 @@ class ShardingManager:
     # This means if raw_size * estimated_compression_ratio > MAX_SHARD_SIZE_BYTES, then shard.
     ESTIMATED_COMPRESSION_RATIO = 0.3  # Configurable
 
-    def __init__(self, temp_dir: Path | None = None):
+    def __init__(
+        self,
+        temp_dir: Path | None = None,
+        memory_limit: str | None = None,
+        temp_directory: str | Path | None = None,
+        codec: str = "zstd",
+        compression_level: int | None = None,
+        compression_threads: int = 0,
+        long_mode: bool = False,
+        hash_algorithm: str = "blake3",
+    ):
+        if codec not in CODEC_EXTENSIONS:
+            raise ValueError(
+                f"Unknown snapshot codec {codec!r}; expected one of {list(CODEC_EXTENSIONS)}."
+            )
+        self.codec = codec
+        # Defaults: zstd level 3, gzip level 9. Threads and long mode only apply to zstd.
+        self.compression_level = compression_level
+        self.compression_threads = compression_threads
+        self.long_mode = long_mode
+        # New snapshots hash with BLAKE3; manifests record the algorithm, so SHA-256 ones
+        # still verify.
+        if hash_algorithm not in HASH_ALGORITHMS:
+            raise ValueError(
+                f"Unknown hash algorithm {hash_algorithm!r}; expected one of {HASH_ALGORITHMS}."
+            )
+        self.hash_algorithm = hash_algorithm
         self.temp_dir = temp_dir or Path(tempfile.gettempdir()) / "hronir_sharding"
         self.temp_dir.mkdir(parents=True, exist_ok=True)
+        # DuckDB memory budget (HRONIR_MEMORY_LIMIT) and spill directory for shard copies.
+        self.memory_limit = memory_limit or os.getenv("HRONIR_MEMORY_LIMIT")
+        self.temp_directory = temp_directory or os.getenv("HRONIR_TEMP_DIRECTORY")
         logging.info(f"ShardingManager initialized. Temp directory: {self.temp_dir}")
 
+    def _compress(self, input_path: Path, output_path: Path) -> StreamDigests:
+        if self.codec == "zstd":
+            return compress_zstd(
+                input_path,
+                output_path,
+                level=self.compression_level or DEFAULT_ZSTD_LEVEL,
+                threads=self.compression_threads,
+                long=self.long_mode,
+                hash_algorithm=self.hash_algorithm,
+                memory_limit=self.memory_limit,
+            )
+        return compress_gzip(
+            input_path,
+            output_path,
+            compresslevel=self.compression_level or 9,
+            hash_algorithm=self.hash_algorithm,
+        )
+
     def _cleanup_temp_files(self, files_to_delete: list[Path]):
         for f_path in files_to_delete:
             try:
@@ -147,12 +417,9 @@ class ShardingManager:
 
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        # 1. Calculate initial Merkle root of the source DB (before any potential sharding)
-        # This represents the integrity of the complete dataset.
-        source_merkle_root = calculate_db_merkle_root(duckdb_path)
-        logging.info(f"Calculated Merkle root for source DB ({duckdb_path}): {source_merkle_root}")
-
-        # 2. Check if sharding is needed
+        # 1. Check if sharding is needed. The Merkle root of the source DB (before any
+        # potential sharding) represents the integrity of the complete dataset; a single-file
+        # snapshot hashes the source, compresses it and hashes the output in one read.
         raw_size = duckdb_path.stat().st_size
         compressed_estimate = raw_size * self.ESTIMATED_COMPRESSION_RATIO
 
@@ -164,23 +431,28 @@ class ShardingManager:
             # Single file, no sharding needed
             logging.info("Snapshot size within limits. Creating single compressed file.")
             snapshot_filename_base = f"{network_uuid}_{datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%S')}"
-            compressed_file_name = f"{snapshot_filename_base}.db.gz"  # Changed extension
+            compressed_file_name = f"{snapshot_filename_base}.db{CODEC_EXTENSIONS[self.codec]}"
             compressed_file_path = output_dir / compressed_file_name
 
-            compress_gzip(duckdb_path, compressed_file_path)  # Changed function call
+            digests = self._compress(duckdb_path, compressed_file_path)
+            source_merkle_root = digests.input_hash
 
             shard_infos.append(
                 ShardInfo(
                     file=compressed_file_name,  # Relative to IA item / torrent root
-                    sha256=hash_file(compressed_file_path),
-                    size=compressed_file_path.stat().st_size,
+                    hash=digests.output_hash,
+                    size=digests.output_size,
                     tables=["ALL"],  # Indicates all tables are in this single shard
+                    codec=self.codec,
+                    hash_algorithm=self.hash_algorithm,
                 )
             )
             logging.info(f"Single shard created: {compressed_file_name}")
         else:
             # Multi-shard strategy
             logging.info("Snapshot size exceeds limits. Proceeding with sharding.")
+            # The shards are copies made by DuckDB, so the source needs its own hashing pass.
+            source_merkle_root = calculate_db_merkle_root(duckdb_path, self.hash_algorithm)
             shard_db_files = self._split_database_by_table(duckdb_path, temp_files_to_cleanup)
 
             if not shard_db_files:
@@ -190,17 +462,19 @@ class ShardingManager:
 
             for i, (shard_temp_path, tables_in_shard) in enumerate(shard_db_files):
                 shard_file_name_base = f"{snapshot_filename_base}_shard_{i:03d}"
-                compressed_shard_name = f"{shard_file_name_base}.db.gz"  # Changed extension
+                compressed_shard_name = f"{shard_file_name_base}.db{CODEC_EXTENSIONS[self.codec]}"
                 compressed_shard_path = output_dir / compressed_shard_name
 
-                compress_gzip(shard_temp_path, compressed_shard_path)  # Changed function call
+                digests = self._compress(shard_temp_path, compressed_shard_path)
 
                 shard_infos.append(
                     ShardInfo(
                         file=compressed_shard_name,  # Relative to IA item / torrent root
-                        sha256=hash_file(compressed_shard_path),
-                        size=compressed_shard_path.stat().st_size,
+                        hash=digests.output_hash,
+                        size=digests.output_size,
                         tables=tables_in_shard,
+                        codec=self.codec,
+                        hash_algorithm=self.hash_algorithm,
                     )
                 )
                 logging.info(
@@ -210,6 +484,8 @@ class ShardingManager:
             merge_script = self._generate_merge_script(shard_infos)
             logging.info("Generated merge script for sharded snapshot.")
 
+        logging.info(f"Calculated Merkle root for source DB ({duckdb_path}): {source_merkle_root}")
+
         # Create SnapshotManifest
         manifest = SnapshotManifest(
             created_at=datetime.datetime.now(datetime.timezone.utc),
@@ -218,6 +494,8 @@ class ShardingManager:
             shards=shard_infos,
             merge_script=merge_script,
             network_uuid=network_uuid,  # To be filled by caller if available then
+            compression_algorithm=self.codec,
+            hash_algorithm=self.hash_algorithm,
         )
 
         # Cleanup temporary shard DB files
@@ -294,50 +572,47 @@ class ShardingManager:
 
                 shard_conn = duckdb.connect(database=str(shard_temp_db_path), read_only=False)
                 try:
-                    for table_name in tables_in_shard:
-                        # Copy table structure and data
-                        # Using EXPORT/IMPORT DATABASE for specific tables is cleaner if available
-                        # For now, using COPY TO and then recreating table + INSERT
-                        logging.debug(f"Copying table {table_name} to shard {i}")
-
-                        # Get DDL for the table
-                        try:
-                            ddl_result = original_conn.execute(
-                                f"SHOW CREATE TABLE {table_name};"
-                            ).fetchone()
-                            if ddl_result and ddl_result[0]:
-                                create_table_sql = ddl_result[0]
-                                shard_conn.execute(create_table_sql)
-                            else:  # Fallback if SHOW CREATE TABLE fails or returns empty
-                                logging.warning(
-                                    f"Could not get DDL for table {table_name}. Attempting simple SELECT *."
-                                )
-                                # This won't preserve constraints, indexes etc.
-                                shard_conn.execute(
-                                    f"CREATE TABLE {table_name} AS SELECT * FROM read_parquet('{original_db_path.resolve()}::{table_name}');"
-                                )
-                                # The above is problematic. A better approach:
-                                # original_conn.execute(f"COPY {table_name} TO '{shard_temp_db_path}.{table_name}' (FORMAT PARQUET);")
-                                # This would require reading it back in shard_conn.
-                                # Simpler: copy data via SELECT INTO
-                                original_conn.execute(
-                                    f"EXPORT DATABASE '{shard_temp_db_path}' (FORMAT 'parquet', TABLE '{table_name}');"
-                                )
-                                # This exports only one table to a new DB, might not be ideal.
-
-                                # Safest: Use pandas DataFrame as intermediary for data transfer
-                                table_df = original_conn.table(table_name).df()
-                                shard_conn.register(f"{table_name}_df", table_df)
-                                shard_conn.execute(
-                                    f"INSERT INTO {table_name} SELECT * FROM {table_name}_df;"
+                    apply_memory_settings(shard_conn, self.memory_limit, self.temp_directory)
+                    # The copy runs inside DuckDB: rows stream from the attached source and
+                    # spill to temp_directory under the memory limit, instead of passing
+                    # through a pandas DataFrame.
+                    escaped_source = str(original_db_path.resolve()).replace("'", "''")
+                    shard_conn.execute(f"ATTACH '{escaped_source}' AS source_db (READ_ONLY)")
+                    try:
+                        for table_name in tables_in_shard:
+                            logging.debug(f"Copying table {table_name} to shard {i}")
+                            try:
+                                ddl_result = shard_conn.execute(
+                                    """
+                                    SELECT sql FROM duckdb_tables()
+                                    WHERE database_name = 'source_db' AND schema_name = 'main'
+                                      AND table_name = ?
+                                    """,
+                                    (table_name,),
+                                ).fetchone()
+                                if ddl_result and ddl_result[0]:
+                                    # Keeps primary keys and other constraints.
+                                    shard_conn.execute(ddl_result[0])
+                                    shard_conn.execute(
+                                        f'INSERT INTO "{table_name}" '
+                                        f'SELECT * FROM source_db.main."{table_name}"'
+                                    )
+                                else:
+                                    logging.warning(
+                                        f"Could not get DDL for table {table_name}. Copying without constraints."
+                                    )
+                                    shard_conn.execute(
+                                        f'CREATE TABLE "{table_name}" AS '
+                                        f'SELECT * FROM source_db.main."{table_name}"'
+                                    )
+                            except Exception as e_copy:
+                                logging.error(
+                                    f"Error copying table {table_name} to shard {i}: {e_copy}"
                                 )
-
-                        except Exception as e_copy:
-                            logging.error(
-                                f"Error copying table {table_name} to shard {i}: {e_copy}"
-                            )
-                            # Decide on error handling: skip table, fail shard, fail all?
-                            # For now, log and continue.
+                                # Decide on error handling: skip table, fail shard, fail all?
+                                # For now, log and continue.
+                    finally:
+                        shard_conn.execute("DETACH source_db")
                     shard_conn.commit()
                     shard_file_tuples.append((shard_temp_db_path, tables_in_shard))
                 finally:
@@ -379,7 +654,7 @@ class ShardingManager:
         for i, shard in enumerate(shard_infos):
             shard_db_alias = f"shard_{i:03d}_db"
             # Decompressed shard file name
-            decompressed_shard_file = shard.file.replace(".gz", "")  # Changed extension
+            decompressed_shard_file = decompressed_name(shard)
 
             script_lines.append(
                 f"-- Processing Shard: {shard.file} (contains tables: {shard.tables}) --"
@@ -431,7 +706,8 @@ class ShardingManager:
 
         try:
             decompressed_shard_paths: list[Path] = []
-            # 1. Download (if needed - assumed already downloaded to snapshot_dir) and verify all shards
+            shard_digests: list[StreamDigests] = []
+            # 1. Download (if needed - assumed already downloaded to snapshot_dir) all shards
             for shard_info in manifest.shards:
                 compressed_shard_path = snapshot_dir / shard_info.file
                 if not compressed_shard_path.exists():
@@ -439,27 +715,36 @@ class ShardingManager:
                         f"Shard file {shard_info.file} not found in {snapshot_dir}"
                     )
 
-                actual_hash = hash_file(compressed_shard_path)
-                if actual_hash != shard_info.sha256:
+                # 2. Decompress and verify each shard in one read: the checksum is taken from
+                # the bytes fed to the decompressor, before the shard is used. A shard the
+                # codec rejects is corrupt too: its partial output is dropped and it is
+                # reported as a checksum failure.
+                decompressed_path = temp_decompress_dir / decompressed_name(shard_info)
+                temp_files_to_cleanup.append(decompressed_path)
+                try:
+                    digests = decompress_shard(shard_info, compressed_shard_path, decompressed_path)
+                except _CODEC_ERRORS as e:
+                    decompressed_path.unlink(missing_ok=True)
+                    actual = hash_file(compressed_shard_path, shard_info.hash_algorithm)
+                    raise ValueError(
+                        f"Checksum mismatch for shard {shard_info.file}: it does not "
+                        f"decompress ({e}). Expected {shard_info.hash}, got {actual}"
+                    ) from e
+                if digests.input_hash != shard_info.hash:
+                    decompressed_path.unlink(missing_ok=True)
                     raise ValueError(
-                        f"Checksum mismatch for shard {shard_info.file}. Expected {shard_info.sha256}, got {actual_hash}"
+                        f"Checksum mismatch for shard {shard_info.file}. Expected {shard_info.hash}, got {digests.input_hash}"
                     )
-                logging.info(f"Verified shard: {shard_info.file}")
-
-                # 2. Decompress shards
-                decompressed_name = shard_info.file.replace(".gz", "")  # Changed extension
-                decompressed_path = temp_decompress_dir / decompressed_name
-                decompress_gzip(compressed_shard_path, decompressed_path)  # Changed function call
                 decompressed_shard_paths.append(decompressed_path)
-                temp_files_to_cleanup.append(decompressed_path)
-                logging.info(f"Decompressed {shard_info.file} to {decompressed_path}")
+                shard_digests.append(digests)
+                logging.info(f"Verified and decompressed {shard_info.file} to {decompressed_path}")
 
             # 3. Execute merge script (or logic)
             if not manifest.merge_script and len(decompressed_shard_paths) == 1:
-                # Single shard, just copy/rename the decompressed file
-                shutil.copy(decompressed_shard_paths[0], output_db_path)
+                # Single shard, just rename the decompressed file (a copy only across devices)
+                shutil.move(decompressed_shard_paths[0], output_db_path)
                 logging.info(
-                    f"Single shard snapshot. Copied {decompressed_shard_paths[0]} to {output_db_path}"
+                    f"Single shard snapshot. Moved {decompressed_shard_paths[0]} to {output_db_path}"
                 )
             elif manifest.merge_script:
                 # Multiple shards, use merge script
@@ -505,7 +790,7 @@ class ShardingManager:
                         current_decompressed_path = next(
                             p
                             for p in decompressed_shard_paths
-                            if p.name == shard_info.file.replace(".gz", "")  # Changed extension
+                            if p.name == decompressed_name(shard_info)
                         )
 
                         target_conn.execute(
@@ -543,8 +828,18 @@ class ShardingManager:
                     "Cannot reconstruct: No merge script for multiple shards, and not a single shard snapshot."
                 )
 
-            # 4. Verify final integrity (optional but recommended)
-            final_merkle_root = calculate_db_merkle_root(output_db_path)
+            # 4. Verify final integrity (optional but recommended). A single shard was hashed
+            # while it was decompressed, and the output is a byte-for-byte copy of it.
+            if (
+                not manifest.merge_script
+                and len(shard_digests) == 1
+                and manifest.shards[0].hash_algorithm == manifest.hash_algorithm
+            ):
+                final_merkle_root = shard_digests[0].output_hash
+            else:
+                final_merkle_root = calculate_db_merkle_root(
+                    output_db_path, manifest.hash_algorithm
+                )
             if final_merkle_root != manifest.merkle_root:
                 # This check is against the Merkle root of the *original* DB.
                 # If sharding/reconstruction is perfect, they should match.
@@ -1,48 +1,94 @@
+import hashlib
+import logging
 import os
+import threading
 import uuid
+from collections.abc import Callable, Iterable, Iterator
 from pathlib import Path
 
-from .duckdb_storage import DuckDBDataManager
+import pandas as pd
+
+from .change_feed import ChangeEvent, Subscription
+from .content_cache import ContentCache
+from .duckdb_storage import COLUMN_BATCH_SIZE, STREAM_BATCH_SIZE, DuckDBDataManager
+from .graph_analytics import GraphAnalytics
+from .graph_export import GraphExport
+from .models import DataIntegrityReport, Transaction, ValidationIssue
 from .models import Path as PathModel
-from .models import Transaction
 from .sharding import SnapshotManifest
 
 UUID_NAMESPACE = uuid.NAMESPACE_URL
 
+# Files above this size are hashed in a streaming pass first, so re-storing a large
+# chapter that already exists never loads it into memory.
+STREAMING_HASH_THRESHOLD_BYTES = 8 * 1024 * 1024
+STREAMING_HASH_CHUNK_CHARS = 1024 * 1024
 
-# --- Global Data Manager ---
-class DataManager:
-    """DataManager that delegates to pandas or DuckDB backends."""
+DEFAULT_CONTENT_CACHE_BYTES = 64 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
 
-    _instance = None
 
-    def __new__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+# --- Data Manager ---
+class DataManager:
+    """
+    Façade over a DuckDB backend. Each instance owns its own connection, so several
+    databases can be used side by side; use get_data_manager() for the shared,
+    environment-configured instance. Arguments left as None fall back to the
+    HRONIR_* environment variables.
+    """
 
     def __init__(
         self,
         path_csv_dir="narrative_paths",
         transactions_json_dir="data/transactions",
+        db_path: str | Path | None = None,
+        cold_storage_dir: str | Path | None = None,
+        library_path: str | Path | None = None,
+        use_bloom_filter: bool | None = None,
+        content_cache_bytes: int | None = None,
+        memory_limit: str | None = None,
+        temp_directory: str | Path | None = None,
     ):
-        if hasattr(self, "_initialized") and self._initialized:
-            return
-
-        db_path = os.getenv("HRONIR_DUCKDB_PATH", "data/encyclopedia.duckdb")
+        if db_path is None:
+            db_path = os.getenv("HRONIR_DUCKDB_PATH", "data/encyclopedia.duckdb")
+        if cold_storage_dir is None and str(db_path) != ":memory:":
+            cold_storage_dir = os.getenv(
+                "HRONIR_COLD_STORAGE_DIR", str(Path(db_path).parent / "cold")
+            )
+        if use_bloom_filter is None:
+            use_bloom_filter = os.getenv("HRONIR_BLOOM_FILTER", "0") == "1"
+        if memory_limit is None:
+            memory_limit = os.getenv("HRONIR_MEMORY_LIMIT")
+        if temp_directory is None:
+            temp_directory = os.getenv("HRONIR_TEMP_DIRECTORY")
         self.backend = DuckDBDataManager(
             db_path=db_path,
             path_csv_dir=path_csv_dir,
             transactions_json_dir=transactions_json_dir,
+            cold_storage_dir=cold_storage_dir,
+            use_bloom_filter=use_bloom_filter,
+            memory_limit=memory_limit,
+            temp_directory=temp_directory,
         )
 
-        default_library_path = Path("the_library")
-        library_path_str = os.getenv("HRONIR_LIBRARY_DIR")
-        self.library_path = Path(library_path_str) if library_path_str else default_library_path
+        if library_path is None:
+            library_path = os.getenv("HRONIR_LIBRARY_DIR", "the_library")
+        self.library_path = Path(library_path)
         self.library_path.mkdir(parents=True, exist_ok=True)
 
+        if content_cache_bytes is None:
+            content_cache_bytes = int(
+                os.getenv("HRONIR_CONTENT_CACHE_BYTES", DEFAULT_CONTENT_CACHE_BYTES)
+            )
+        self.content_cache = ContentCache(content_cache_bytes)
+
         self._initialized = False
 
+    def close(self) -> None:
+        """Closes the backend connection."""
+        self.backend.close()
+
     def initialize_and_load(self, clear_existing_data=False):
         """Initialize the data manager and load data from files."""
         if clear_existing_data:
@@ -62,20 +108,107 @@ class DataManager:
 
     # --- Path operations ---
     def get_all_paths(self) -> list[PathModel]:
-        """Get all paths."""
+        """Get all paths. Prefer iter_all_paths for whole-library scans."""
         self.backend.initialize_if_needed()
         return self.backend.get_all_paths()
 
+    def iter_all_paths(self, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[PathModel]:
+        """Stream all paths in batches; memory stays bounded by the batch size."""
+        self.backend.initialize_if_needed()
+        return self.backend.iter_all_paths(batch_size)
+
+    def iter_path_columns(self, batch_size: int = COLUMN_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+        """Stream path edges as DataFrame chunks (path_uuid, position, prev_uuid, uuid)."""
+        self.backend.initialize_if_needed()
+        return self.backend.iter_path_columns(batch_size)
+
+    def get_path_columns(self, path_uuids: Iterable[str]) -> pd.DataFrame:
+        """The iter_path_columns columns for the given paths only."""
+        self.backend.initialize_if_needed()
+        return self.backend.get_path_columns(list(path_uuids))
+
     def get_paths_by_position(self, position: int) -> list[PathModel]:
         """Get paths at a specific position."""
         self.backend.initialize_if_needed()
         return self.backend.get_paths_by_position(position)
 
+    def get_paths_by_position_page(
+        self,
+        position: int,
+        after_path_uuid: str | None = None,
+        limit: int = 100,
+        prev_uuid: str | None = None,
+    ) -> list[PathModel]:
+        """Get one keyset page of paths at a position, ordered by path_uuid."""
+        self.backend.initialize_if_needed()
+        return self.backend.get_paths_by_position_page(
+            position, after_path_uuid=after_path_uuid, limit=limit, prev_uuid=prev_uuid
+        )
+
+    def get_paths_by_prev_uuids(self, prev_uuids: list[str]) -> list[PathModel]:
+        """Get all paths continuing the given predecessor hrönirs."""
+        self.backend.initialize_if_needed()
+        return self.backend.get_paths_by_prev_uuids(prev_uuids)
+
+    def count_paths_by_prev_uuids(self, prev_uuids: list[str]) -> dict[str, int]:
+        """Count continuations per predecessor hrönir."""
+        self.backend.initialize_if_needed()
+        return self.backend.count_paths_by_prev_uuids(prev_uuids)
+
+    def get_top_candidates(self, position: int, prev_uuid: str, limit: int) -> list[dict]:
+        """The `limit` best-scored candidates continuing prev_uuid ("" for root) at a position."""
+        self.backend.initialize_if_needed()
+        if hasattr(self.backend, "get_top_candidates"):
+            return self.backend.get_top_candidates(position, prev_uuid, limit)
+        raise NotImplementedError("Backend does not support get_top_candidates method.")
+
     def add_path(self, path: PathModel):
-        """Add a new path."""
+        """Add a new path. Raises NarrativeCycleError if it would make the graph cyclic."""
         self.backend.initialize_if_needed()
         self.backend.add_path(path)
 
+    def is_narrative_acyclic(self) -> bool:
+        """True if the narrative graph has no cycle (maintained on insert, so cheap to ask)."""
+        self.backend.initialize_if_needed()
+        return self.backend.is_narrative_acyclic()
+
+    def graph_analytics(self) -> GraphAnalytics:
+        """Orphan, frontier, reachability and depth queries that run inside the database."""
+        self.backend.initialize_if_needed()
+        if not hasattr(self.backend, "graph_analytics"):
+            raise NotImplementedError("Backend does not support graph_analytics method.")
+        return self.backend.graph_analytics()
+
+    def graph_export(
+        self,
+        min_position: int | None = None,
+        max_position: int | None = None,
+        around: Iterable[str] | None = None,
+        radius: int = 0,
+    ) -> GraphExport:
+        """
+        Streaming GraphML/DOT/Parquet export of the paths between two positions and/or
+        within `radius` paths of the hrönirs in `around`.
+        """
+        self.backend.initialize_if_needed()
+        if not hasattr(self.backend, "graph_export"):
+            raise NotImplementedError("Backend does not support graph_export method.")
+        return self.backend.graph_export(min_position, max_position, around, radius)
+
+    def get_subtree_stats(self, hronir_uuids: Iterable[str]) -> dict[str, dict[str, int]]:
+        """Descendants, max_depth and leaves below each hrönir, from the subtree_stats table."""
+        self.backend.initialize_if_needed()
+        if not hasattr(self.backend, "get_subtree_stats"):
+            raise NotImplementedError("Backend does not support get_subtree_stats method.")
+        return self.backend.get_subtree_stats(list(hronir_uuids))
+
+    def get_largest_subtrees(self, limit: int = 10, by: str = "descendants") -> list[dict]:
+        """Hrönirs with the largest subtree statistic `by`, largest first."""
+        self.backend.initialize_if_needed()
+        if not hasattr(self.backend, "get_largest_subtrees"):
+            raise NotImplementedError("Backend does not support get_largest_subtrees method.")
+        return self.backend.get_largest_subtrees(limit, by)
+
     def update_path_status(
         self,
         path_uuid: str,
@@ -89,13 +222,78 @@ class DataManager:
         )
 
     def get_path_by_uuid(self, path_uuid: str) -> PathModel | None:
-        """Get a specific path by UUID."""
+        """Get a specific path by UUID (primary-key lookup)."""
+        self.backend.initialize_if_needed()
+        return self.backend.get_path_by_uuid(str(path_uuid))
+
+    def get_paths_by_hronir_uuid(self, hronir_uuid: str) -> list[PathModel]:
+        """Get the paths that introduce a hrönir, lowest position first (indexed lookup)."""
+        self.backend.initialize_if_needed()
+        return self.backend.get_paths_by_hronir_uuid(str(hronir_uuid))
+
+    def get_min_positions_by_hronir_uuids(self, hronir_uuids: Iterable[str]) -> dict[str, int]:
+        """Lowest position at which each hrönir was introduced, for many hrönirs at once."""
+        self.backend.initialize_if_needed()
+        return self.backend.get_min_positions_by_hronir_uuids([str(u) for u in hronir_uuids])
+
+    def bulk_store(
+        self,
+        hrönirs: list[tuple[str, str]],
+        paths: list[PathModel],
+        transactions: list[Transaction],
+    ) -> dict[str, int]:
+        """
+        Stores (uuid, content) hrönirs with their paths and transactions in one commit.
+        Near-duplicates are flagged in the metadata as in store_hrönir_text, looked up for
+        the whole batch at once.
+        """
+        self.backend.initialize_if_needed()
+        if not hasattr(self.backend, "bulk_store"):
+            raise NotImplementedError("Backend does not support bulk_store method.")
+        metadata = {}
+        if hasattr(self.backend, "find_near_duplicates_batch"):
+            for hronir_uuid, matches in self.backend.find_near_duplicates_batch(hrönirs).items():
+                logger.warning(
+                    f"Hrönir {hronir_uuid} is a near-duplicate of "
+                    + ", ".join(f"{u} ({similarity:.2f})" for u, similarity in matches)
+                )
+                metadata[hronir_uuid] = {"near_duplicate_of": [u for u, _ in matches]}
+        return self.backend.bulk_store(hrönirs, paths, transactions, metadata)
+
+    # --- Change feed ---
+    def subscribe_changes(
+        self,
+        callback: Callable[[list[ChangeEvent]], None],
+        tables: Iterable[str] | None = None,
+        after_seq: int | None = None,
+    ) -> Subscription:
+        """
+        Calls `callback` with batches of insert events for paths, hrönirs and transactions.
+        Pass the last seq seen as after_seq to catch up on changes made meanwhile.
+        """
+        self.backend.initialize_if_needed()
+        if not hasattr(self.backend, "subscribe_changes"):
+            raise NotImplementedError("Backend does not support subscribe_changes method.")
+        return self.backend.subscribe_changes(callback, tables, after_seq)
+
+    def get_changes_since(self, after_seq: int = 0, limit: int | None = None) -> list[ChangeEvent]:
+        """Recorded change events with seq > after_seq, oldest first."""
+        self.backend.initialize_if_needed()
+        return self.backend.get_changes_since(after_seq, limit)
+
+    def prune_change_log(self, retention: int | None = None) -> int:
+        """Drops change events no consumer needs any more; returns how many were removed."""
+        self.backend.initialize_if_needed()
+        if not hasattr(self.backend, "prune_change_log"):
+            raise NotImplementedError("Backend does not support prune_change_log method.")
+        return self.backend.prune_change_log(retention)
+
+    def last_change_seq(self) -> int:
+        """Sequence number of the latest recorded change, 0 before the first one."""
         self.backend.initialize_if_needed()
-        paths = self.backend.get_all_paths()
-        for path in paths:
-            if str(path.path_uuid) == path_uuid:
-                return path
-        return None
+        if not hasattr(self.backend, "last_change_seq"):
+            raise NotImplementedError("Backend does not support last_change_seq method.")
+        return self.backend.last_change_seq()
 
     # --- Transaction operations ---
     def get_all_transactions(self) -> list[Transaction]:
@@ -103,6 +301,11 @@ class DataManager:
         self.backend.initialize_if_needed()
         return self.backend.get_all_transactions()
 
+    def iter_all_transactions(self, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[Transaction]:
+        """Stream all transactions in batches."""
+        self.backend.initialize_if_needed()
+        return self.backend.iter_all_transactions(batch_size)
+
     def add_transaction(self, transaction: Transaction):
         """Add a new transaction."""
         self.backend.initialize_if_needed()
@@ -113,6 +316,12 @@ class DataManager:
         self.backend.initialize_if_needed()
         return self.backend.get_transaction(tx_uuid)
 
+    # --- Cold storage operations ---
+    def archive_settled_positions(self, before_position: int) -> dict[str, int]:
+        """Move positions < before_position into partitioned Parquet cold storage."""
+        self.backend.initialize_if_needed()
+        return self.backend.archive_settled_positions(before_position)
+
     # --- Snapshot operations ---
     def create_snapshot(
         self, output_dir: Path, network_uuid: str, git_commit: str | None = None
@@ -131,65 +340,161 @@ class DataManager:
     # --- Hrönir operations (now interacting with DuckDB) ---
     def store_hrönir(self, file_path: Path) -> str:
         """Store a hrönir's content from a file into DuckDB and return its UUID."""
+        file_path = Path(file_path)
+        if file_path.stat().st_size > STREAMING_HASH_THRESHOLD_BYTES:
+            content_uuid = compute_hronir_uuid_from_file(file_path)
+            if self.hrönir_exists(content_uuid):
+                return content_uuid
+
         with open(file_path, encoding="utf-8") as f:
             content = f.read()
 
-        content_uuid = str(uuid.uuid5(UUID_NAMESPACE, content))
+        return self.store_hrönir_text(content)
 
-        if hasattr(self.backend, "add_hronir"):
-            self.backend.add_hronir(hronir_uuid=content_uuid, content=content)
-        else:
+    def store_hrönirs(self, contents: Iterable[str | bytes]) -> list[str]:
+        """Store several hrönir texts in memory and return their UUIDs in order."""
+        return [self.store_hrönir_text(content) for content in contents]
+
+    def store_hrönir_text(self, content: str | bytes) -> str:
+        """Store a hrönir's text (or UTF-8 bytes) directly, without a file round trip."""
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+        content_uuid = compute_hronir_uuid(content)
+
+        if not hasattr(self.backend, "add_hronir"):
             raise NotImplementedError("Backend does not support add_hronir method.")
 
+        metadata = None
+        near_duplicates = self.find_near_duplicates(content, exclude_uuid=content_uuid)
+        if near_duplicates:
+            logger.warning(
+                f"Hrönir {content_uuid} is a near-duplicate of "
+                + ", ".join(f"{u} ({similarity:.2f})" for u, similarity in near_duplicates)
+            )
+            metadata = {"near_duplicate_of": [u for u, _ in near_duplicates]}
+
+        self.backend.add_hronir(hronir_uuid=content_uuid, content=content, metadata=metadata)
+
         return content_uuid
 
+    def find_near_duplicates(
+        self, content: str, threshold: float | None = None, exclude_uuid: str | None = None
+    ) -> list[tuple[str, float]]:
+        """Stored hrönirs whose MinHash similarity to `content` reaches the threshold."""
+        if not hasattr(self.backend, "find_near_duplicates"):
+            return []
+        kwargs = {"threshold": threshold} if threshold is not None else {}
+        return self.backend.find_near_duplicates(content, exclude_uuid=exclude_uuid, **kwargs)
+
+    def find_near_duplicate_clusters(self, threshold: float | None = None) -> list[list[str]]:
+        """Clusters of near-duplicate hrönirs across the whole library."""
+        if not hasattr(self.backend, "find_near_duplicate_clusters"):
+            raise NotImplementedError("Backend does not support near-duplicate detection.")
+        kwargs = {"threshold": threshold} if threshold is not None else {}
+        return self.backend.find_near_duplicate_clusters(**kwargs)
+
     def hrönir_exists(self, content_uuid: str) -> bool:
         """Check if a hrönir exists in DuckDB."""
         if not content_uuid or not isinstance(content_uuid, str):
             return False
-        if hasattr(self.backend, "get_hronir_content"):
-            return self.backend.get_hronir_content(content_uuid) is not None
-        raise NotImplementedError("Backend does not support get_hronir_content method.")
+        if hasattr(self.backend, "hronir_exists"):
+            return self.backend.hronir_exists(content_uuid)
+        raise NotImplementedError("Backend does not support hronir_exists method.")
+
+    def existing_hrönir_uuids(self, content_uuids: list[str]) -> set[str]:
+        """Return which of the given hrönir UUIDs exist, using one query."""
+        if hasattr(self.backend, "existing_hronir_uuids"):
+            return self.backend.existing_hronir_uuids([str(u) for u in content_uuids])
+        raise NotImplementedError("Backend does not support existing_hronir_uuids method.")
 
     def get_hrönir_content(self, content_uuid: str) -> str | None:
-        """Get the content of a hrönir from DuckDB."""
+        """Get the content of a hrönir, from the LRU cache or DuckDB."""
         if hasattr(self.backend, "get_hronir_content"):
-            return self.backend.get_hronir_content(content_uuid)
+            key = str(content_uuid)
+            content = self.content_cache.get(key)
+            if content is None:
+                content = self.backend.get_hronir_content(key)
+                if content is not None:
+                    self.content_cache.put(key, content)
+            return content
         raise NotImplementedError("Backend does not support get_hronir_content method.")
 
+    def get_hrönir_contents(self, content_uuids: Iterable[str]) -> dict[str, str]:
+        """Get several hrönir contents at once; cache misses are fetched in one query."""
+        if not hasattr(self.backend, "get_hronir_contents"):
+            raise NotImplementedError("Backend does not support get_hronir_contents method.")
+        contents = {}
+        missing = []
+        for key in dict.fromkeys(str(u) for u in content_uuids):
+            content = self.content_cache.get(key)
+            if content is None:
+                missing.append(key)
+            else:
+                contents[key] = content
+        for key, content in self.backend.get_hronir_contents(missing).items():
+            self.content_cache.put(key, content)
+            contents[key] = content
+        return contents
+
+    def search_hrönirs(self, query: str, limit: int = 10) -> list[tuple[str, float]]:
+        """Full-text search over hrönir contents, returning (uuid, BM25 score) pairs."""
+        if hasattr(self.backend, "search_hronirs"):
+            return self.backend.search_hronirs(query, limit)
+        raise NotImplementedError("Backend does not support search_hronirs method.")
+
     # --- Utility methods ---
-    def validate_data_integrity(self) -> list[str]:
-        """Validate data integrity and return list of issues."""
-        issues = []
+    def validate_data_integrity_report(self, num_chunks: int = 1) -> DataIntegrityReport:
+        """
+        Checks every path for missing current/predecessor hrönirs and mismatched
+        path_uuids with set-based queries. num_chunks > 1 splits the scan into chunks
+        that run in parallel.
+        """
         self.backend.initialize_if_needed()
+        if not hasattr(self.backend, "find_path_integrity_violations"):
+            raise NotImplementedError("Backend does not support integrity validation")
 
-        paths = self.get_all_paths()
-        for path in paths:
-            if not self.hrönir_exists(str(path.uuid)):
-                issues.append(
-                    f"Path {path.path_uuid} (Pos: {path.position}, Prev: {path.prev_uuid}, Curr: {path.uuid}) "
-                    f"references non-existent current hrönir {path.uuid} in the database."
+        report = DataIntegrityReport(
+            paths_checked=self.backend.count_paths(),
+            hrönirs_checked=self.backend.count_hronirs(),
+        )
+        violations = self.backend.find_path_integrity_violations(UUID_NAMESPACE, num_chunks)
+        for check, path_uuid, position, prev_uuid, current_uuid, expected in violations:
+            prev_uuid = prev_uuid or None
+            if check == "missing_current":
+                message = (
+                    f"Path {path_uuid} (Pos: {position}, Prev: {prev_uuid}, Curr: {current_uuid}) "
+                    f"references non-existent current hrönir {current_uuid} in the database."
                 )
-
-            if path.prev_uuid and not self.hrönir_exists(str(path.prev_uuid)):
-                issues.append(
-                    f"Path {path.path_uuid} (Position: {path.position}, Predecessor: {path.prev_uuid}, Current Hrönir: {path.uuid}) "
-                    f"references a non-existent predecessor hrönir '{path.prev_uuid}' in the database. "
+            elif check == "missing_predecessor":
+                message = (
+                    f"Path {path_uuid} (Position: {position}, Predecessor: {prev_uuid}, Current Hrönir: {current_uuid}) "
+                    f"references a non-existent predecessor hrönir '{prev_uuid}' in the database. "
                 )
-
-            prev_uuid_for_computation = str(path.prev_uuid) if path.prev_uuid else ""
-            current_hrönir_uuid_str = str(path.uuid)
-
-            expected_path_uuid = compute_narrative_path_uuid(
-                path.position, prev_uuid_for_computation, current_hrönir_uuid_str
-            )
-            if str(path.path_uuid) != str(expected_path_uuid):
-                issues.append(
-                    f"Path {path.path_uuid} (Pos: {path.position}, Prev: {path.prev_uuid}, Curr: {path.uuid}) "
-                    f"has mismatched path_uuid. Expected: {expected_path_uuid}, Actual: {path.path_uuid}."
+            else:
+                message = (
+                    f"Path {path_uuid} (Pos: {position}, Prev: {prev_uuid}, Curr: {current_uuid}) "
+                    f"has mismatched path_uuid. Expected: {expected}, Actual: {path_uuid}."
                 )
+            report.issues.append(
+                ValidationIssue(
+                    severity="error",
+                    message=message,
+                    source_entity_type="path",
+                    source_entity_id=path_uuid,
+                    details={
+                        "check": check,
+                        "position": position,
+                        "prev_uuid": prev_uuid,
+                        "uuid": current_uuid,
+                        "expected_path_uuid": expected,
+                    },
+                )
+            )
+        return report
 
-        return issues
+    def validate_data_integrity(self, num_chunks: int = 1) -> list[str]:
+        """Validate data integrity and return list of issues."""
+        return [issue.message for issue in self.validate_data_integrity_report(num_chunks).issues]
 
     def clean_invalid_data(self) -> list[str]:
         """Remove invalid data and return list of cleaned items."""
@@ -211,23 +516,33 @@ class DataManager:
 # Legacy compatibility functions for CLI
 def store_chapter(chapter_file: Path, base: Path | str = "the_library") -> str:
     """Store a chapter file - compatibility wrapper."""
-    data_manager = DataManager()
-    return data_manager.store_hrönir(chapter_file)
+    return get_data_manager().store_hrönir(chapter_file)
 
 
 def store_chapter_text(text: str, base: Path | str = "the_library") -> str:
     """Store chapter text - compatibility wrapper."""
-    import tempfile
+    return get_data_manager().store_hrönir_text(text)
 
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".md", delete=False) as f:
-        f.write(text)
-        temp_path = Path(f.name)
 
-    try:
-        data_manager = DataManager()
-        return data_manager.store_hrönir(temp_path)
-    finally:
-        temp_path.unlink()  # Clean up temp file
+def compute_hronir_uuid(content: str | bytes) -> str:
+    """Content-addressed UUIDv5 of a hrönir's text."""
+    if isinstance(content, bytes):
+        content = content.decode("utf-8")
+    return str(uuid.uuid5(UUID_NAMESPACE, content))
+
+
+def compute_hronir_uuid_from_file(file_path: Path) -> str:
+    """
+    Streaming equivalent of compute_hronir_uuid(file_path.read_text()).
+    uuid5 is SHA-1 over the namespace bytes followed by the UTF-8 name, so the text can be
+    fed to the digest chunk by chunk. Reading in text mode keeps newline translation
+    identical to store_hrönir.
+    """
+    digest = hashlib.sha1(UUID_NAMESPACE.bytes)
+    with open(file_path, encoding="utf-8") as f:
+        while chunk := f.read(STREAMING_HASH_CHUNK_CHARS):
+            digest.update(chunk.encode("utf-8"))
+    return str(uuid.UUID(bytes=digest.digest()[:16], version=5))
 
 
 def compute_narrative_path_uuid(
@@ -241,4 +556,44 @@ def compute_narrative_path_uuid(
     return uuid.uuid5(UUID_NAMESPACE, path_key)
 
 
-data_manager = DataManager()
+# --- Registry ---
+# Named DataManagers shared within the process. Nothing is opened at import time: the
+# default instance is created on first use from the HRONIR_* environment variables.
+DEFAULT_DATA_MANAGER = "default"
+_registry: dict[str, DataManager] = {}
+_registry_lock = threading.Lock()
+
+
+def get_data_manager(name: str = DEFAULT_DATA_MANAGER, **kwargs) -> DataManager:
+    """
+    Returns the DataManager registered under `name`, creating it with `kwargs` on first
+    use. Workers that need their own database register it under their own name.
+    """
+    with _registry_lock:
+        data_manager = _registry.get(name)
+        if data_manager is None:
+            data_manager = DataManager(**kwargs)
+            _registry[name] = data_manager
+        return data_manager
+
+
+def register_data_manager(data_manager: DataManager, name: str = DEFAULT_DATA_MANAGER) -> None:
+    """Makes an explicitly constructed DataManager the shared instance for `name`."""
+    with _registry_lock:
+        _registry[name] = data_manager
+
+
+def close_data_managers() -> None:
+    """Closes and forgets every registered DataManager."""
+    with _registry_lock:
+        data_managers = list(_registry.values())
+        _registry.clear()
+    for data_manager in data_managers:
+        data_manager.close()
+
+
+def __getattr__(name: str):
+    # Backwards compatibility for the former module-level `data_manager` instance.
+    if name == "data_manager":
+        return get_data_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,194 @@
+"""
+Precomputed subtree statistics of the narrative graph.
+
+For every hrönir the subtree_stats table holds the number of paths continuing below it
+(descendants), the length of its longest continuation (max_depth) and the number of
+chapters nobody has continued yet that it leads to (leaves; a leaf counts itself). A full
+build is one reverse-topological pass over the CompactGraph; after that each batch of
+inserted paths only recomputes the hrönirs above it. A hrönir reachable along two routes is counted once
+per route, which keeps the counts additive and is exact for tree-shaped stories.
+"""
+
+from collections import Counter
+
+import duckdb
+import pandas as pd
+
+from .compact_graph import ROOT_ID, CompactGraph
+
+STAT_COLUMNS = ("descendants", "max_depth", "leaves")
+
+# Batches larger than this are cheaper to rebuild than to propagate path by path.
+REBUILD_THRESHOLD = 1000
+
+
+def ensure_tables(conn: duckdb.DuckDBPyConnection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS subtree_stats(
+            uuid TEXT PRIMARY KEY,
+            descendants BIGINT,
+            max_depth INTEGER,
+            leaves BIGINT
+        );
+        """
+    )
+    # Change-log sequence number the table is up to date with (see change_feed.py).
+    conn.execute("CREATE TABLE IF NOT EXISTS subtree_stats_state(seq BIGINT);")
+
+
+def stored_seq(conn: duckdb.DuckDBPyConnection) -> int | None:
+    """Sequence the stats were last brought up to, or None if they were never built."""
+    row = conn.execute("SELECT seq FROM subtree_stats_state").fetchone()
+    return row[0] if row else None
+
+
+def _set_seq(conn: duckdb.DuckDBPyConnection, seq: int) -> None:
+    conn.execute("DELETE FROM subtree_stats_state")
+    conn.execute("INSERT INTO subtree_stats_state VALUES (?)", (seq,))
+
+
+def rebuild(conn: duckdb.DuckDBPyConnection, graph: CompactGraph, seq: int) -> bool:
+    """Replaces the table with stats of `graph`. Returns False, leaving it as is, if cyclic."""
+    stats = graph.subtree_stats()
+    if stats is None:
+        return False
+    descendants, max_depth, leaves = stats
+    frame = pd.DataFrame(
+        {
+            "uuid": [graph.node_uuid(node) for node in range(ROOT_ID + 1, graph.num_nodes)],
+            "descendants": descendants[1:],
+            "max_depth": max_depth[1:],
+            "leaves": leaves[1:],
+        }
+    )
+    conn.execute("DELETE FROM subtree_stats")
+    conn.register("subtree_stats_frame", frame)
+    try:
+        conn.execute("INSERT INTO subtree_stats SELECT * FROM subtree_stats_frame")
+    finally:
+        conn.unregister("subtree_stats_frame")
+    _set_seq(conn, seq)
+    return True
+
+
+def apply_paths(
+    conn: duckdb.DuckDBPyConnection,
+    paths_source: str,
+    edges: list[tuple[str, str]],
+    seq: int,
+) -> None:
+    """
+    Updates the stats for newly stored (prev_uuid, uuid) edges ("" for root paths), which
+    must already be in `paths_source`. Only the new hrönirs and everything above them can
+    change: one recursive query finds them, their stats are recomputed from their
+    continuations (children first), and the rows are written back in one statement.
+    """
+    seeds = sorted({cur for _, cur in edges})
+    if not seeds:
+        _set_seq(conn, seq)
+        return
+    affected = [
+        row[0]
+        for row in conn.execute(
+            f"""
+            WITH RECURSIVE above(uuid) AS (
+                SELECT UNNEST(?::VARCHAR[])
+                UNION
+                SELECT p.prev_uuid FROM {paths_source} p JOIN above a ON p.uuid = a.uuid
+                WHERE COALESCE(p.prev_uuid, '') <> ''
+            )
+            SELECT uuid FROM above
+            """,
+            (seeds,),
+        ).fetchall()
+    ]
+    # Continuations outside the affected set keep their stored stats: aggregate them in SQL.
+    totals = {
+        prev: [count, descendants, max_depth, leaves]
+        for prev, count, descendants, max_depth, leaves in conn.execute(
+            f"""
+            SELECT p.prev_uuid, COUNT(*), SUM(1 + COALESCE(s.descendants, 0)),
+                   MAX(1 + COALESCE(s.max_depth, 0)), SUM(COALESCE(s.leaves, 1))
+            FROM {paths_source} p LEFT JOIN subtree_stats s ON s.uuid = p.uuid
+            WHERE p.prev_uuid IN (SELECT UNNEST(?::VARCHAR[]))
+              AND p.uuid NOT IN (SELECT UNNEST(?::VARCHAR[]))
+            GROUP BY p.prev_uuid
+            """,
+            (affected, affected),
+        ).fetchall()
+    }
+    # Continuations inside it, one entry per path, are combined once they are recomputed.
+    children: dict[str, list[str]] = {}
+    waiting = Counter()
+    for prev, cur in conn.execute(
+        f"""
+        SELECT prev_uuid, uuid FROM {paths_source}
+        WHERE prev_uuid IN (SELECT UNNEST(?::VARCHAR[]))
+          AND uuid IN (SELECT UNNEST(?::VARCHAR[]))
+        """,
+        (affected, affected),
+    ).fetchall():
+        children.setdefault(cur, []).append(prev)
+        waiting[prev] += 1
+
+    stats: dict[str, tuple[int, int, int]] = {}
+    ready = [node for node in affected if not waiting[node]]
+    while ready:
+        node = ready.pop()
+        count, descendants, max_depth, leaves = totals.get(node, [0, 0, 0, 0])
+        stats[node] = (int(descendants), int(max_depth), int(leaves) if count else 1)
+        for parent in children.get(node, []):
+            total = totals.setdefault(parent, [0, 0, 0, 0])
+            total[0] += 1
+            total[1] += 1 + stats[node][0]
+            total[2] = max(total[2], 1 + stats[node][1])
+            total[3] += stats[node][2]
+            waiting[parent] -= 1
+            if not waiting[parent]:
+                ready.append(parent)
+
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO subtree_stats
+        SELECT UNNEST(?::VARCHAR[]), UNNEST(?::BIGINT[]), UNNEST(?::INTEGER[]),
+               UNNEST(?::BIGINT[])
+        """,
+        (
+            list(stats),
+            [row[0] for row in stats.values()],
+            [row[1] for row in stats.values()],
+            [row[2] for row in stats.values()],
+        ),
+    )
+    _set_seq(conn, seq)
+
+
+def fetch(conn: duckdb.DuckDBPyConnection, hronir_uuids: list[str]) -> dict[str, dict[str, int]]:
+    """Stats of the given hrönirs; UUIDs no path mentions are left out."""
+    rows = conn.execute(
+        """
+        SELECT uuid, descendants, max_depth, leaves FROM subtree_stats
+        WHERE uuid IN (SELECT UNNEST(?::VARCHAR[]))
+        """,
+        (list(hronir_uuids),),
+    ).fetchall()
+    return {row[0]: dict(zip(STAT_COLUMNS, row[1:], strict=True)) for row in rows}
+
+
+def largest(
+    conn: duckdb.DuckDBPyConnection, limit: int = 10, by: str = "descendants"
+) -> list[dict]:
+    """The hrönirs with the largest value of one statistic, largest first."""
+    if by not in STAT_COLUMNS:
+        raise ValueError(f"Unknown subtree statistic {by!r}; expected one of {STAT_COLUMNS}.")
+    rows = conn.execute(
+        f"""
+        SELECT uuid, descendants, max_depth, leaves FROM subtree_stats
+        ORDER BY {by} DESC, uuid LIMIT ?
+        """,
+        (limit,),
+    ).fetchall()
+    return [
+        {"hrönir_uuid": row[0], **dict(zip(STAT_COLUMNS, row[1:], strict=True))} for row in rows
+    ]
@@ -0,0 +1,139 @@
+"""
+Online cycle detection for the narrative graph.
+
+A topological order of the hrönir graph is maintained as paths are inserted, using the
+Pearce–Kelly dynamic topological sort: an edge x -> y that already agrees with the order
+costs one comparison; otherwise only the nodes whose order lies between y and x are
+visited and reshuffled, and reaching x from y proves the edge would close a cycle. New
+chapters are almost always fresh hrönirs appended after an existing one, which is the
+constant-time case.
+
+The order is seeded from a CompactGraph; edges added later live in small overlay sets
+next to the immutable CSR arrays.
+"""
+
+from collections.abc import Callable
+
+import numpy as np
+
+from .compact_graph import ROOT_ID, CompactGraph
+
+
+class NarrativeCycleError(ValueError):
+    """Raised when a path would make the narrative graph cyclic."""
+
+
+class TopologicalOrder:
+    """Maintains a topological order of hrönirs and rejects cycle-creating edges."""
+
+    def __init__(self, graph: CompactGraph):
+        self._graph = graph
+        self._num_nodes = graph.num_nodes
+        self._new_node_ids: dict[str, int] = {}
+        self._succ: dict[int, set[int]] = {}
+        self._pred: dict[int, set[int]] = {}
+        self._ord = np.zeros(max(16, 2 * graph.num_nodes), dtype=np.int64)
+
+        order = graph.topological_order()
+        # A graph loaded with a cycle (e.g. from CSVs predating this check) has no order to
+        # maintain; it is reported as inconsistent and insertions are no longer checked.
+        self.acyclic = order is not None
+        if order is not None:
+            self._ord[order] = np.arange(len(order))
+        # New sources are placed before every node and new targets after, so appending
+        # a fresh hrönir never needs reordering.
+        self._next_low = -1
+        self._next_high = graph.num_nodes
+
+    def _node(self, hronir_uuid: str, as_target: bool) -> int:
+        node = self._graph.node_id(hronir_uuid)
+        if node is not None:
+            return node
+        key = str(hronir_uuid)
+        node = self._new_node_ids.get(key)
+        if node is not None:
+            return node
+        node = self._num_nodes
+        self._num_nodes += 1
+        self._new_node_ids[key] = node
+        if node >= len(self._ord):
+            self._ord = np.concatenate([self._ord, np.zeros(len(self._ord), dtype=np.int64)])
+        if as_target:
+            self._ord[node] = self._next_high
+            self._next_high += 1
+        else:
+            self._ord[node] = self._next_low
+            self._next_low -= 1
+        return node
+
+    def _successors(self, node: int) -> list[int]:
+        base = self._graph.successors(node).tolist() if node < self._graph.num_nodes else []
+        return base + list(self._succ.get(node, ()))
+
+    def _predecessors(self, node: int) -> list[int]:
+        base = self._graph.predecessors(node).tolist() if node < self._graph.num_nodes else []
+        return base + list(self._pred.get(node, ()))
+
+    def add_edge(self, prev_uuid: str | None, hronir_uuid: str) -> None:
+        """
+        Records the edge of a path (prev_uuid -> hronir_uuid, root for position 0).
+        Raises NarrativeCycleError, leaving the order unchanged, if it would close a cycle.
+        """
+        source = self._node(prev_uuid, as_target=False) if prev_uuid else ROOT_ID
+        target = self._node(hronir_uuid, as_target=True)
+        if source == target:
+            raise NarrativeCycleError(f"Path from {prev_uuid} to itself would form a cycle.")
+        # An edge that agrees with the order (including one already present) needs no work.
+        if self.acyclic:
+            lower, upper = self._ord[target], self._ord[source]
+            if lower < upper:
+                forward = self._search(target, self._successors, lambda o: o < upper, source)
+                if forward is None:
+                    raise NarrativeCycleError(
+                        f"Path from {prev_uuid} to {hronir_uuid} would form a cycle: "
+                        f"{hronir_uuid} already leads to {prev_uuid}."
+                    )
+                backward = self._search(source, self._predecessors, lambda o: o > lower)
+                self._reorder(backward, forward)
+
+        self._succ.setdefault(source, set()).add(target)
+        self._pred.setdefault(target, set()).add(source)
+
+    def _search(
+        self,
+        start: int,
+        neighbours: Callable[[int], list[int]],
+        in_window: Callable[[int], bool],
+        forbidden: int | None = None,
+    ) -> list[int] | None:
+        """
+        Nodes reachable from start through nodes whose order lies in the affected window.
+        Returns None if `forbidden` is reached.
+        """
+        seen = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for nxt in neighbours(node):
+                if nxt == forbidden:
+                    return None
+                if nxt not in seen and in_window(self._ord[nxt]):
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return list(seen)
+
+    def _reorder(self, backward: list[int], forward: list[int]) -> None:
+        """Moves every node reaching the source before every node the target reaches."""
+        backward.sort(key=lambda node: self._ord[node])
+        forward.sort(key=lambda node: self._ord[node])
+        nodes = backward + forward
+        self._ord[nodes] = np.sort(self._ord[nodes])
+
+    def index_of(self, hronir_uuid: str | None) -> int | None:
+        """Rank of a hrönir (None for the root) in the order, or None if no path mentions it."""
+        if not hronir_uuid:
+            return int(self._ord[ROOT_ID])
+        node = self._graph.node_id(hronir_uuid)
+        if node is None:
+            node = self._new_node_ids.get(str(hronir_uuid))
+        return None if node is None else int(self._ord[node])
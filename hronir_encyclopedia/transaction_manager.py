@@ -75,7 +75,8 @@ def record_transaction(
 
     from . import ratings, storage  # Local import for clarity
 
-    dm = storage.DataManager()  # This will use paths set by fixture or defaults relative to CWD
+    # This will use paths set by fixture or defaults relative to CWD
+    dm = storage.get_data_manager()
     if not dm._initialized:  # Ensure DataManager is loaded if not already by the test fixture
         dm.initialize_and_load()
 
@@ -116,16 +117,15 @@ def record_transaction(
         current_rankings_df = ratings.get_ranking(pos, pred_uuid_str)
 
         all_paths_in_context_models = []
-        for p_model in dm.get_all_paths():  # Use get_all_paths then filter
-            if p_model.position == pos:
-                p_model_prev_uuid_str = str(p_model.prev_uuid) if p_model.prev_uuid else None
-                # Handle case where pred_uuid_str is None for position 0
-                if pred_uuid_str is None and (
-                    p_model_prev_uuid_str is None or p_model_prev_uuid_str == ""
-                ):
-                    all_paths_in_context_models.append(p_model)
-                elif p_model_prev_uuid_str == pred_uuid_str:
-                    all_paths_in_context_models.append(p_model)
+        for p_model in dm.get_paths_by_position(pos):
+            p_model_prev_uuid_str = str(p_model.prev_uuid) if p_model.prev_uuid else None
+            # Handle case where pred_uuid_str is None for position 0
+            if pred_uuid_str is None and (
+                p_model_prev_uuid_str is None or p_model_prev_uuid_str == ""
+            ):
+                all_paths_in_context_models.append(p_model)
+            elif p_model_prev_uuid_str == pred_uuid_str:
+                all_paths_in_context_models.append(p_model)
 
         if not all_paths_in_context_models:
             continue
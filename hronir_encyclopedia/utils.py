@@ -52,7 +52,7 @@ def get_successor_hronir_for_path(path_uuid_str: str) -> str | None:
     """
     Retrieves the successor (current) Hrönir UUID for a given path UUID.
     """
-    dm = storage.DataManager()
+    dm = storage.get_data_manager()
     # Ensure DataManager is initialized if it's not done globally or by context
     if not dm._initialized:
         dm.initialize_and_load()
@@ -71,7 +71,7 @@ def dev_qualify_path_uuid(
     """
     Manually qualifies a path and assigns a mandate ID.
     """
-    dm = storage.DataManager()
+    dm = storage.get_data_manager()
     if not dm._initialized:
         dm.initialize_and_load()
 
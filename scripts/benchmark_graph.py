@@ -0,0 +1,81 @@
+"""
+Memory and build-time comparison of the narrative graph representations.
+
+Builds the same synthetic tree as a NetworkX DiGraph (string UUID nodes, one attribute dict
+per edge, as get_narrative_graph returns) and as a CompactGraph, and reports the bytes
+allocated per edge by each (measured with tracemalloc) and how long each build took, then
+how long opening the CompactGraph's saved .npy snapshot with memory mapping takes.
+
+    uv run python scripts/benchmark_graph.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add parent directory to sys.path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmark_storage import build_paths_frame  # noqa: E402
+
+from hronir_encyclopedia.compact_graph import ROOT_NODE, CompactGraph  # noqa: E402
+
+
+def build_networkx(frame):
+    import networkx as nx
+
+    G = nx.DiGraph()
+    G.add_node(ROOT_NODE)
+    for path_uuid, prev_uuid, cur_uuid in zip(
+        frame["path_uuid"], frame["prev_uuid"], frame["uuid"], strict=True
+    ):
+        G.add_edge(prev_uuid or ROOT_NODE, cur_uuid, path_uuid=path_uuid)
+    return G
+
+
+def measure(build, frame) -> tuple[float, float]:
+    """(bytes still allocated per edge once built, build seconds)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    graph = build(frame)
+    elapsed = time.perf_counter() - start
+    allocated, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del graph
+    return allocated / len(frame), elapsed
+
+
+def run(sizes: list[int]) -> None:
+    print(
+        f"{'paths':>10} {'networkx B/edge':>16} {'compact B/edge':>15} {'nx s':>7} "
+        f"{'compact s':>10} {'mmap load s':>12}"
+    )
+    for size in sizes:
+        frame = build_paths_frame(size)[["path_uuid", "position", "prev_uuid", "uuid"]]
+        nx_bytes, nx_seconds = measure(build_networkx, frame)
+        compact_bytes, compact_seconds = measure(lambda f: CompactGraph.from_frames([f]), frame)
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            CompactGraph.from_frames([frame]).save(Path(snapshot_dir))
+            start = time.perf_counter()
+            CompactGraph.load(Path(snapshot_dir))
+            load_seconds = time.perf_counter() - start
+        print(
+            f"{size:>10} {nx_bytes:>16.0f} {compact_bytes:>15.0f} "
+            f"{nx_seconds:>7.2f} {compact_seconds:>10.2f} {load_seconds:>12.4f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+    run(args.sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Micro-benchmarks for DataManager point lookups.
+
+Builds synthetic narrative graphs of growing size in a throwaway DuckDB file and times
+the façade lookups. Keyed lookups should stay roughly flat as the table grows.
+
+    uv run python scripts/benchmark_storage.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+# Add parent directory to sys.path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from hronir_encyclopedia import storage  # noqa: E402
+
+
+def build_paths_frame(num_paths: int, fanout: int = 8) -> pd.DataFrame:
+    """A tree of num_paths paths where every hrönir has up to `fanout` continuations."""
+    hronirs = [
+        str(uuid.uuid5(storage.UUID_NAMESPACE, f"bench-hronir-{i}")) for i in range(num_paths)
+    ]
+    rows = []
+    for i, hronir_uuid in enumerate(hronirs):
+        if i == 0:
+            position, prev_uuid = 0, ""
+        else:
+            parent = (i - 1) // fanout
+            position, prev_uuid = rows[parent]["position"] + 1, hronirs[parent]
+        rows.append(
+            {
+                "path_uuid": str(
+                    storage.compute_narrative_path_uuid(position, prev_uuid, hronir_uuid)
+                ),
+                "position": position,
+                "prev_uuid": prev_uuid,
+                "uuid": hronir_uuid,
+                "status": "PENDING",
+                "mandate_id": "",
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def time_lookups(lookup, keys: list[str]) -> float:
+    """Mean microseconds per call."""
+    start = time.perf_counter()
+    for key in keys:
+        lookup(key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def run(sizes: list[int], lookups: int) -> None:
+    print(f"{'paths':>10} {'get_path_by_uuid':>18} {'get_paths_by_hronir':>20}   (µs/lookup)")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dm = storage.DataManager(db_path=Path(tmp_dir) / "bench.duckdb")
+            dm.initialize_and_load()
+
+            frame = build_paths_frame(size)
+            dm.backend.conn.register("bench_paths", frame)
+            dm.backend.conn.execute("INSERT INTO paths SELECT * FROM bench_paths")
+            dm.backend.conn.unregister("bench_paths")
+            dm.backend._ensure_path_indexes()
+            dm.save_all_data()
+
+            sample = frame.sample(n=min(lookups, size), random_state=random.randint(0, 2**31))
+            by_path = time_lookups(dm.get_path_by_uuid, sample["path_uuid"].tolist())
+            by_hronir = time_lookups(dm.get_paths_by_hronir_uuid, sample["uuid"].tolist())
+            print(f"{size:>10} {by_path:>18.1f} {by_hronir:>20.1f}")
+            dm.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--lookups", type=int, default=500, help="Lookups timed per size.")
+    args = parser.parse_args()
+    run(args.sizes, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
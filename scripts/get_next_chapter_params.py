@@ -12,7 +12,7 @@ except ImportError:
 
 
 def main():
-    dm = storage.DataManager()
+    dm = storage.get_data_manager()
     if not dm._initialized:
         dm.initialize_and_load()
 
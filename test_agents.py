@@ -32,7 +32,7 @@ def test_basic_agent_functionality():
 
     # Test database connection
     try:
-        storage.DataManager()
+        storage.get_data_manager()
         print("✅ Database connection successful")
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
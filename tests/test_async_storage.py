@@ -0,0 +1,102 @@
+import asyncio
+
+from hronir_encyclopedia import storage
+from hronir_encyclopedia.async_storage import AsyncDataManager
+from hronir_encyclopedia.models import Path as PathModel
+
+
+def test_concurrent_reads_are_batched(monkeypatch):
+    adm = AsyncDataManager(storage.get_data_manager())
+    texts = [f"Chapter {i} of a concurrent session." for i in range(10)]
+    bulk_reads = []
+    original = adm.data_manager.backend.get_hronir_contents
+
+    def counting_read(uuids):
+        bulk_reads.append(list(uuids))
+        return original(uuids)
+
+    async def session():
+        uuids = await asyncio.gather(*(adm.store(text) for text in texts))
+        adm.data_manager.content_cache.clear()
+        monkeypatch.setattr(adm.data_manager.backend, "get_hronir_contents", counting_read)
+        missing = str(storage.compute_hronir_uuid("never stored"))
+        contents = await asyncio.gather(*(adm.get_content(u) for u in [*uuids, missing]))
+        flags = await asyncio.gather(adm.exists(uuids[0]), adm.exists(missing))
+        return contents, flags
+
+    try:
+        contents, flags = asyncio.run(session())
+    finally:
+        adm.close()
+
+    assert contents == [*texts, None]
+    assert flags == [True, False]
+    assert len(bulk_reads) == 1
+    assert len(bulk_reads[0]) == 11
+
+
+def test_paths_and_canon_are_awaitable():
+    async def session():
+        async with AsyncDataManager(storage.get_data_manager()) as adm:
+            root = await adm.store("The root chapter.")
+            await adm.add_path(
+                PathModel(
+                    path_uuid=storage.compute_narrative_path_uuid(0, "", root),
+                    position=0,
+                    uuid=root,
+                )
+            )
+            return root, await adm.canonical_path(), await adm.candidates(0)
+
+    root, canon, candidates = asyncio.run(session())
+    assert [entry["hrönir_uuid"] for entry in canon] == [root]
+    assert [c["hrönir_uuid"] for c in candidates] == [root]
+
+
+def test_crew_stores_through_the_facade_and_releases_it(monkeypatch):
+    from hronir_encyclopedia.agents import crew_manager
+
+    class FakeCrew:
+        def kickoff(self):
+            return "A chapter written by the crew."
+
+    monkeypatch.setattr(crew_manager, "CREWAI_AVAILABLE", True)
+    config = crew_manager.CrewConfig(name="test", agents=[])
+
+    async def session():
+        async with crew_manager.HronirCrew(config) as crew:
+            monkeypatch.setattr(crew, "create_writing_crew", lambda task_data: FakeCrew())
+            result = await crew.execute_writing_task({"position": 1})
+        return crew, result
+
+    crew, result = asyncio.run(session())
+    assert result["success"]
+    assert storage.get_data_manager().get_hrönir_content(result["uuid"]) == FakeCrew().kickoff()
+    assert crew.async_data_manager._executor._shutdown
+    assert crew.async_data_manager.data_manager is not storage.get_data_manager()
+
+
+def test_default_facade_initializes_its_own_manager_on_the_worker(monkeypatch):
+    import threading
+
+    from hronir_encyclopedia.storage import DataManager
+
+    threads = []
+    original = DataManager.initialize_and_load
+
+    def recording_init(self, *args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(DataManager, "initialize_and_load", recording_init)
+    shared = storage.get_data_manager()
+
+    async def session():
+        async with AsyncDataManager() as adm:
+            assert threads and threads[0].startswith("hronir-storage")
+            assert adm.data_manager.backend.conn is not shared.backend.conn
+            return adm, await adm.store("Written through the dedicated connection.")
+
+    adm, chapter = asyncio.run(session())
+    assert shared.get_hrönir_content(chapter) == "Written through the dedicated connection."
+    assert not adm.data_manager.backend._initialized
@@ -0,0 +1,26 @@
+import uuid
+
+from hronir_encyclopedia.bloom_filter import BloomFilter
+
+
+def _uuids(prefix: str, count: int) -> list[str]:
+    return [str(uuid.uuid5(uuid.NAMESPACE_URL, f"{prefix}-{i}")) for i in range(count)]
+
+
+def test_no_false_negatives_and_bounded_false_positives():
+    members = _uuids("member", 2_000)
+    bloom = BloomFilter(capacity=2_000, false_positive_rate=0.01)
+    for member in members:
+        bloom.add(member)
+
+    assert all(member in bloom for member in members)
+    false_positives = sum(other in bloom for other in _uuids("other", 10_000))
+    assert false_positives < 300  # ~1% expected; generous margin against flakiness
+    assert not bloom.is_saturated
+
+
+def test_non_uuid_values_are_absent():
+    bloom = BloomFilter(capacity=10)
+    bloom.add(uuid.uuid5(uuid.NAMESPACE_URL, "x"))
+    assert "not-a-uuid" not in bloom
+    assert None not in bloom
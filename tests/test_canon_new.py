@@ -4,6 +4,7 @@ from unittest.mock import MagicMock
 import pytest
 
 from hronir_encyclopedia.canon_new import calculate_canonical_path
+from hronir_encyclopedia.compact_graph import path_frame
 from hronir_encyclopedia.models import Path as PathModel
 
 NAMESPACE = uuid.NAMESPACE_URL
@@ -29,6 +30,10 @@ def create_path(path_key, position, prev_key, hronir_key):
 @pytest.fixture
 def mock_dm():
     dm = MagicMock()
+    # Canon reads the columnar scan; serve it from the paths each test sets up.
+    dm.iter_path_columns.side_effect = lambda *args, **kwargs: [
+        path_frame(dm.get_all_paths.return_value)
+    ]
     return dm
 
 
@@ -0,0 +1,110 @@
+import pytest
+
+from hronir_encyclopedia import change_feed, graph_logic, storage
+from hronir_encyclopedia.change_feed import ChangeEvent, ChangeFeed, ChangeLogPrunedError
+from hronir_encyclopedia.models import Path as PathModel
+
+
+def _root_path(hronir_uuid: str) -> PathModel:
+    return PathModel(
+        path_uuid=storage.compute_narrative_path_uuid(0, "", hronir_uuid),
+        position=0,
+        uuid=hronir_uuid,
+    )
+
+
+def test_inserts_are_delivered_in_batches_on_commit():
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    batches = []
+    dm.subscribe_changes(batches.append)
+
+    root = dm.store_hrönir_text("A chapter worth announcing.")
+    dm.add_path(_root_path(root))
+    dm.add_path(_root_path(root))  # duplicate: no event
+    assert batches == []
+
+    dm.save_all_data()
+    assert len(batches) == 1
+    assert [(e.table, e.operation, e.key) for e in batches[0]] == [
+        ("hronirs", "insert", root),
+        ("paths", "insert", str(_root_path(root).path_uuid)),
+    ]
+    seqs = [e.seq for e in batches[0]]
+    assert seqs == sorted(seqs)
+
+
+def test_late_subscriber_catches_up_from_the_log():
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    first = dm.store_hrönir_text("Recorded before anyone listened.")
+    dm.save_all_data()
+    last_seen = dm.get_changes_since(0)[-1].seq
+
+    second = dm.store_hrönir_text("Recorded while the worker was down.")
+    received = []
+    dm.subscribe_changes(received.extend, tables=["hronirs"], after_seq=last_seen)
+    assert [e.key for e in received] == [second]
+
+    third = storage.compute_hronir_uuid("Imported in bulk.")
+    dm.bulk_store(
+        [(first, "Recorded before anyone listened."), (third, "Imported in bulk.")], [], []
+    )
+    assert [e.key for e in received] == [second, third]
+
+
+def test_full_buffer_flushes_and_failing_subscribers_are_isolated():
+    feed = ChangeFeed(batch_size=2)
+    delivered = []
+
+    def broken(events):
+        raise RuntimeError("subscriber bug")
+
+    feed.subscribe(broken)
+    feed.subscribe(delivered.append)
+    feed.publish([ChangeEvent(1, "paths", "insert", "a")])
+    assert delivered == []
+    feed.publish([ChangeEvent(2, "paths", "insert", "b")])
+    assert [[e.key for e in batch] for batch in delivered] == [["a", "b"]]
+
+
+def test_saving_prunes_the_log_but_keeps_what_subtree_stats_need(monkeypatch):
+    monkeypatch.setattr(change_feed, "CHANGE_LOG_RETENTION", 1)
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    root = dm.store_hrönir_text("The first chapter.")
+    dm.add_path(_root_path(root))
+    assert dm.get_subtree_stats([root])[root]["descendants"] == 0
+    dm.save_all_data()
+    stats_seq = dm.last_change_seq()
+    assert len(dm.get_changes_since(stats_seq - 1)) == 1
+    with pytest.raises(ChangeLogPrunedError):
+        dm.get_changes_since(0)
+    with pytest.raises(ChangeLogPrunedError):
+        dm.subscribe_changes(lambda events: None, after_seq=0)
+
+    # A later session that never reads the stats must keep the events they have not seen.
+    storage.close_data_managers()
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    for text in ["Two.", "Three.", "Four."]:
+        dm.add_path(_root_path(dm.store_hrönir_text(text)))
+    dm.save_all_data()
+    assert len(dm.get_changes_since(stats_seq)) == 6
+
+    assert dm.get_subtree_stats([root])[root]["descendants"] == 0
+    assert dm.prune_change_log() == 5
+
+
+def test_graph_cache_rebuilds_after_the_log_was_pruned():
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    first = dm.store_hrönir_text("Before the prune.")
+    dm.add_path(_root_path(first))
+    assert graph_logic.get_compact_graph(dm).node_id(first) is not None
+
+    second = dm.store_hrönir_text("After the prune.")
+    dm.add_path(_root_path(second))
+    dm.prune_change_log(retention=0)
+
+    assert graph_logic.get_compact_graph(dm).node_id(second) is not None
@@ -0,0 +1,154 @@
+import uuid
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from hronir_encyclopedia import compact_graph, graph_logic, storage
+from hronir_encyclopedia.compact_graph import ROOT_ID, ROOT_NODE, CompactGraph, path_frame
+from hronir_encyclopedia.models import Path as PathModel
+
+
+def _hronir_uuid(key: str) -> str:
+    return str(uuid.uuid5(storage.UUID_NAMESPACE, key))
+
+
+def _make_path(position: int, prev_key: str | None, key: str) -> PathModel:
+    prev = _hronir_uuid(prev_key) if prev_key else ""
+    cur = _hronir_uuid(key)
+    return PathModel(
+        path_uuid=storage.compute_narrative_path_uuid(position, prev, cur),
+        position=position,
+        prev_uuid=prev or None,
+        uuid=cur,
+    )
+
+
+def _tree() -> list[PathModel]:
+    """root -> a -> (b, c); b -> (d, e); c -> f."""
+    return [
+        _make_path(0, None, "a"),
+        _make_path(1, "a", "b"),
+        _make_path(1, "a", "c"),
+        _make_path(2, "b", "d"),
+        _make_path(2, "b", "e"),
+        _make_path(2, "c", "f"),
+    ]
+
+
+def test_csr_adjacency_and_reverse_edges():
+    paths = _tree()
+    graph = CompactGraph.from_paths(paths)
+    assert graph.num_nodes == 7 and graph.num_edges == 6
+    assert graph.sources.dtype == np.int32 and graph.targets.dtype == np.int32
+
+    a, b = graph.node_id(_hronir_uuid("a")), graph.node_id(_hronir_uuid("b"))
+    assert graph.successors(ROOT_ID).tolist() == [a]
+    assert sorted(graph.node_uuid(n) for n in graph.successors(b)) == sorted(
+        [_hronir_uuid("d"), _hronir_uuid("e")]
+    )
+    assert graph.predecessors(b).tolist() == [a]
+    assert graph.node_uuid(ROOT_ID) == ROOT_NODE
+    assert graph.node_id(_hronir_uuid("missing")) is None
+    assert graph.node_id("not-a-uuid") is None
+
+    by_uuid = {str(p.path_uuid): p for p in paths}
+    for edge in range(graph.num_edges):
+        path = by_uuid[graph.path_uuid(edge)]
+        assert graph.positions[edge] == path.position
+        assert graph.node_uuid(graph.targets[edge]) == str(path.uuid)
+
+    # Out-edges of a node are ordered by path UUID.
+    edges = graph.out_edges(b)
+    assert [graph.path_uuid(e) for e in edges] == sorted(graph.path_uuid(e) for e in edges)
+
+
+def test_matches_networkx_graph():
+    graph = CompactGraph.from_paths(_tree())
+    G = graph.to_networkx()
+    expected = nx.DiGraph()
+    expected.add_node(ROOT_NODE)
+    for p in _tree():
+        expected.add_edge(str(p.prev_uuid or ROOT_NODE), str(p.uuid), path_uuid=str(p.path_uuid))
+    assert nx.utils.graphs_equal(G, expected)
+    assert graph.nbytes < graph.num_edges * 100
+
+
+def test_cycle_detection():
+    assert CompactGraph.from_paths(_tree()).is_acyclic()
+    assert CompactGraph.from_paths([]).is_acyclic()
+    cyclic = _tree() + [_make_path(3, "f", "a")]
+    assert not CompactGraph.from_paths(cyclic).is_acyclic()
+
+
+def test_columnar_scan_builds_same_graph():
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    for path in _tree():
+        dm.add_path(path)
+    dm.save_all_data()
+
+    scanned = graph_logic.get_compact_graph(dm)
+    expected = CompactGraph.from_paths(_tree())
+    for name in ("node_uuids", "sources", "targets", "path_uuids", "positions", "offsets"):
+        assert np.array_equal(getattr(scanned, name), getattr(expected, name))
+
+    chunks = list(dm.iter_path_columns(batch_size=1))
+    assert sum(len(c) for c in chunks) == len(_tree())
+
+
+def test_appending_paths_matches_a_full_build():
+    paths = _tree()
+    expected = CompactGraph.from_paths(paths)
+    grown = CompactGraph.from_paths(paths[3:]).with_frame(path_frame(paths[:4]))
+
+    for name in ("node_uuids", "sources", "targets", "path_uuids", "positions", "offsets"):
+        assert np.array_equal(getattr(grown, name), getattr(expected, name))
+
+
+def test_snapshot_round_trip_is_memory_mapped(tmp_path):
+    graph = CompactGraph.from_paths(_tree())
+    graph.save(tmp_path / "graph")
+
+    loaded = CompactGraph.load(tmp_path / "graph")
+
+    assert isinstance(loaded.targets, np.memmap)
+    for name in ("node_uuids", "sources", "targets", "path_uuids", "offsets", "in_edge_ids"):
+        assert np.array_equal(getattr(loaded, name), getattr(graph, name))
+    b = loaded.node_id(_hronir_uuid("b"))
+    assert sorted(loaded.node_uuid(n) for n in loaded.successors(b)) == sorted(
+        [_hronir_uuid("d"), _hronir_uuid("e")]
+    )
+
+
+def test_graph_snapshot_tracks_the_change_log(tmp_path):
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    for path in _tree()[:3]:
+        dm.add_path(path)
+    snapshot = tmp_path / "snapshot"
+
+    assert not graph_logic.is_graph_snapshot_current(snapshot, dm)
+    graph_logic.export_graph_snapshot(snapshot, dm)
+    assert graph_logic.is_graph_snapshot_current(snapshot, dm)
+    assert graph_logic.load_graph_snapshot(snapshot).num_edges == 3
+
+    dm.add_path(_tree()[3])
+    assert not graph_logic.is_graph_snapshot_current(snapshot, dm)
+
+
+def test_malformed_rows_are_skipped_not_fatal(caplog):
+    frame = path_frame(_tree())
+    bad = frame.iloc[:3].copy()
+    bad.loc[:, "path_uuid"] = [_hronir_uuid("p1"), "", _hronir_uuid("p3")]
+    bad.loc[:, "uuid"] = [_hronir_uuid("x"), _hronir_uuid("y"), "not-a-uuid"]
+    bad.loc[:, "prev_uuid"] = [_hronir_uuid("a")[:-1], "", ""]
+
+    graph = CompactGraph.from_frames([frame, bad])
+
+    assert graph.num_edges == len(frame)
+    assert graph.node_id(_hronir_uuid("x")) is None
+    assert "Skipping 3 path(s) with malformed UUIDs" in caplog.text
+    assert graph.with_frame(bad) is graph
+    with pytest.raises(ValueError):
+        compact_graph.uuids_to_array([_hronir_uuid("a"), ""])
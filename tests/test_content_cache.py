@@ -0,0 +1,49 @@
+import sys
+
+from hronir_encyclopedia.content_cache import ContentCache
+
+
+def test_evicts_least_recently_used_within_byte_budget():
+    text = "x" * 1000
+    cache = ContentCache(max_bytes=3 * sys.getsizeof(text))
+    for key in ("a", "b", "c"):
+        cache.put(key, text)
+    assert cache.get("a") == text  # "b" is now the least recently used
+
+    cache.put("d", text)
+    assert "b" not in cache
+    assert all(key in cache for key in ("a", "c", "d"))
+    assert cache.current_bytes <= cache.max_bytes
+    assert cache.evictions == 1
+
+
+def test_oversized_entries_are_not_cached():
+    cache = ContentCache(max_bytes=100)
+    cache.put("big", "y" * 1000)
+    assert len(cache) == 0
+    assert cache.get("big") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_agent_context_is_read_through_the_cache(monkeypatch):
+    from hronir_encyclopedia import storage
+    from hronir_encyclopedia.agents.base import AgentConfig, BaseHronirAgent
+
+    class ContextAgent(BaseHronirAgent):
+        def execute_task(self, task_data):
+            return {}
+
+        def get_agent_prompt(self, task_data):
+            return ""
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    predecessor = dm.store_hrönir_text("The predecessor chapter. " * 40)
+
+    agent = ContextAgent(AgentConfig(name="writer", role="r", goal="g", backstory="b"))
+    for _ in range(2):
+        context = agent.get_narrative_context(1, predecessor)
+        assert context == ("The predecessor chapter. " * 40)[:500]
+    assert dm.content_cache.hits >= 1
+    assert agent.get_narrative_context(0) == ""
@@ -0,0 +1,58 @@
+import uuid
+
+from hronir_encyclopedia import graph_logic, storage
+from hronir_encyclopedia.models import Path as PathModel
+
+
+def _hronir_uuid(key: str) -> str:
+    return str(uuid.uuid5(storage.UUID_NAMESPACE, key))
+
+
+def _make_path(position: int, prev_key: str | None, key: str) -> PathModel:
+    prev = _hronir_uuid(prev_key) if prev_key else ""
+    cur = _hronir_uuid(key)
+    return PathModel(
+        path_uuid=storage.compute_narrative_path_uuid(position, prev, cur),
+        position=position,
+        prev_uuid=prev or None,
+        uuid=cur,
+    )
+
+
+def test_audits_run_over_the_stored_graph():
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    # root -> a -> (b, c); b -> d; a shortcut a -> d; "ghost" never introduced -> x -> y.
+    paths = [
+        _make_path(0, None, "a"),
+        _make_path(1, "a", "b"),
+        _make_path(1, "a", "c"),
+        _make_path(2, "b", "d"),
+        _make_path(1, "a", "d"),
+        _make_path(5, "ghost", "x"),
+        _make_path(6, "x", "y"),
+    ]
+    for path in paths:
+        dm.add_path(path)
+
+    analytics = graph_logic.get_graph_analytics(dm)
+
+    assert analytics.orphan_paths() == [str(paths[5].path_uuid)]
+    assert analytics.frontier() == [_hronir_uuid(k) for k in ("y", "d", "c")]
+    assert analytics.frontier(limit=1) == [_hronir_uuid("y")]
+    assert analytics.unreachable_hronirs() == sorted([_hronir_uuid("x"), _hronir_uuid("y")])
+    depths = dict(zip(*analytics.depths().to_dict("list").values(), strict=True))
+    assert depths == {
+        _hronir_uuid("a"): 0,
+        _hronir_uuid("b"): 1,
+        _hronir_uuid("c"): 1,
+        _hronir_uuid("d"): 1,
+    }
+    assert analytics.summary() == {
+        "paths": 7,
+        "hronirs": 6,
+        "orphan_paths": 1,
+        "frontier": 3,
+        "unreachable_hronirs": 2,
+        "max_depth": 1,
+    }
@@ -0,0 +1,101 @@
+import uuid
+
+import duckdb
+import networkx as nx
+from typer.testing import CliRunner
+
+from hronir_encyclopedia import graph_logic, storage
+from hronir_encyclopedia.cli import app
+from hronir_encyclopedia.compact_graph import ROOT_NODE
+from hronir_encyclopedia.models import Path as PathModel
+
+
+def _hronir_uuid(key: str) -> str:
+    return str(uuid.uuid5(storage.UUID_NAMESPACE, key))
+
+
+def _make_path(position: int, prev_key: str | None, key: str) -> PathModel:
+    prev = _hronir_uuid(prev_key) if prev_key else ""
+    cur = _hronir_uuid(key)
+    return PathModel(
+        path_uuid=storage.compute_narrative_path_uuid(position, prev, cur),
+        position=position,
+        prev_uuid=prev or None,
+        uuid=cur,
+    )
+
+
+def _story() -> storage.DataManager:
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    for path in [
+        _make_path(0, None, "a"),
+        _make_path(1, "a", "b"),
+        _make_path(1, "a", "c"),
+        _make_path(2, "b", "d"),
+        _make_path(2, "c", "d"),
+        _make_path(3, "d", "e"),
+        _make_path(0, None, "x"),
+        _make_path(1, "x", "y"),
+    ]:
+        dm.add_path(path)
+    return dm
+
+
+def test_graphml_matches_the_narrative_graph(tmp_path):
+    dm = _story()
+    output = tmp_path / "graph.graphml"
+
+    assert dm.graph_export().write(output, "graphml", batch_size=2) == 8
+
+    exported = nx.read_graphml(output)
+    expected = graph_logic.get_narrative_graph(dm)
+    assert set(exported.edges) == set(expected.edges)
+    assert set(exported.nodes) == set(expected.nodes)
+    assert exported.nodes[_hronir_uuid("d")]["position"] == 2
+    edge = exported.edges[_hronir_uuid("d"), _hronir_uuid("e")]
+    assert edge["path_uuid"] == str(_make_path(3, "d", "e").path_uuid)
+
+
+def test_dot_export_lists_every_edge(tmp_path):
+    dm = _story()
+    output = tmp_path / "graph.dot"
+
+    assert dm.graph_export(min_position=1, max_position=2).write(output, "dot") == 5
+
+    lines = output.read_text().splitlines()
+    assert lines[0] == "digraph narrative {" and lines[-1] == "}"
+    assert sum("->" in line for line in lines) == 5
+    assert f'"{_hronir_uuid("b")}" -> "{_hronir_uuid("d")}"' in output.read_text()
+
+
+def test_neighbourhood_filter_follows_paths_both_ways():
+    dm = _story()
+    export = dm.graph_export(around=[_hronir_uuid("b")], radius=1)
+
+    edges = {
+        (source, target)
+        for chunk in export.iter_edges()
+        for source, target in zip(chunk["source"], chunk["target"], strict=True)
+    }
+    # b's neighbours are a and d; paths with both ends among {a, b, d} are kept.
+    assert edges == {
+        (ROOT_NODE, _hronir_uuid("a")),
+        (_hronir_uuid("a"), _hronir_uuid("b")),
+        (_hronir_uuid("b"), _hronir_uuid("d")),
+    }
+
+
+def test_cli_writes_a_parquet_edge_list(tmp_path):
+    _story()
+    output = tmp_path / "edges.parquet"
+
+    result = CliRunner().invoke(app, ["graph", "export", str(output), "--max-position", "1"])
+
+    assert result.exit_code == 0, result.output
+    assert "Exported 5 paths" in result.output
+    rows = duckdb.execute(
+        f"SELECT source, target FROM read_parquet('{output}') ORDER BY position, target"
+    ).fetchall()
+    assert len(rows) == 5
+    assert {target for _, target in rows} == {_hronir_uuid(k) for k in "abcxy"}
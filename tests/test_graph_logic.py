@@ -1,11 +1,14 @@
 import uuid  # Added for uuid.uuid5
 from pathlib import Path
 
+import pytest
+
 from hronir_encyclopedia import (
     graph_logic,
     storage,
 )
 from hronir_encyclopedia.models import Path as PathModel
+from hronir_encyclopedia.topological_order import NarrativeCycleError
 
 
 def _setup_and_check_consistency(paths_data: list[PathModel]):
@@ -133,4 +136,57 @@ def test_is_narrative_consistent(tmp_path: Path):
     # ]
     # df_cycle_nodes = pd.DataFrame(validated_cycle_data) # No longer creating CSV
     # df_cycle_nodes.to_csv(fork_dir / "path_cycle.csv", index=False)
-    assert not _setup_and_check_consistency(df_cycle_nodes_data)  # Pass data directly
+    # The path closing the cycle is rejected on insert, so the graph stays consistent.
+    with pytest.raises(NarrativeCycleError):
+        _setup_and_check_consistency(df_cycle_nodes_data)
+    assert graph_logic.is_narrative_consistent()
+
+
+def test_cycle_already_in_database_is_reported():
+    """Rows written around add_path (e.g. imported before the check existed) are still seen."""
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    a, b = (uuid.uuid5(storage.UUID_NAMESPACE, key) for key in ("loop_a", "loop_b"))
+    rows = [(0, "", a), (1, a, b), (2, b, a)]
+    for position, prev, cur in rows:
+        dm.backend.conn.execute(
+            "INSERT INTO paths VALUES (?, ?, ?, ?, 'PENDING', '')",
+            (
+                str(storage.compute_narrative_path_uuid(position, str(prev), str(cur))),
+                position,
+                str(prev),
+                str(cur),
+            ),
+        )
+    assert not graph_logic.is_narrative_consistent()
+
+
+def test_narrative_graph_is_cached_and_extended_incrementally(monkeypatch):
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    a, b, c = (uuid.uuid5(storage.UUID_NAMESPACE, key) for key in ("cache_a", "cache_b", "cache_c"))
+
+    def path(position, prev, cur):
+        return PathModel(
+            path_uuid=storage.compute_narrative_path_uuid(position, str(prev or ""), str(cur)),
+            position=position,
+            prev_uuid=prev,
+            uuid=cur,
+        )
+
+    dm.add_path(path(0, None, a))
+    G = graph_logic.get_narrative_graph(dm)
+    assert set(G.edges) == {(graph_logic.ROOT_NODE, str(a))}
+
+    monkeypatch.setattr(dm, "iter_path_columns", lambda *_: pytest.fail("graph rebuilt"))
+    assert graph_logic.get_narrative_graph(dm) is G
+    dm.add_path(path(1, a, b))
+    dm.add_path(path(2, b, c))
+    assert graph_logic.get_narrative_graph(dm) is G
+    assert G[str(b)][str(c)]["path_uuid"] == str(path(2, b, c).path_uuid)
+    compact = graph_logic.get_compact_graph(dm)
+    assert compact.num_edges == 3 and compact.is_acyclic()
+    monkeypatch.undo()
+
+    dm.clear_in_memory_data()
+    assert graph_logic.get_compact_graph(dm).num_edges == 0
@@ -0,0 +1,97 @@
+import random
+import uuid
+
+import pytest
+
+from hronir_encyclopedia import graph_logic, storage
+from hronir_encyclopedia.compact_graph import CompactGraph
+from hronir_encyclopedia.lineage import LineageIndex
+from hronir_encyclopedia.models import Path as PathModel
+
+
+def _hronir_uuid(key: str) -> str:
+    return str(uuid.uuid5(storage.UUID_NAMESPACE, key))
+
+
+def _make_path(position: int, prev_key: str | None, key: str) -> PathModel:
+    prev = _hronir_uuid(prev_key) if prev_key else ""
+    cur = _hronir_uuid(key)
+    return PathModel(
+        path_uuid=storage.compute_narrative_path_uuid(position, prev, cur),
+        position=position,
+        prev_uuid=prev or None,
+        uuid=cur,
+    )
+
+
+def _random_dag(seed: int, size: int = 80) -> list[PathModel]:
+    rng = random.Random(seed)
+    paths = [_make_path(0, None, "n0"), _make_path(0, None, "m0")]
+    level = {"n0": 0, "m0": 0}
+    for i in range(1, size):
+        key = f"n{i}"
+        parents = rng.sample(sorted(level), k=min(len(level), rng.choice([1, 1, 2])))
+        for parent in parents:
+            paths.append(_make_path(level[parent] + 1, parent, key))
+        level[key] = max(level[p] for p in parents) + 1
+    return paths
+
+
+def _brute_lineages(paths: list[PathModel]) -> dict[str, list[str]]:
+    """Hrönir -> hrönirs from position 0 down to it, following each one's earliest path."""
+    first: dict[str, PathModel] = {}
+    for path in sorted(paths, key=lambda p: (p.position, str(p.prev_uuid or ""), str(p.path_uuid))):
+        first.setdefault(str(path.uuid), path)
+    lineages = {}
+    for hronir in first:
+        chain, node = [], hronir
+        while node:
+            chain.append(node)
+            node = str(first[node].prev_uuid or "")
+        lineages[hronir] = chain[::-1]
+    return lineages
+
+
+def test_queries_match_walking_the_lineage():
+    paths = _random_dag(seed=11)
+    index = LineageIndex(CompactGraph.from_paths(paths))
+    lineages = _brute_lineages(paths)
+
+    rng = random.Random(5)
+    for hronir, chain in lineages.items():
+        assert index.depth(hronir) == len(chain) - 1
+        assert [entry["hrönir_uuid"] for entry in index.lineage(hronir)] == chain
+        depth = rng.randrange(len(chain))
+        assert index.ancestor_at_depth(hronir, depth) == chain[depth]
+        assert index.ancestor_at_depth(hronir, len(chain)) is None
+
+        other = rng.choice(sorted(lineages))
+        shared = [a for a, b in zip(chain, lineages[other], strict=False) if a == b]
+        assert index.lowest_common_ancestor(hronir, other) == (shared[-1] if shared else None)
+
+
+def test_cyclic_graph_is_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        LineageIndex(CompactGraph.from_paths([_make_path(1, "x", "y"), _make_path(2, "y", "x")]))
+
+
+def test_graph_logic_lineage_helpers():
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    tree = [
+        _make_path(0, None, "a"),
+        _make_path(1, "a", "b"),
+        _make_path(1, "a", "c"),
+        _make_path(2, "b", "d"),
+    ]
+    for path in tree[:3]:
+        dm.add_path(path)
+
+    assert graph_logic.find_common_ancestor(_hronir_uuid("b"), _hronir_uuid("c"), dm) == (
+        _hronir_uuid("a")
+    )
+    dm.add_path(tree[3])  # the cached index is rebuilt for the new path
+    assert graph_logic.get_lineage(_hronir_uuid("d"), dm) == [
+        {"position": p.position, "path_uuid": str(p.path_uuid), "hrönir_uuid": str(p.uuid)}
+        for p in (tree[0], tree[1], tree[3])
+    ]
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from hronir_encyclopedia import near_duplicates, storage
+
+BASE_TEXT = (
+    "In the fourth volume of the Anglo-American Cyclopaedia we found an article on Uqbar, "
+    "a region of Iraq or Asia Minor whose literature was fantastic and whose epics and "
+    "legends never referred to reality but to the two imaginary regions of Mlejnas and Tlön. "
+    "The bibliography listed four volumes that we have not been able to locate."
+)
+
+
+@pytest.fixture
+def dm():
+    data_manager = storage.get_data_manager()
+    data_manager.initialize_and_load()
+    return data_manager
+
+
+def _store_text(dm, text: str, tmp_path, name: str) -> str:
+    chapter = tmp_path / f"{name}.md"
+    chapter.write_text(text, encoding="utf-8")
+    return dm.store_hrönir(chapter)
+
+
+def test_signature_similarity_tracks_jaccard():
+    sig = near_duplicates.minhash_signature(BASE_TEXT)
+    assert near_duplicates.estimated_similarity(sig, sig) == 1.0
+
+    unrelated = near_duplicates.minhash_signature("A labyrinth of symbols, a circular time.")
+    assert near_duplicates.estimated_similarity(sig, unrelated) < 0.2
+    assert near_duplicates.minhash_signature("...") is None
+
+
+def test_store_flags_near_duplicates(dm, tmp_path):
+    original = _store_text(dm, BASE_TEXT, tmp_path, "original")
+    variant = _store_text(dm, BASE_TEXT + " Nothing else was found.", tmp_path, "variant")
+    unrelated = _store_text(dm, "The garden of forking paths is a riddle.", tmp_path, "other")
+
+    matches = dm.find_near_duplicates(BASE_TEXT, exclude_uuid=original)
+    assert [u for u, _ in matches] == [variant]
+
+    metadata = dm.backend.conn.execute(
+        "SELECT metadata FROM hronirs WHERE uuid = ?", (variant,)
+    ).fetchone()[0]
+    assert original in metadata
+    assert unrelated not in metadata
+
+
+def test_clusters_group_variants(dm, tmp_path):
+    a = _store_text(dm, BASE_TEXT, tmp_path, "a")
+    b = _store_text(dm, BASE_TEXT + " Nothing else was found.", tmp_path, "b")
+    c = _store_text(dm, "Yet another preface. " + BASE_TEXT, tmp_path, "c")
+    _store_text(dm, "The garden of forking paths is a riddle.", tmp_path, "d")
+
+    assert dm.find_near_duplicate_clusters() == [sorted([a, b, c])]
+
+
+def test_bulk_store_flags_near_duplicates(dm):
+    original = dm.store_hrönir_text(BASE_TEXT)
+    variant_text = BASE_TEXT + " Nothing else was found."
+    twin_text = "Yet another preface. " + variant_text
+    variant, twin, unrelated = (
+        storage.compute_hronir_uuid(text)
+        for text in [variant_text, twin_text, "The garden of forking paths is a riddle."]
+    )
+
+    dm.bulk_store(
+        [
+            (variant, variant_text),
+            (twin, twin_text),
+            (unrelated, "The garden of forking paths is a riddle."),
+        ],
+        [],
+        [],
+    )
+
+    def flagged(hronir_uuid):
+        metadata = dm.backend.conn.execute(
+            "SELECT metadata FROM hronirs WHERE uuid = ?", (hronir_uuid,)
+        ).fetchone()[0]
+        return set(json.loads(metadata).get("near_duplicate_of", []))
+
+    assert flagged(variant) == {original}
+    # Earlier chapters of the same batch count, as if stored one by one.
+    assert flagged(twin) == {original, variant}
+    assert flagged(unrelated) == set()
+    assert flagged(original) == set()
@@ -0,0 +1,86 @@
+import uuid
+
+import duckdb
+import pytest
+
+from hronir_encyclopedia import near_duplicates, search_index, storage
+
+
+def _store(dm, text: str) -> str:
+    hronir_uuid = str(uuid.uuid5(storage.UUID_NAMESPACE, text))
+    dm.backend.add_hronir(hronir_uuid=hronir_uuid, content=text)
+    return hronir_uuid
+
+
+@pytest.fixture
+def dm():
+    data_manager = storage.get_data_manager()
+    data_manager.initialize_and_load()
+    return data_manager
+
+
+def test_tokenize_splits_on_punctuation_and_underscores():
+    assert search_index.tokenize("Tlön, Uqbar_Orbis-Tertius!") == [
+        "tlön",
+        "uqbar",
+        "orbis",
+        "tertius",
+    ]
+
+
+def test_bm25_prefers_documents_dense_in_rare_terms(dm):
+    mirror = _store(dm, "The mirror of Uqbar multiplies men; the mirror is abominable.")
+    library = _store(dm, "The library is infinite and the mirror is one of its rooms.")
+    _store(dm, "A labyrinth of time, with no mention of reflections.")
+
+    results = dm.search_hrönirs("mirror uqbar")
+
+    assert [uuid for uuid, _ in results] == [mirror, library]
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_reindexing_replaces_postings(dm):
+    hronir_uuid = _store(dm, "compass")
+    dm.backend.add_hronir(hronir_uuid=hronir_uuid, content="coin")
+
+    assert dm.search_hrönirs("compass") == []
+    assert [u for u, _ in dm.search_hrönirs("coin")] == [hronir_uuid]
+
+
+def test_backfill_indexes_hronirs_stored_before_the_index(tmp_path):
+    conn = duckdb.connect(str(tmp_path / "legacy.duckdb"))
+    conn.execute("CREATE TABLE hronirs (uuid VARCHAR PRIMARY KEY, content TEXT)")
+    conn.execute("INSERT INTO hronirs VALUES ('h1', 'orbis tertius'), ('h2', 'hrönir')")
+    search_index.ensure_tables(conn)
+
+    assert search_index.backfill(conn) == 2
+    assert search_index.backfill(conn) == 0
+    assert [u for u, _ in search_index.search(conn, "tertius")] == ["h1"]
+
+
+def test_bulk_store_indexes_only_the_inserted_hronirs(dm, monkeypatch):
+    _store(dm, "An early chapter about mirrors.")
+    stored = str(uuid.uuid5(storage.UUID_NAMESPACE, "An early chapter about mirrors."))
+
+    def no_backfill(*_):
+        pytest.fail("bulk_store rescanned the hronirs table")
+
+    monkeypatch.setattr(search_index, "backfill", no_backfill)
+    monkeypatch.setattr(near_duplicates, "backfill", no_backfill)
+    indexed = []
+    index_documents = search_index.index_documents
+    monkeypatch.setattr(
+        search_index,
+        "index_documents",
+        lambda conn, documents: indexed.extend(documents) or index_documents(conn, documents),
+    )
+
+    fresh = str(uuid.uuid5(storage.UUID_NAMESPACE, "A later chapter about tigers."))
+    dm.bulk_store(
+        [(stored, "An early chapter about mirrors."), (fresh, "A later chapter about tigers.")],
+        [],
+        [],
+    )
+
+    assert indexed == [(fresh, "A later chapter about tigers.")]
+    assert [u for u, _ in dm.search_hrönirs("tigers")] == [fresh]
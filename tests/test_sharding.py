@@ -0,0 +1,136 @@
+import dataclasses
+import hashlib
+import json
+import os
+
+import blake3
+import duckdb
+import pytest
+
+from hronir_encyclopedia import sharding
+from hronir_encyclopedia.sharding import ShardingManager, SnapshotManifest
+
+
+@pytest.fixture
+def source_db(tmp_path):
+    db_path = tmp_path / "source.duckdb"
+    with duckdb.connect(str(db_path)) as conn:
+        conn.execute(
+            "CREATE TABLE paths AS SELECT range AS id, md5(range::VARCHAR) AS h FROM range(20000)"
+        )
+    return db_path
+
+
+def test_zstd_round_trip_across_frames(tmp_path, monkeypatch):
+    monkeypatch.setattr(sharding, "ZSTD_FRAME_SIZE", 4096)
+    source = tmp_path / "data.bin"
+    source.write_bytes(os.urandom(10_000) + "hrönir ".encode() * 5000)
+
+    sharding.compress_zstd(source, tmp_path / "data.bin.zst", level=5, threads=2)
+    sharding.decompress_zstd(tmp_path / "data.bin.zst", tmp_path / "restored.bin")
+
+    assert (tmp_path / "restored.bin").read_bytes() == source.read_bytes()
+
+
+def test_memory_limit_caps_the_zstd_frame_size():
+    assert sharding.zstd_frame_size(long=True) == sharding.ZSTD_LONG_FRAME_SIZE
+    assert sharding.zstd_frame_size(long=True, memory_limit="1GiB") == 256 * 1024 * 1024
+    assert sharding.zstd_frame_size(memory_limit="64MiB") == 16 * 1024 * 1024
+    assert sharding.zstd_frame_size(memory_limit="1MB") == sharding.ZSTD_MIN_FRAME_SIZE
+
+
+@pytest.mark.parametrize("codec", ["zstd", "gzip"])
+def test_snapshot_restores_with_either_codec(source_db, tmp_path, codec):
+    manager = ShardingManager(temp_dir=tmp_path / "work", codec=codec, long_mode=True)
+    manifest = manager.create_sharded_snapshot(source_db, tmp_path / "out", "net")
+
+    shard = manifest.shards[0]
+    assert shard.codec == codec == manifest.compression_algorithm
+    assert shard.file.endswith(sharding.CODEC_EXTENSIONS[codec])
+
+    restored = tmp_path / "restored.duckdb"
+    manager.reconstruct_from_shards(manifest, tmp_path / "out", restored)
+    with duckdb.connect(str(restored), read_only=True) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM paths").fetchone()[0] == 20000
+
+
+def test_manifest_without_codec_restores_gzip_shards(source_db, tmp_path):
+    manager = ShardingManager(temp_dir=tmp_path / "work", codec="gzip", hash_algorithm="sha256")
+    manifest = manager.create_sharded_snapshot(source_db, tmp_path / "out", "net")
+    # A manifest written before it recorded codecs and hash algorithms.
+    data = json.loads(manifest.to_json())
+    del data["hash_algorithm"]
+    for shard in data["shards"]:
+        del shard["codec"], shard["hash_algorithm"]
+        shard["sha256"] = shard.pop("hash")
+    old = SnapshotManifest.from_json(json.dumps(data))
+    assert old.hash_algorithm == "sha256"
+    assert old.shards[0] == dataclasses.replace(manifest.shards[0], codec=None)
+
+    restored = tmp_path / "restored.duckdb"
+    ShardingManager(temp_dir=tmp_path / "work").reconstruct_from_shards(
+        old, tmp_path / "out", restored
+    )
+    assert restored.read_bytes() == source_db.read_bytes()
+
+
+def test_single_file_snapshot_reads_the_source_once(source_db, tmp_path, monkeypatch):
+    def no_rehash(*_):
+        pytest.fail("the snapshot pipeline re-read a file to hash it")
+
+    monkeypatch.setattr(sharding, "hash_file", no_rehash)
+    monkeypatch.setattr(sharding, "calculate_db_merkle_root", no_rehash)
+    manager = ShardingManager(temp_dir=tmp_path / "work")
+    manifest = manager.create_sharded_snapshot(source_db, tmp_path / "out", "net")
+    restored = tmp_path / "restored.duckdb"
+    manager.reconstruct_from_shards(manifest, tmp_path / "out", restored)
+    monkeypatch.undo()
+
+    shard_path = tmp_path / "out" / manifest.shards[0].file
+    assert manifest.hash_algorithm == manifest.shards[0].hash_algorithm == "blake3"
+    assert manifest.merkle_root == sharding.hash_file(source_db, "blake3")
+    assert manifest.shards[0].hash == sharding.hash_file(shard_path, "blake3")
+    assert manifest.shards[0].size == shard_path.stat().st_size
+    assert restored.read_bytes() == source_db.read_bytes()
+
+
+def test_corrupt_shard_is_rejected(source_db, tmp_path):
+    manager = ShardingManager(temp_dir=tmp_path / "work")
+    manifest = manager.create_sharded_snapshot(source_db, tmp_path / "out", "net")
+    manifest.shards[0].hash = "0" * 64
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        manager.reconstruct_from_shards(manifest, tmp_path / "out", tmp_path / "restored.duckdb")
+    assert not (tmp_path / "restored.duckdb").exists()
+
+
+@pytest.mark.parametrize("codec", ["zstd", "gzip"])
+@pytest.mark.parametrize("damage", ["flip", "truncate"])
+def test_damaged_shard_fails_the_checksum(source_db, tmp_path, codec, damage):
+    manager = ShardingManager(temp_dir=tmp_path / "work", codec=codec)
+    manifest = manager.create_sharded_snapshot(source_db, tmp_path / "out", "net")
+    shard_path = tmp_path / "out" / manifest.shards[0].file
+    data = bytearray(shard_path.read_bytes())
+    if damage == "flip":
+        data[len(data) // 2] ^= 0xFF
+    else:
+        del data[len(data) // 2 :]
+    shard_path.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        manager.reconstruct_from_shards(manifest, tmp_path / "out", tmp_path / "restored.duckdb")
+    assert not (tmp_path / "restored.duckdb").exists()
+    assert not any((tmp_path / "work").rglob("*.duckdb"))
+
+
+@pytest.mark.parametrize(
+    "algorithm, reference",
+    [("sha256", hashlib.sha256), ("blake3", blake3.blake3)],
+)
+def test_hash_file_algorithms(tmp_path, algorithm, reference):
+    path = tmp_path / "data.bin"
+    path.write_bytes(os.urandom(3 * 1024 * 1024 + 17))
+    assert sharding.hash_file(path, algorithm) == reference(path.read_bytes()).hexdigest()
+
+    with pytest.raises(ValueError, match="md5"):
+        sharding.hash_file(path, "md5")
@@ -0,0 +1,452 @@
+import uuid
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from hronir_encyclopedia import canon_new, storage
+from hronir_encyclopedia.models import Path as PathModel
+
+
+def _hronir_uuid(key: str) -> uuid.UUID:
+    return uuid.uuid5(storage.UUID_NAMESPACE, key)
+
+
+def _make_path(position: int, prev_key: str | None, key: str) -> PathModel:
+    prev = _hronir_uuid(prev_key) if prev_key else None
+    cur = _hronir_uuid(key)
+    return PathModel(
+        path_uuid=storage.compute_narrative_path_uuid(position, str(prev or ""), str(cur)),
+        position=position,
+        prev_uuid=prev,
+        uuid=cur,
+    )
+
+
+@pytest.fixture
+def dm():
+    data_manager = storage.get_data_manager()
+    data_manager.initialize_and_load()
+    return data_manager
+
+
+@pytest.fixture
+def wide_position(dm):
+    """Root -> a -> 25 alternatives at position 1; alternative i has i % 3 continuations."""
+    dm.add_path(_make_path(0, None, "a"))
+    for i in range(25):
+        dm.add_path(_make_path(1, "a", f"alt_{i}"))
+        for j in range(i % 3):
+            dm.add_path(_make_path(2, f"alt_{i}", f"alt_{i}_child_{j}"))
+    dm.save_all_data()
+    return dm
+
+
+def test_paths_by_position_page_walks_all_paths_once(wide_position):
+    dm = wide_position
+    seen = []
+    after = None
+    while True:
+        page = dm.get_paths_by_position_page(1, after_path_uuid=after, limit=10)
+        if not page:
+            break
+        seen.extend(str(p.path_uuid) for p in page)
+        after = str(page[-1].path_uuid)
+
+    expected = sorted(str(p.path_uuid) for p in dm.get_paths_by_position(1))
+    assert seen == expected
+
+
+def test_paths_by_position_page_filters_predecessor(wide_position):
+    dm = wide_position
+    page = dm.get_paths_by_position_page(2, prev_uuid=str(_hronir_uuid("alt_2")), limit=10)
+    assert {str(p.uuid) for p in page} == {
+        str(_hronir_uuid("alt_2_child_0")),
+        str(_hronir_uuid("alt_2_child_1")),
+    }
+
+
+def test_candidate_pages_match_full_ranking(wide_position):
+    dm = wide_position
+    full = canon_new.get_candidates_with_scores(dm, 1)
+
+    paged = []
+    after = None
+    while True:
+        page, after = canon_new.get_candidates_page_with_scores(
+            dm, 1, after_path_uuid=after, limit=7
+        )
+        paged.extend(page)
+        if not after:
+            break
+
+    paged.sort(key=lambda x: (-x["score"], -x["continuations"], x["path_uuid"]))
+    assert paged == full
+
+
+def test_agent_candidate_pages_resolve_the_predecessor_once(wide_position, monkeypatch):
+    from hronir_encyclopedia.agents.base import AgentConfig, BaseHronirAgent
+
+    class RankingAgent(BaseHronirAgent):
+        def execute_task(self, task_data):
+            return {}
+
+        def get_agent_prompt(self, task_data):
+            return ""
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    dm = wide_position
+    full = canon_new.get_candidates_with_scores(dm, 1)
+    walks = []
+    walk = canon_new.calculate_canonical_path
+    monkeypatch.setattr(
+        canon_new, "calculate_canonical_path", lambda *a: walks.append(1) or walk(*a)
+    )
+
+    agent = RankingAgent(AgentConfig(name="writer", role="r", goal="g", backstory="b"))
+    pages = list(agent.iter_candidate_pages(1, page_size=7))
+    summary = agent.get_competition_summary(1)
+
+    assert len(pages) == 4
+    assert len(walks) == 2  # once per call, not once per page
+    assert summary["count"] == len(full)
+    assert [c["path_uuid"] for c in summary["leaders"]] == [c["path_uuid"] for c in full[:3]]
+    assert [c["score"] for c in summary["leaders"]] == pytest.approx([c["score"] for c in full[:3]])
+
+
+def test_top_candidates_match_full_ranking(wide_position):
+    dm = wide_position
+    full = canon_new.get_candidates_with_scores(dm, 1)
+    top = canon_new.get_top_candidates(dm, 1, limit=5)
+
+    assert [(c["path_uuid"], c["continuations"]) for c in top] == [
+        (c["path_uuid"], c["continuations"]) for c in full[:5]
+    ]
+    assert [c["score"] for c in top] == pytest.approx([c["score"] for c in full[:5]])
+
+
+def test_ranking_limit_shows_the_top_candidates(wide_position):
+    from typer.testing import CliRunner
+
+    from hronir_encyclopedia.cli import app
+
+    top = canon_new.get_candidates_with_scores(wide_position, 1)[:3]
+    result = CliRunner().invoke(app, ["ranking", "1", "--limit", "3"])
+
+    assert result.exit_code == 0, result.output
+    listed = [line.split()[-1] for line in result.output.splitlines()[2:]]
+    assert listed == [c["path_uuid"] for c in top]
+
+
+def test_archive_settled_positions_keeps_reads_transparent(dm, tmp_path):
+    dm.add_path(_make_path(0, None, "a"))
+    dm.add_path(_make_path(1, "a", "b"))
+    dm.add_path(_make_path(2, "b", "c"))
+    for key in ("a", "b", "c"):
+        dm.backend.add_hronir(str(_hronir_uuid(key)), f"content of {key}")
+    dm.save_all_data()
+    paths_before = sorted(str(p.path_uuid) for p in dm.get_all_paths())
+
+    moved = dm.archive_settled_positions(2)
+
+    assert moved == {"paths": 2, "hronirs": 2}
+    assert dm.backend.conn.execute("SELECT COUNT(*) FROM paths").fetchone()[0] == 1
+    assert any((tmp_path / "cold" / "paths").glob("position=0/*.parquet"))
+    assert sorted(str(p.path_uuid) for p in dm.get_all_paths()) == paths_before
+    assert [str(p.uuid) for p in dm.get_paths_by_position(1)] == [str(_hronir_uuid("b"))]
+    assert dm.get_hrönir_content(str(_hronir_uuid("a"))) == "content of a"
+    archived = _make_path(0, None, "a")
+    assert dm.get_path_by_uuid(str(archived.path_uuid)) == archived
+
+
+def test_archived_rows_are_not_inserted_again(dm, tmp_path):
+    paths = [_make_path(0, None, "a"), _make_path(1, "a", "b"), _make_path(2, "b", "c")]
+    for path in paths:
+        dm.add_path(path)
+    for key in ("a", "b", "c"):
+        dm.backend.add_hronir(str(_hronir_uuid(key)), f"content of {key}")
+    dm.archive_settled_positions(2)
+
+    dm.add_path(paths[0])
+    dm.backend.add_hronir(str(_hronir_uuid("a")), "content of a")
+    inserted = dm.backend.bulk_store([(str(_hronir_uuid("b")), "content of b")], paths[:2], [])
+
+    assert inserted == {"hronirs": 0, "paths": 0, "transactions": 0}
+    assert dm.backend.count_paths() == 3
+    assert dm.backend.count_hronirs() == 3
+    assert dm.backend.conn.execute("SELECT COUNT(*) FROM paths").fetchone()[0] == 1
+
+    with pytest.raises(ValueError, match="archived"):
+        dm.update_path_status(str(paths[0].path_uuid), "QUALIFIED")
+
+
+def test_snapshot_includes_archived_rows(dm, tmp_path):
+    from hronir_encyclopedia.sharding import ShardingManager
+
+    for path in [_make_path(0, None, "a"), _make_path(1, "a", "b"), _make_path(2, "b", "c")]:
+        dm.add_path(path)
+    for key in ("a", "b", "c"):
+        dm.backend.add_hronir(str(_hronir_uuid(key)), f"content of {key}")
+    dm.archive_settled_positions(2)
+
+    manifest = dm.backend.create_snapshot(tmp_path / "snapshot", "network")
+    restored = tmp_path / "restored.duckdb"
+    ShardingManager(temp_dir=tmp_path / "work").reconstruct_from_shards(
+        manifest, tmp_path / "snapshot", restored
+    )
+
+    with duckdb.connect(str(restored), read_only=True) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM paths").fetchone()[0] == 3
+        assert conn.execute(
+            "SELECT content FROM hronirs WHERE uuid = ?", [str(_hronir_uuid("a"))]
+        ).fetchone() == ("content of a",)
+    # The live database keeps its archived rows in cold storage.
+    assert dm.backend.conn.execute("SELECT COUNT(*) FROM paths").fetchone()[0] == 1
+
+
+class _FailingDeleteConn:
+    """Connection proxy whose hot DELETE of archived paths fails."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def execute(self, query, *args):
+        if query.startswith("DELETE FROM paths WHERE path_uuid IN"):
+            raise duckdb.IOException("disk full")
+        return self._conn.execute(query, *args)
+
+
+def test_failed_archive_leaves_no_parquet(dm, tmp_path, monkeypatch):
+    dm.add_path(_make_path(0, None, "a"))
+    dm.add_path(_make_path(1, "a", "b"))
+    backend = dm.backend
+
+    monkeypatch.setattr(backend, "conn", _FailingDeleteConn(backend.conn))
+    with pytest.raises(duckdb.IOException):
+        backend.archive_settled_positions(1)
+    monkeypatch.undo()
+
+    assert not list((tmp_path / "cold").rglob("*.parquet"))
+    assert not list((tmp_path / "cold").glob(".staging-*"))
+    assert backend.conn.execute("SELECT COUNT(*) FROM paths").fetchone()[0] == 2
+
+
+def test_paths_by_hronir_include_archived_positions(dm):
+    for path in [
+        _make_path(0, None, "a"),
+        _make_path(1, "a", "b"),
+        _make_path(0, None, "x"),
+        _make_path(1, "x", "y"),
+        _make_path(2, "y", "b"),  # "b" also continues "y", in a path that stays hot
+    ]:
+        dm.add_path(path)
+    dm.archive_settled_positions(2)
+
+    positions = [p.position for p in dm.backend.get_paths_by_hronir_uuid(str(_hronir_uuid("b")))]
+    assert positions == [1, 2]
+
+
+def test_point_lookups_use_keyed_queries(wide_position, monkeypatch):
+    dm = wide_position
+    monkeypatch.setattr(
+        dm.backend, "get_all_paths", lambda: pytest.fail("point lookup scanned all paths")
+    )
+    expected = _make_path(1, "a", "alt_3")
+
+    assert dm.get_path_by_uuid(str(expected.path_uuid)) == expected
+    assert dm.get_path_by_uuid(str(_hronir_uuid("missing"))) is None
+    assert dm.get_paths_by_hronir_uuid(str(_hronir_uuid("alt_3"))) == [expected]
+
+
+@pytest.mark.parametrize("use_bloom_filter", [False, True])
+def test_hronir_exists_never_fetches_content(dm, monkeypatch, use_bloom_filter):
+    dm.backend.use_bloom_filter = use_bloom_filter
+    stored = str(_hronir_uuid("stored"))
+    dm.backend.add_hronir(stored, "some chapter text")
+    monkeypatch.setattr(
+        dm.backend, "get_hronir_content", lambda *_: pytest.fail("existence probe read content")
+    )
+    missing = str(_hronir_uuid("missing"))
+
+    assert dm.hrönir_exists(stored)
+    assert not dm.hrönir_exists(missing)
+    assert dm.existing_hrönir_uuids([stored, missing]) == {stored}
+
+    late = str(_hronir_uuid("added after the filter was built"))
+    dm.backend.add_hronir(late, "another chapter")
+    assert dm.hrönir_exists(late)
+
+
+def test_store_text_and_bytes_without_temp_files(dm, monkeypatch):
+    import tempfile
+
+    monkeypatch.setattr(
+        tempfile, "NamedTemporaryFile", lambda *a, **k: pytest.fail("temp file round trip")
+    )
+    text = "Os espelhos e a cópula são abomináveis."
+
+    from_text = storage.store_chapter_text(text)
+    from_bytes = dm.store_hrönir_text(text.encode("utf-8"))
+
+    assert from_text == from_bytes == str(uuid.uuid5(storage.UUID_NAMESPACE, text))
+    assert dm.get_hrönir_content(from_text) == text
+    assert dm.store_hrönirs(["first", b"second"]) == [
+        storage.compute_hronir_uuid("first"),
+        storage.compute_hronir_uuid("second"),
+    ]
+
+
+def test_streaming_hash_matches_file_store(dm, tmp_path, monkeypatch):
+    chapter = tmp_path / "chapter.md"
+    chapter.write_bytes(("Tlön\r\n" * 50_000).encode("utf-8"))
+    monkeypatch.setattr(storage, "STREAMING_HASH_CHUNK_CHARS", 4097)
+    monkeypatch.setattr(storage, "STREAMING_HASH_THRESHOLD_BYTES", 1024)
+
+    stored_uuid = dm.store_hrönir(chapter)
+
+    assert storage.compute_hronir_uuid_from_file(chapter) == stored_uuid
+    assert stored_uuid == storage.compute_hronir_uuid("Tlön\n" * 50_000)
+    # Re-storing an existing large file is answered by the streaming hash alone.
+    monkeypatch.setattr(dm, "store_hrönir_text", lambda *_: pytest.fail("content was reloaded"))
+    assert dm.store_hrönir(chapter) == stored_uuid
+
+
+def test_integrity_report_finds_all_violations(dm):
+    root = dm.store_hrönir_text("The first chapter of the library.")
+    child = dm.store_hrönir_text("A continuation of the first chapter.")
+    missing = str(_hronir_uuid("never-stored"))
+
+    def path(position, prev, cur, path_uuid=None):
+        return PathModel(
+            path_uuid=path_uuid or storage.compute_narrative_path_uuid(position, prev, cur),
+            position=position,
+            prev_uuid=prev or None,
+            uuid=cur,
+        )
+
+    dm.add_path(path(0, "", root))
+    dm.add_path(path(1, root, child))
+    missing_current = path(1, root, missing)
+    missing_predecessor = path(2, missing, child)
+    third = dm.store_hrönir_text("A second continuation.")
+    mismatched = path(2, child, third, path_uuid=_hronir_uuid("bogus-path"))
+    for p in (missing_current, missing_predecessor, mismatched):
+        dm.add_path(p)
+
+    report = dm.validate_data_integrity_report()
+    assert report.paths_checked == 5
+    assert report.hrönirs_checked == 3
+    found = {(i.details["check"], i.source_entity_id) for i in report.issues}
+    assert found == {
+        ("missing_current", str(missing_current.path_uuid)),
+        ("missing_predecessor", str(missing_predecessor.path_uuid)),
+        ("path_uuid_mismatch", str(mismatched.path_uuid)),
+    }
+    mismatch = next(i for i in report.issues if i.details["check"] == "path_uuid_mismatch")
+    expected = storage.compute_narrative_path_uuid(2, child, third)
+    assert mismatch.details["expected_path_uuid"] == str(expected)
+
+    assert dm.validate_data_integrity_report(num_chunks=4).issues == report.issues
+    assert dm.validate_data_integrity() == [i.message for i in report.issues]
+
+
+def test_content_reads_are_cached(dm, monkeypatch):
+    content_uuid = dm.store_hrönir_text("A chapter agents keep rereading.")
+    backend_reads = []
+    original = dm.backend.get_hronir_content
+
+    def counting_read(hronir_uuid):
+        backend_reads.append(hronir_uuid)
+        return original(hronir_uuid)
+
+    monkeypatch.setattr(dm.backend, "get_hronir_content", counting_read)
+    for _ in range(3):
+        assert dm.get_hrönir_content(content_uuid) == "A chapter agents keep rereading."
+    assert dm.get_hrönir_content(str(_hronir_uuid("missing"))) is None
+
+    assert len(backend_reads) == 2
+    assert dm.content_cache.hits == 2
+
+
+def test_data_managers_are_independent(tmp_path):
+    first = storage.DataManager(db_path=":memory:", library_path=tmp_path / "lib")
+    second = storage.DataManager(db_path=":memory:", library_path=tmp_path / "lib")
+    try:
+        for data_manager in (first, second):
+            data_manager.initialize_and_load()
+        stored = first.store_hrönir_text("Only in the first network.")
+        assert first.hrönir_exists(stored)
+        assert not second.hrönir_exists(stored)
+    finally:
+        first.close()
+        second.close()
+
+    assert storage.get_data_manager() is storage.get_data_manager()
+    assert storage.get_data_manager("worker") is not storage.get_data_manager()
+
+
+def test_streaming_scans_match_full_reads(wide_position):
+    streamed = []
+    for path in wide_position.iter_all_paths(batch_size=7):
+        # The main connection stays usable while a scan is in flight.
+        assert wide_position.get_paths_by_position(0)
+        streamed.append(path)
+
+    def key(p):
+        return str(p.path_uuid)
+
+    assert sorted(streamed, key=key) == sorted(wide_position.get_all_paths(), key=key)
+    assert list(wide_position.iter_all_transactions()) == wide_position.get_all_transactions()
+
+
+def test_memory_limit_is_applied(tmp_path):
+    spill_dir = tmp_path / "spill"
+    data_manager = storage.DataManager(
+        db_path=tmp_path / "bounded.duckdb", memory_limit="256MB", temp_directory=spill_dir
+    )
+    try:
+        conn = data_manager.backend.conn
+        limit = conn.execute("SELECT current_setting('memory_limit')").fetchone()[0]
+        assert limit.startswith("244") or limit.startswith("256")
+        assert conn.execute("SELECT current_setting('temp_directory')").fetchone()[0] == str(
+            spill_dir
+        )
+        assert spill_dir.is_dir()
+    finally:
+        data_manager.close()
+
+    with pytest.raises(ValueError):
+        storage.DataManager(db_path=":memory:", memory_limit="lots")
+
+
+def test_get_all_paths_refuses_to_exceed_the_memory_limit(wide_position, monkeypatch):
+    from hronir_encyclopedia import duckdb_storage
+
+    wide_position.backend.memory_limit = "256MB"
+    assert len(wide_position.get_all_paths()) == wide_position.backend.count_paths()
+
+    monkeypatch.setattr(duckdb_storage, "PATH_MODEL_BYTES", 256 * 2**20)
+    with pytest.raises(MemoryError, match="iter_all_paths"):
+        wide_position.get_all_paths()
+    assert sum(1 for _ in wide_position.iter_all_paths()) == wide_position.backend.count_paths()
+
+
+def test_sharded_split_copies_rows(wide_position, tmp_path):
+    from hronir_encyclopedia.sharding import ShardingManager
+
+    db_path = wide_position.backend.db_path
+    wide_position.close()
+    manager = ShardingManager(temp_dir=tmp_path / "shards", memory_limit="128MB")
+    manager.MAX_SHARD_SIZE_BYTES = 1
+    cleanup: list = []
+    shards = manager._split_database_by_table(Path(db_path), cleanup)
+
+    copied = {}
+    for shard_path, tables in shards:
+        with duckdb.connect(str(shard_path), read_only=True) as conn:
+            for table in tables:
+                copied[table] = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+    assert copied["paths"] == 1 + 25 + sum(i % 3 for i in range(25))
@@ -0,0 +1,104 @@
+import pytest
+import typer
+from typer.testing import CliRunner
+
+from hronir_encyclopedia import storage
+from hronir_encyclopedia.cli import app
+from hronir_encyclopedia.commands.store import store_many_command
+from hronir_encyclopedia.models import Path as PathModel
+
+runner = CliRunner()
+
+
+def test_store_many_manifest_chains_chapters(tmp_path):
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    root = dm.store_hrönir_text("An existing root chapter.")
+    dm.add_path(
+        PathModel(path_uuid=storage.compute_narrative_path_uuid(0, "", root), position=0, uuid=root)
+    )
+
+    (tmp_path / "one.md").write_text("First imported chapter.")
+    (tmp_path / "two.md").write_text("Second imported chapter.")
+    (tmp_path / "manifest.csv").write_text(f"file,predecessor\none.md,{root}\ntwo.md,one.md\n")
+
+    result = runner.invoke(app, ["store-many", str(tmp_path / "manifest.csv")])
+    assert result.exit_code == 0, result.output
+
+    one = storage.compute_hronir_uuid("First imported chapter.")
+    two = storage.compute_hronir_uuid("Second imported chapter.")
+    assert [p.position for p in dm.get_paths_by_hronir_uuid(one)] == [1]
+    assert [str(p.prev_uuid) for p in dm.get_paths_by_hronir_uuid(two)] == [one]
+    assert dm.get_paths_by_hronir_uuid(two)[0].position == 2
+    assert len(dm.get_all_transactions()) == 2
+    assert dm.search_hrönirs("imported")
+
+
+def test_store_many_rejects_unknown_predecessor_without_writing(tmp_path):
+    (tmp_path / "a.md").write_text("Orphaned chapter.")
+    missing = str(storage.compute_hronir_uuid("never stored"))
+    with pytest.raises(typer.Exit):
+        store_many_command(tmp_path, predecessor=missing, workers=2)
+    assert not storage.get_data_manager().hrönir_exists(
+        storage.compute_hronir_uuid("Orphaned chapter.")
+    )
+
+
+def test_store_many_keeps_every_predecessor_of_a_chapter(tmp_path):
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    root = dm.store_hrönir_text("Another existing root.")
+    dm.add_path(
+        PathModel(path_uuid=storage.compute_narrative_path_uuid(0, "", root), position=0, uuid=root)
+    )
+
+    (tmp_path / "one.md").write_text("A first branch.")
+    (tmp_path / "two.md").write_text("A chapter with two predecessors.")
+    (tmp_path / "two_copy.md").write_text("A chapter with two predecessors.")
+    (tmp_path / "three.md").write_text("A continuation of the shared chapter.")
+    (tmp_path / "manifest.csv").write_text(
+        "file,predecessor\n"
+        f"one.md,{root}\n"
+        "two.md,one.md\n"
+        f"two.md,{root}\n"
+        "two_copy.md,one.md\n"  # identical text and predecessor: the same path
+        "three.md,two.md\n"
+    )
+
+    result = runner.invoke(app, ["store-many", str(tmp_path / "manifest.csv")])
+    assert result.exit_code == 0, result.output
+    assert "4 new paths" in result.output
+
+    one = storage.compute_hronir_uuid("A first branch.")
+    two = storage.compute_hronir_uuid("A chapter with two predecessors.")
+    three = storage.compute_hronir_uuid("A continuation of the shared chapter.")
+    two_paths = {(p.position, str(p.prev_uuid)) for p in dm.get_paths_by_hronir_uuid(two)}
+    assert two_paths == {(1, root), (2, one)}
+    # A batch chapter continues from its lowest position, like stored predecessors do.
+    assert [p.position for p in dm.get_paths_by_hronir_uuid(three)] == [2]
+
+
+def test_store_many_collects_unreadable_chapters(tmp_path):
+    (tmp_path / "good.md").write_text("A readable chapter.")
+    (tmp_path / "latin1.md").write_bytes("Borges en Adrogué.".encode("latin-1"))
+    (tmp_path / "manifest.csv").write_text("file\ngood.md\nlatin1.md\nmissing.md\n")
+
+    result = runner.invoke(app, ["store-many", str(tmp_path / "manifest.csv")])
+
+    assert result.exit_code == 1
+    assert "latin1.md: not valid UTF-8 text." in result.output
+    assert "missing.md: file not found." in result.output
+    assert "Nothing was stored." in result.output
+    assert not storage.get_data_manager().hrönir_exists(
+        storage.compute_hronir_uuid("A readable chapter.")
+    )
+
+
+def test_store_many_rejects_a_manifest_without_a_file_column(tmp_path):
+    (tmp_path / "manifest.csv").write_text("chapter,predecessor\none.md,\n")
+
+    result = runner.invoke(app, ["store-many", str(tmp_path / "manifest.csv")])
+
+    assert result.exit_code == 1
+    assert "manifest has no 'file' column." in result.output
+    assert "Nothing was stored." in result.output
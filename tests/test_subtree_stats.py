@@ -0,0 +1,141 @@
+import random
+import uuid
+
+import pytest
+
+from hronir_encyclopedia import graph_logic, storage, subtree_stats
+from hronir_encyclopedia.compact_graph import CompactGraph
+from hronir_encyclopedia.models import Path as PathModel
+
+
+def _hronir_uuid(key: str) -> str:
+    return str(uuid.uuid5(storage.UUID_NAMESPACE, key))
+
+
+def _make_path(position: int, prev_key: str | None, key: str) -> PathModel:
+    prev = _hronir_uuid(prev_key) if prev_key else ""
+    cur = _hronir_uuid(key)
+    return PathModel(
+        path_uuid=storage.compute_narrative_path_uuid(position, prev, cur),
+        position=position,
+        prev_uuid=prev or None,
+        uuid=cur,
+    )
+
+
+def _random_dag(seed: int, size: int = 60) -> list[PathModel]:
+    """Chapters at increasing positions, some continuing two earlier chapters."""
+    rng = random.Random(seed)
+    paths = [_make_path(0, None, "n0")]
+    level = {"n0": 0}
+    for i in range(1, size):
+        key = f"n{i}"
+        parents = rng.sample(sorted(level), k=min(len(level), rng.choice([1, 1, 1, 2])))
+        for parent in parents:
+            paths.append(_make_path(level[parent] + 1, parent, key))
+        level[key] = max(level[p] for p in parents) + 1
+    return paths
+
+
+def test_stats_of_a_small_tree():
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    for path in [
+        _make_path(0, None, "a"),
+        _make_path(1, "a", "b"),
+        _make_path(1, "a", "c"),
+        _make_path(2, "b", "d"),
+    ]:
+        dm.add_path(path)
+
+    assert graph_logic.get_subtree_stats(_hronir_uuid("a"), dm) == {
+        "descendants": 3,
+        "max_depth": 2,
+        "leaves": 2,
+    }
+    assert graph_logic.get_subtree_stats(_hronir_uuid("d"), dm) == {
+        "descendants": 0,
+        "max_depth": 0,
+        "leaves": 1,
+    }
+    assert graph_logic.get_subtree_stats(_hronir_uuid("missing"), dm) is None
+    largest = graph_logic.get_largest_subtrees(limit=1, by="max_depth", data_manager=dm)
+    assert [entry["hrönir_uuid"] for entry in largest] == [_hronir_uuid("a")]
+
+
+def test_incremental_updates_match_a_rebuild():
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    paths = _random_dag(seed=7)
+    dm.add_path(paths[0])
+    assert dm.get_subtree_stats([_hronir_uuid("n0")])  # the table is now maintained
+
+    rng = random.Random(3)
+    rest = paths[1:]
+    while rest:
+        size = rng.randint(1, 6)
+        batch, rest = rest[:size], rest[size:]
+        if len(batch) == 1:
+            dm.add_path(batch[0])
+        else:
+            # Out-of-order batches: a child may be stored before the path leading to it.
+            rng.shuffle(batch)
+            dm.bulk_store([], batch, [])
+
+    keys = [_hronir_uuid(f"n{i}") for i in range(60)]
+    incremental = dm.get_subtree_stats(keys)
+
+    graph = CompactGraph.from_paths(paths)
+    descendants, max_depth, leaves = graph.subtree_stats()
+    for key in keys:
+        node = graph.node_id(key)
+        expected = {
+            "descendants": int(descendants[node]),
+            "max_depth": int(max_depth[node]),
+            "leaves": int(leaves[node]),
+        }
+        assert incremental[key] == expected
+
+
+def test_cyclic_graph_has_no_stats():
+    a, b = _make_path(1, "x", "y"), _make_path(2, "y", "x")
+    assert CompactGraph.from_paths([a, b]).subtree_stats() is None
+
+
+def test_unknown_statistic_is_rejected():
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    with pytest.raises(ValueError, match="content"):
+        dm.get_largest_subtrees(by="content")
+
+
+def test_new_paths_update_every_ancestor_in_a_fixed_number_of_queries(monkeypatch):
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    chain = [_make_path(0, None, "c0")] + [
+        _make_path(i, f"c{i - 1}", f"c{i}") for i in range(1, 40)
+    ]
+    dm.bulk_store([], chain, [])
+    assert dm.get_subtree_stats([_hronir_uuid("c0")])[_hronir_uuid("c0")]["descendants"] == 39
+
+    queries = []
+
+    class CountingConnection:
+        def __init__(self, conn):
+            self.conn = conn
+
+        def execute(self, *args):
+            queries.append(args[0])
+            return self.conn.execute(*args)
+
+    apply_paths = subtree_stats.apply_paths
+    monkeypatch.setattr(
+        subtree_stats,
+        "apply_paths",
+        lambda conn, *args: apply_paths(CountingConnection(conn), *args),
+    )
+    dm.bulk_store([], [_make_path(40, "c39", "c40"), _make_path(40, "c39", "d40")], [])
+
+    assert len(queries) == 6  # ancestors, two aggregates, one write, the stored seq
+    top = dm.get_subtree_stats([_hronir_uuid("c0")])[_hronir_uuid("c0")]
+    assert top == {"descendants": 41, "max_depth": 40, "leaves": 2}
@@ -0,0 +1,92 @@
+import uuid
+
+import pytest
+
+from hronir_encyclopedia import storage
+from hronir_encyclopedia.compact_graph import CompactGraph
+from hronir_encyclopedia.models import Path as PathModel
+from hronir_encyclopedia.topological_order import NarrativeCycleError, TopologicalOrder
+
+
+def _hronir_uuid(key: str) -> str:
+    return str(uuid.uuid5(storage.UUID_NAMESPACE, key))
+
+
+def _make_path(position: int, prev_key: str | None, key: str) -> PathModel:
+    prev = _hronir_uuid(prev_key) if prev_key else ""
+    cur = _hronir_uuid(key)
+    return PathModel(
+        path_uuid=storage.compute_narrative_path_uuid(position, prev, cur),
+        position=position,
+        prev_uuid=prev or None,
+        uuid=cur,
+    )
+
+
+def _order(paths: list[PathModel]) -> TopologicalOrder:
+    return TopologicalOrder(CompactGraph.from_paths(paths))
+
+
+def _before(order: TopologicalOrder, first: str | None, second: str) -> bool:
+    return order.index_of(_hronir_uuid(first) if first else None) < order.index_of(
+        _hronir_uuid(second)
+    )
+
+
+def test_edge_against_the_order_reorders():
+    # root -> a -> c and root -> b: the seeded order puts b before c.
+    order = _order([_make_path(0, None, "a"), _make_path(1, "a", "c"), _make_path(0, None, "b")])
+    assert _before(order, "b", "c")
+
+    order.add_edge(_hronir_uuid("c"), _hronir_uuid("b"))
+    assert _before(order, None, "a")
+    assert _before(order, "a", "c")
+    assert _before(order, "c", "b")
+
+    # Fresh hrönirs are appended without disturbing anything.
+    order.add_edge(_hronir_uuid("b"), _hronir_uuid("d"))
+    assert _before(order, "b", "d")
+
+
+def test_cycle_is_rejected_and_order_unchanged():
+    order = _order([_make_path(0, None, "a"), _make_path(1, "a", "b"), _make_path(2, "b", "c")])
+    ranks = {key: order.index_of(_hronir_uuid(key)) for key in ("a", "b", "c")}
+
+    with pytest.raises(NarrativeCycleError):
+        order.add_edge(_hronir_uuid("c"), _hronir_uuid("a"))
+    with pytest.raises(NarrativeCycleError):
+        order.add_edge(_hronir_uuid("b"), _hronir_uuid("b"))
+    assert {key: order.index_of(_hronir_uuid(key)) for key in ranks} == ranks
+
+    # The rejected edge left no trace: the opposite direction is still accepted.
+    order.add_edge(_hronir_uuid("a"), _hronir_uuid("c"))
+
+
+def test_graph_loaded_with_a_cycle_is_inconsistent():
+    cyclic = [_make_path(0, None, "a"), _make_path(1, "a", "b"), _make_path(2, "b", "a")]
+    order = _order(cyclic)
+    assert not order.acyclic
+    # Nothing meaningful can be maintained, so further edges are accepted unchecked.
+    order.add_edge(_hronir_uuid("b"), _hronir_uuid("c"))
+    assert _order([_make_path(0, None, "a")]).acyclic
+
+
+def test_bulk_store_rejects_the_whole_batch():
+    dm = storage.get_data_manager()
+    dm.initialize_and_load()
+    dm.add_path(_make_path(0, None, "a"))
+    dm.add_path(_make_path(1, "a", "b"))
+    dm.save_all_data()
+
+    fresh = _make_path(2, "b", "c")
+    closing = _make_path(3, "c", "a")
+    with pytest.raises(NarrativeCycleError):
+        dm.bulk_store([], [fresh, closing], [])
+    assert dm.backend.count_paths() == 2
+    assert dm.is_narrative_acyclic()
+
+    # The batch's accepted edge was discarded along with it.
+    dm.add_path(_make_path(2, "b", "c"))
+    with pytest.raises(NarrativeCycleError):
+        dm.add_path(closing)
+    assert dm.backend.count_paths() == 3